@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Semester
+from api.services.presolve import feasibility_report
+
+
+class Command(BaseCommand):
+    help = 'Check whether a semester can be scheduled at all (demand vs. supply of slots and rooms)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('semester_id', nargs='?', type=int, help='Semester ID (default: current semester)')
+        parser.add_argument('--json', action='store_true', help='Print the raw report as JSON')
+
+    def handle(self, *args, **options):
+        if options['semester_id']:
+            semester = Semester.objects.filter(id=options['semester_id']).first()
+        else:
+            semester = Semester.objects.filter(is_current=True).first()
+        if semester is None:
+            raise CommandError('Semester not found')
+
+        report = feasibility_report(semester)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        self.stdout.write(
+            f"{semester.name}: {report['plans']} plans, demand {report['demand']} periods, "
+            f"{report['slots']} available slots ({report['seconds']}s)"
+        )
+
+        self.print_header("ROOM TYPES")
+        for row in report['room_types']:
+            tightest = row['tightest']
+            line = f"{row['name']}: demand {row['demand']} / supply {row['supply']}"
+            if tightest:
+                line += (
+                    f" | capacity >= {tightest['min_capacity']}: "
+                    f"demand {tightest['demand']} / supply {tightest['supply']}"
+                )
+            self.stdout.write(line if row['ok'] else self.style.ERROR(line))
+
+        for kind, title in (('teachers', 'OVERLOADED TEACHERS'), ('groups', 'OVERLOADED GROUPS')):
+            if report[kind]:
+                self.print_header(title)
+                for row in report[kind]:
+                    self.stdout.write(self.style.ERROR(
+                        f"{row['name']}: demand {row['demand']} / supply {row['supply']}"
+                    ))
+
+        if report['oversized']:
+            self.print_header("PLANS WITHOUT A LARGE ENOUGH ROOM")
+            for row in report['oversized']:
+                self.stdout.write(self.style.ERROR(
+                    f"Plan {row['plan']}: audience {row['audience']} > largest room {row['largest_room']}"
+                ))
+
+        if report['feasible']:
+            self.stdout.write(self.style.SUCCESS("\nNo infeasibility found"))
+        else:
+            self.stdout.write(self.style.ERROR("\nSemester is infeasible: not all lessons can be placed"))
+
+    def print_header(self, text):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n--- {text} ---"))
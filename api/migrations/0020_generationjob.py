@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_remove_studyplan_study_plan_group_xor_stream_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'В черзі'), ('RUNNING', 'Виконується'), ('SUCCESS', 'Завершено'), ('FAILED', 'Помилка')], default='PENDING', max_length=20, verbose_name='Статус')),
+                ('options', models.JSONField(blank=True, default=dict, verbose_name='Параметри генерації')),
+                ('request_key', models.CharField(db_index=True, help_text='Hash of semester + options, used to coalesce identical requests', max_length=64)),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Прогрес (%)')),
+                ('counters', models.JSONField(blank=True, default=dict, verbose_name='Лічильники')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generation_jobs', to='api.semester', verbose_name='Семестр')),
+            ],
+            options={
+                'verbose_name': 'Завдання генерації',
+                'verbose_name_plural': 'Завдання генерації',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['request_key', 'status'], name='api_generat_request_b66a67_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING'])), fields=('request_key',), name='unique_active_generation_request')],
+            },
+        ),
+    ]
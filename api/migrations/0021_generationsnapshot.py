@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_generationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plan_fingerprints', models.JSONField(default=dict, verbose_name='Відбитки планів')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('semester', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='generation_snapshot', to='api.semester', verbose_name='Семестр')),
+            ],
+            options={
+                'verbose_name': 'Знімок генерації',
+                'verbose_name_plural': 'Знімки генерації',
+            },
+        ),
+    ]
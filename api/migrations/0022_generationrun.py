@@ -0,0 +1,40 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_generationsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('options', models.JSONField(blank=True, default=dict, verbose_name='Параметри генерації')),
+                ('engine', models.CharField(max_length=20, verbose_name='Рушій')),
+                ('input_hash', models.CharField(blank=True, help_text='Hash of plans, constraints, slots, rooms and locked lessons', max_length=40)),
+                ('success', models.BooleanField(default=False, verbose_name='Успішно')),
+                ('created', models.PositiveIntegerField(default=0, verbose_name='Створено занять')),
+                ('unassigned', models.PositiveIntegerField(default=0, verbose_name='Нерозподілено занять')),
+                ('seconds', models.FloatField(default=0, verbose_name='Тривалість (с)')),
+                ('phases', models.JSONField(blank=True, default=dict, verbose_name='Тривалість фаз (с)')),
+                ('queries', models.PositiveIntegerField(default=0, verbose_name='SQL-запити')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generation_runs', to='api.semester', verbose_name='Семестр')),
+            ],
+            options={
+                'verbose_name': 'Запуск генерації',
+                'verbose_name_plural': 'Запуски генерації',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['semester', 'input_hash'], name='api_generat_semeste_2f6694_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_generationrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationrun',
+            name='is_reusable',
+            field=models.BooleanField(default=False, help_text='Successful deterministic run', verbose_name='Придатний для кешу'),
+        ),
+        migrations.AddField(
+            model_name='generationrun',
+            name='lessons_hash',
+            field=models.CharField(blank=True, help_text='Hash of the unlocked lessons written by the run', max_length=40),
+        ),
+    ]
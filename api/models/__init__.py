@@ -3,4 +3,5 @@ from .subjects import Subject
 from .teachers import Teacher
 from .rooms import Room, RoomType
 from .schedule import Semester, TimeSlot, SemesterConstraint, Lesson
-from .study_plans import StudyPlan, ClassType
\ No newline at end of file
+from .study_plans import StudyPlan, ClassType
+from .generation import GenerationJob, GenerationSnapshot, GenerationRun
\ No newline at end of file
@@ -0,0 +1,94 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from .schedule import Semester
+
+
+class GenerationJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('В черзі')
+        RUNNING = 'RUNNING', _('Виконується')
+        SUCCESS = 'SUCCESS', _('Завершено')
+        FAILED = 'FAILED', _('Помилка')
+
+    ACTIVE_STATUSES = [Status.PENDING, Status.RUNNING]
+
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='generation_jobs', verbose_name="Семестр")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING, verbose_name="Статус")
+
+    options = models.JSONField(default=dict, blank=True, verbose_name="Параметри генерації")
+    request_key = models.CharField(max_length=64, db_index=True, help_text="Hash of semester + options, used to coalesce identical requests")
+
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Прогрес (%)")
+    counters = models.JSONField(default=dict, blank=True, verbose_name="Лічильники")
+    result = models.JSONField(null=True, blank=True, verbose_name="Результат")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Generation #{self.pk} for {self.semester} [{self.status}]"
+
+    class Meta:
+        verbose_name = "Завдання генерації"
+        verbose_name_plural = "Завдання генерації"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['request_key', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['request_key'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_active_generation_request',
+            ),
+        ]
+
+
+class GenerationSnapshot(models.Model):
+    """Вхідні дані останньої успішної генерації семестру (для інкрементального режиму)."""
+    semester = models.OneToOneField(Semester, on_delete=models.CASCADE, related_name='generation_snapshot', verbose_name="Семестр")
+    plan_fingerprints = models.JSONField(default=dict, verbose_name="Відбитки планів")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot for {self.semester}"
+
+    class Meta:
+        verbose_name = "Знімок генерації"
+        verbose_name_plural = "Знімки генерації"
+
+
+class GenerationRun(models.Model):
+    """Історія запусків генерації: параметри, час фаз і відбиток вхідних даних."""
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='generation_runs', verbose_name="Семестр")
+    options = models.JSONField(default=dict, blank=True, verbose_name="Параметри генерації")
+    engine = models.CharField(max_length=20, verbose_name="Рушій")
+    input_hash = models.CharField(max_length=40, blank=True, help_text="Hash of plans, constraints, slots, rooms and locked lessons")
+
+    success = models.BooleanField(default=False, verbose_name="Успішно")
+    created = models.PositiveIntegerField(default=0, verbose_name="Створено занять")
+    unassigned = models.PositiveIntegerField(default=0, verbose_name="Нерозподілено занять")
+    seconds = models.FloatField(default=0, verbose_name="Тривалість (с)")
+    phases = models.JSONField(default=dict, blank=True, verbose_name="Тривалість фаз (с)")
+    queries = models.PositiveIntegerField(default=0, verbose_name="SQL-запити")
+    result = models.JSONField(null=True, blank=True, verbose_name="Результат")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+    is_reusable = models.BooleanField(default=False, verbose_name="Придатний для кешу", help_text="Successful deterministic run")
+    lessons_hash = models.CharField(max_length=40, blank=True, help_text="Hash of the unlocked lessons written by the run")
+
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Run #{self.pk} for {self.semester} ({self.engine})"
+
+    class Meta:
+        verbose_name = "Запуск генерації"
+        verbose_name_plural = "Запуски генерації"
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['semester', 'input_hash']),
+        ]
@@ -3,4 +3,5 @@ from .subjects import SubjectSerializer
 from .teachers import TeacherSerializer
 from .rooms import RoomSerializer, RoomTypeSerializer
 from .schedule import SemesterSerializer, TimeSlotSerializer, SemesterConstraintSerializer, LessonSerializer
-from .study_plans import StudyPlanSerializer, ClassTypeSerializer
\ No newline at end of file
+from .study_plans import StudyPlanSerializer, ClassTypeSerializer
+from .generation import GenerationRequestSerializer, GenerationJobSerializer, GenerationRunSerializer
\ No newline at end of file
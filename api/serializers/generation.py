@@ -0,0 +1,97 @@
+import os
+
+from rest_framework import serializers
+from api.models import GenerationJob, GenerationRun, Semester
+from api.services import cpsat
+from api.services.conf import get_setting
+from api.services.exact import ENGINES
+from api.services.jobs import is_stale
+from api.services.saturation import ORDERINGS
+
+
+class GenerationRequestSerializer(serializers.Serializer):
+    semester_id = serializers.PrimaryKeyRelatedField(queryset=Semester.objects.all())
+    sync = serializers.BooleanField(required=False, default=False)
+    # Профілювання: завжди синхронно, зміни в базі відкочуються
+    profile = serializers.BooleanField(required=False, default=False)
+
+    batch_size = serializers.IntegerField(required=False, min_value=1)
+    workers = serializers.IntegerField(required=False, min_value=1)
+    incremental = serializers.BooleanField(required=False)
+    template = serializers.BooleanField(required=False)
+    ordering = serializers.ChoiceField(choices=ORDERINGS, required=False)
+    # Пошук росте експоненційно з глибиною ланцюжка
+    repair_moves = serializers.IntegerField(required=False, min_value=0, max_value=3)
+    portfolio = serializers.IntegerField(required=False, min_value=1)
+    presolve = serializers.BooleanField(required=False)
+    spread = serializers.BooleanField(required=False)
+    force = serializers.BooleanField(required=False)
+    dry_run = serializers.BooleanField(required=False)
+    improve_seconds = serializers.FloatField(required=False, min_value=0)
+    seed = serializers.IntegerField(required=False)
+    engine = serializers.ChoiceField(choices=ENGINES, required=False)
+    time_limit = serializers.FloatField(required=False, min_value=0)
+
+    def validate_workers(self, value):
+        return self.check_max(value, get_setting("MAX_WORKERS") or os.cpu_count() or 1)
+
+    def validate_portfolio(self, value):
+        return self.check_max(value, get_setting("MAX_PORTFOLIO"))
+
+    def validate_improve_seconds(self, value):
+        return self.check_max(value, get_setting("MAX_LOCAL_SEARCH_SECONDS"))
+
+    def validate_time_limit(self, value):
+        return self.check_max(value, get_setting("MAX_SOLVER_TIME_LIMIT"))
+
+    def validate_engine(self, value):
+        if value == 'cpsat' and not cpsat.is_available():
+            raise serializers.ValidationError("OR-Tools is not installed")
+        return value
+
+    @staticmethod
+    def check_max(value, limit):
+        """Межа з налаштувань генератора, тож її не можна задати полю наперед."""
+        if value > limit:
+            raise serializers.ValidationError(f"Ensure this value is less than or equal to {limit}.")
+        return value
+
+    def get_options(self):
+        """Параметри для ScheduleGenerator, явно передані в запиті."""
+        return {
+            key: value for key, value in self.validated_data.items()
+            if key not in ('semester_id', 'sync', 'profile')
+        }
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    semester_name = serializers.CharField(source='semester.name', read_only=True)
+
+    class Meta:
+        model = GenerationJob
+        fields = [
+            'id', 'semester', 'semester_name', 'status', 'options',
+            'progress', 'counters', 'result', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, job):
+        data = super().to_representation(job)
+        if is_stale(job):
+            # Читання нічого не записує: у базі завдання позначить наступний enqueue_generation
+            data.update(status=GenerationJob.Status.FAILED, error="Interrupted")
+        return data
+
+
+class GenerationRunSerializer(serializers.ModelSerializer):
+    semester_name = serializers.CharField(source='semester.name', read_only=True)
+
+    class Meta:
+        model = GenerationRun
+        fields = [
+            'id', 'semester', 'semester_name', 'options', 'engine', 'input_hash',
+            'success', 'created', 'unassigned', 'seconds', 'phases', 'queries',
+            'result', 'error', 'is_reusable', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
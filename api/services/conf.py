@@ -0,0 +1,39 @@
+from django.conf import settings
+
+DEFAULTS = {
+    "BULK_BATCH_SIZE": 500,
+    "WORKERS": 1,
+    "MAX_WORKERS": None,
+    "JOB_WORKERS": 1,
+    "JOB_STALE_SECONDS": 600,
+    "JOB_HEARTBEAT_SECONDS": 30,
+    "ORDERING": "static",
+    "REPAIR_MOVES": 0,
+    "REPAIR_CHECKS": 1000000,
+    "PORTFOLIO_SIZE": 1,
+    "MAX_PORTFOLIO": 16,
+    "PRESOLVE": False,
+    "SPREAD": False,
+    "PROFILE_ALLOWLIST": [],
+    "PROFILE_TOP": 30,
+    "PROFILE_INTERVAL": 0.005,
+    "PROFILE_DIR": None,
+    "RESULT_CACHE": True,
+    "ENGINE": "greedy",
+    "SOLVER_TIME_LIMIT": 30,
+    "MAX_SOLVER_TIME_LIMIT": 300,
+    "LOCAL_SEARCH_SECONDS": 0,
+    "MAX_LOCAL_SEARCH_SECONDS": 300,
+    "LOCAL_SEARCH_ITERATIONS": None,
+    "LOCAL_SEARCH_WEIGHTS": {
+        "unassigned": 1000,
+        "group_gap": 10,
+        "same_day": 5,
+        "room_waste": 0,
+    },
+}
+
+
+def get_setting(name):
+    """Значення з settings.SCHEDULE_GENERATOR або типове з DEFAULTS."""
+    return getattr(settings, "SCHEDULE_GENERATOR", {}).get(name, DEFAULTS[name])
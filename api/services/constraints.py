@@ -0,0 +1,173 @@
+from array import array
+
+SEQUENTIAL_TYPE = "sequential_lessons"
+
+
+class PlanConstraints:
+    """
+    Обмеження, що стосуються одного навчального плану, вже розібрані з JSON.
+    """
+
+    __slots__ = (
+        "days_off", "blocked_periods", "teacher_daily_limit", "group_daily_limits",
+        "follower", "leader",
+    )
+
+    def __init__(self):
+        self.days_off = set()
+        # (str(day_of_week), period_number), як у ключах конфігурації time_block
+        self.blocked_periods = set()
+        # max_daily_lessons: ліміт для викладача та ліміти по окремих групах
+        self.teacher_daily_limit = None
+        self.group_daily_limits = {}
+        # Конфігурація sequential_lessons, де план є лідером / послідовником
+        self.follower = None
+        self.leader = None
+
+
+EMPTY_PLAN_CONSTRAINTS = PlanConstraints()
+
+
+def compile_constraints(constraints, plans, stream_groups=None):
+    """
+    Будує для кожного плану (PlanView) PlanConstraints з активних SemesterConstraint.
+
+    Обмеження прив'язуються до плану через викладача, групу, потік або групу,
+    що входить до потоку плану. sequential_lessons прив'язуються через
+    leader_plan_id / follower_plan_id незалежно від сутності.
+
+    max_daily_lessons потоку діє на кожну групу потоку, тож і на власні
+    плани групи. Склад потоків береться з планів потоків та stream_groups
+    (stream_id -> id груп) для потоків без планів.
+    """
+    by_teacher = {}
+    by_group = {}
+    by_stream = {}
+    teacher_limits = {}
+    group_limits = {}
+    stream_limits = {}
+    leaders = {}
+    followers = {}
+
+    for c in constraints:
+        cfg = c.configuration or {}
+        if cfg.get("type") == SEQUENTIAL_TYPE:
+            val = cfg.get("value") or {}
+            leaders.setdefault(val.get("leader_plan_id"), val)
+            followers.setdefault(val.get("follower_plan_id"), val)
+            continue
+
+        if cfg.get("type") == "max_daily_lessons":
+            limit = cfg.get("value", 4)
+            for limits, key in ((teacher_limits, c.teacher_id), (group_limits, c.group_id), (stream_limits, c.stream_id)):
+                if key:
+                    limits[key] = min(limit, limits.get(key, limit))
+            continue
+
+        if c.group_id:
+            by_group.setdefault(c.group_id, []).append(cfg)
+        if c.teacher_id:
+            by_teacher.setdefault(c.teacher_id, []).append(cfg)
+        if c.stream_id:
+            by_stream.setdefault(c.stream_id, []).append(cfg)
+
+    members = {stream_id: set(group_ids) for stream_id, group_ids in (stream_groups or {}).items()}
+    for plan in plans:
+        if plan.stream_id:
+            members.setdefault(plan.stream_id, set()).update(plan.group_ids)
+    for stream_id, limit in stream_limits.items():
+        for group_id in members.get(stream_id, ()):
+            group_limits[group_id] = min(limit, group_limits.get(group_id, limit))
+
+    compiled = {}
+    for plan in plans:
+        group_ids = plan.group_ids
+        configs = list(by_teacher.get(plan.teacher_id, ()))
+        if plan.stream_id:
+            configs.extend(by_stream.get(plan.stream_id, ()))
+        for group_id in group_ids:
+            configs.extend(by_group.get(group_id, ()))
+
+        pc = PlanConstraints()
+        pc.teacher_daily_limit = teacher_limits.get(plan.teacher_id)
+
+        for group_id in group_ids:
+            limit = group_limits.get(group_id)
+            if limit is not None:
+                pc.group_daily_limits[group_id] = limit
+
+        for cfg in configs:
+            ctype = cfg.get("type")
+            if ctype == "day_off":
+                pc.days_off.update(cfg.get("days", []))
+            elif ctype == "time_block":
+                for day_key, periods in (cfg.get("value") or {}).items():
+                    pc.blocked_periods.update((day_key, p) for p in periods)
+
+        pc.follower = leaders.get(plan.id)
+        pc.leader = followers.get(plan.id)
+        compiled[plan.id] = pc
+
+    return compiled
+
+
+def follows_leader(slot, leader_slot, gap):
+    """
+    Чи може заняття послідовника стати в slot, якщо остання пара лідера —
+    leader_slot: gap 0 — той самий слот, gap 1 — наступна пара того ж дня,
+    інакше — пізніший день або більше gap пар між ними того ж дня.
+    """
+    if gap == 1:
+        return slot.date == leader_slot.date and slot.period_number == leader_slot.period_number + 1
+    if gap == 0:
+        return slot.id == leader_slot.id
+    if slot.date > leader_slot.date:
+        return True
+    return slot.date == leader_slot.date and slot.period_number > leader_slot.period_number + gap
+
+
+def build_candidate_slots(compiled, plans, slots):
+    """
+    Presolve статичних обмежень: для кожного плану повертає масив індексів
+    слотів (позицій у slots), з яких може початися заняття — duration пар
+    поспіль в один день, усі доступні (is_available) і не заборонені
+    day_off / time_block. Плани з однаковими статичними обмеженнями та
+    тривалістю отримують спільний масив.
+    """
+    masks = {}
+    result = {}
+    for plan in plans:
+        pc = compiled.get(plan.id, EMPTY_PLAN_CONSTRAINTS)
+        key = (frozenset(pc.days_off), frozenset(pc.blocked_periods), plan.duration)
+        mask = masks.get(key)
+        if mask is None:
+            mask = masks[key] = allowed_run_starts(pc, slots, plan.duration)
+        result[plan.id] = mask
+    return result
+
+
+def allowed_run_starts(pc, slots, length):
+    """
+    Індекси слотів, з яких починається length дозволених пар поспіль в один
+    день. Довжини серій рахуються одним проходом з кінця.
+    """
+    runs = [0] * (len(slots) + 1)
+    for idx in range(len(slots) - 1, -1, -1):
+        slot = slots[idx]
+        if not is_slot_allowed(pc, slot):
+            continue
+        runs[idx] = 1
+        if idx + 1 < len(slots):
+            following = slots[idx + 1]
+            if following.date == slot.date and following.period_number == slot.period_number + 1:
+                runs[idx] += runs[idx + 1]
+    return array("I", (idx for idx in range(len(slots)) if runs[idx] >= length))
+
+
+def is_slot_allowed(pc, slot):
+    """Чи дозволяють слот статичні обмеження плану та is_available."""
+    return (
+        slot.is_available
+        and slot.day_of_week not in pc.days_off
+        and (str(slot.day_of_week), slot.period_number) not in pc.blocked_periods
+    )
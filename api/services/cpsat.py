@@ -0,0 +1,265 @@
+import time
+from importlib.util import find_spec
+
+from api.services.constraints import follows_leader
+
+
+def is_available():
+    """Чи встановлено OR-Tools (необов'язкова залежність)."""
+    return find_spec("ortools") is not None
+
+
+class CpSatSearch:
+    """
+    Модель CP-SAT однієї компоненти: булева змінна на кожну пару (план,
+    слот домену), максимізується кількість розміщених.
+
+    Аудиторії моделюються умовою Холла по порогах місткості в межах типу
+    (і для всіх аудиторій разом), конкретні кімнати призначаються після
+    розв'язання паросполученням у кожному слоті. Усі обмеження моделі —
+    необхідні умови, тому межа розв'язувача є чесною нижньою межею
+    нерозподілених, а знайдений розклад ще раз перевіряється методами
+    генератора.
+    """
+
+    def __init__(self, model, deadline, seed=0):
+        self.model = model
+        self.gen = model.gen
+        self.deadline = deadline
+        self.seed = seed
+        # Глибина плану в ланцюжку sequential_lessons: у спільному слоті
+        # replay перевіряє лідера раніше за послідовника
+        self.depth = [0] * len(model.plans)
+        for i in range(len(model.plans)):
+            j = model.leaders[i]
+            while j is not None and self.depth[i] < len(model.plans):
+                self.depth[i] += 1
+                j = model.leaders[j]
+
+    def solve(self, best_unassigned, hint=()):
+        from ortools.sat.python import cp_model
+
+        m = self.model
+        gen = self.gen
+        occ = gen.occupancy
+        plans = m.plans
+        cp = cp_model.CpModel()
+
+        # Заняття, що почалося в idx, займає слоти idx .. idx + duration - 1
+        x = {}
+        covering = {}
+        for i, domain in enumerate(m.domains):
+            for idx in domain:
+                x[i, idx] = cp.NewBoolVar(f"p{plans[i].id}_s{idx}")
+                for k in range(plans[i].duration):
+                    covering.setdefault(idx + k, []).append((i, idx))
+            if domain:
+                cp.Add(sum(x[i, idx] for idx in domain) <= m.counts[i])
+
+        for members in m.resources.values():
+            if len(members) < 2:
+                continue
+            per_slot = {}
+            for i in members:
+                for idx in m.domains[i]:
+                    for k in range(plans[i].duration):
+                        per_slot.setdefault(idx + k, []).append(x[i, idx])
+            for items in per_slot.values():
+                if len(items) > 1:
+                    cp.AddAtMostOne(items)
+
+        for load, key, limit, members in m.daily_limits:
+            per_day = {}
+            for i in members:
+                for idx in m.domains[i]:
+                    per_day.setdefault(occ.slot_day[idx], (idx, []))[1].append((plans[i].duration, x[i, idx]))
+            for idx, items in per_day.values():
+                capacity = limit - load(key, idx)
+                if sum(weight for weight, _ in items) > capacity:
+                    cp.Add(sum(weight * var for weight, var in items) <= capacity)
+
+        exam_days = {}
+        for i, plan in enumerate(plans):
+            if not plan.is_exam:
+                continue
+            for group_id in plan.group_ids:
+                for idx in m.domains[i]:
+                    exam_days.setdefault((group_id, occ.slot_day[idx]), (idx, []))[1].append(x[i, idx])
+        for _, items in exam_days.values():
+            if len(items) > 1:
+                cp.AddAtMostOne(items)
+
+        for idx, starts in covering.items():
+            self.add_room_capacity(cp, x, idx, starts)
+
+        self.add_sequential(cp, x)
+
+        for plan_id, idx, _ in hint:
+            i = m.index[plan_id]
+            if idx is not None and (i, idx) in x:
+                cp.AddHint(x[i, idx], 1)
+
+        cp.Maximize(sum(x.values()))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.0, self.deadline - time.monotonic())
+        solver.parameters.random_seed = self.seed
+        status = solver.Solve(cp)
+
+        total = sum(m.counts)
+        lower_bound = max(m.lower_bound, total - int(solver.BestObjectiveBound()))
+        outcome = {
+            "assigned": None,
+            "unassigned": best_unassigned,
+            "proven": False,
+            "lower_bound": lower_bound,
+            "nodes": solver.NumBranches(),
+        }
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return outcome
+
+        chosen = {}
+        for (i, idx), var in x.items():
+            if solver.Value(var):
+                chosen.setdefault(idx, []).append(i)
+        assigned = self.replay(chosen)
+
+        unassigned = total - len(assigned)
+        outcome["proven"] = unassigned <= lower_bound
+        if unassigned < best_unassigned:
+            outcome["assigned"] = assigned
+            outcome["unassigned"] = unassigned
+        if outcome["proven"]:
+            outcome["lower_bound"] = outcome["unassigned"]
+        return outcome
+
+    def add_room_capacity(self, cp, x, idx, starts):
+        """
+        Умова Холла для порогів місткості: занять у слоті idx з аудиторією >= a
+        не більше, ніж вільних кімнат місткістю >= a — окремо для кожного типу
+        і для всіх. starts — пари (план, слот початку) занять, що покривають idx.
+        """
+        plans = self.model.plans
+        is_room_busy = self.gen.occupancy.is_room_busy
+        free = [r for r in self.gen.room_pool.buckets[None][1] if not is_room_busy(r.id, idx)]
+
+        type_ids = {plans[i].room_type_id for i, _ in starts} | {None}
+        for type_id in type_ids:
+            typed = [(i, start) for i, start in starts if type_id is None or plans[i].room_type_id == type_id]
+            rooms = [r for r in free if type_id is None or r.room_type_id == type_id]
+            for size in {plans[i].audience_size for i, _ in typed}:
+                items = [x[i, start] for i, start in typed if plans[i].audience_size >= size]
+                supply = sum(1 for r in rooms if r.capacity >= size)
+                if len(items) > supply:
+                    cp.Add(sum(items) <= supply)
+
+    def add_sequential(self, cp, x):
+        """
+        sequential_lessons. replay ставить заняття в порядку слотів, і
+        check_sequential порівнює слот послідовника з останньою парою лідера
+        на той момент. Для старту f послідовника latest — найпізніша
+        допустима остання пара лідера; тоді заняття в f вимагає, щоб жодне
+        заняття лідера з початком не пізніше f не закінчувалося після latest,
+        а хоча б одне закінчувалося саме в latest (gap 0 і 1) або не пізніше.
+        Закріплені та збережені заняття лідера (last_slots) вже стоять.
+        """
+        m = self.model
+        gen = self.gen
+        plans = m.plans
+        for i, j, leader_id, gap in m.chains:
+            fixed = gen.last_slots.get(leader_id)
+            fixed = gen.occupancy.index_of(fixed.id) if fixed else None
+            exact = gap in (0, 1)
+            leader_runs = []
+            if j is not None:
+                leader_runs = [(start, start + plans[j].duration - 1, x[j, start]) for start in m.domains[j]]
+
+            for f in m.domains[i]:
+                var = x[i, f]
+                latest = self.latest_leader_end(f, gap)
+                if latest is None or (fixed is not None and fixed > latest):
+                    cp.Add(var == 0)
+                    continue
+                late = [v for start, end, v in leader_runs if start <= f and end > latest]
+                if late:
+                    cp.Add(sum(late) == 0).OnlyEnforceIf(var)
+                if fixed is not None and (fixed == latest or not exact):
+                    continue
+                support = [v for _, end, v in leader_runs if (end == latest if exact else end <= latest)]
+                if support:
+                    cp.AddBoolOr(support).OnlyEnforceIf(var)
+                else:
+                    cp.Add(var == 0)
+
+    def latest_leader_end(self, f, gap):
+        """Найпізніший слот, після якого як останньої пари лідера послідовник може стати в f."""
+        slots = self.gen.all_slots
+        slot = slots[f]
+        e = f
+        while e >= 0 and slots[e].date == slot.date:
+            if follows_leader(slot, slots[e], gap):
+                return e
+            e -= 1
+        # Для gap >= 2 підходить будь-яка пара попередніх днів
+        if gap in (0, 1) or e < 0:
+            return None
+        return e
+
+    def replay(self, chosen):
+        """
+        Призначає аудиторії та проходить розв'язок перевірками генератора в
+        порядку слотів. Заняття, що не пройшли, лишаються нерозподіленими.
+        Пам'ять генератора після виклику не змінюється.
+        """
+        m = self.model
+        gen = self.gen
+        assigned = []
+        last_slots = {plan.id: gen.last_slots.get(plan.id) for plan in m.plans}
+        for idx in sorted(chosen):
+            rooms = self.match_rooms(chosen[idx], idx)
+            for i in sorted(chosen[idx], key=self.depth.__getitem__):
+                plan = m.plans[i]
+                room = rooms.get(i)
+                if room is None or not m.is_assignable(plan, idx):
+                    continue
+                gen.register_memory(plan, gen.all_slots[idx], room)
+                assigned.append((i, idx, room))
+
+        for i, idx, room in assigned:
+            gen.unregister_memory(m.plans[i], gen.all_slots[idx], room)
+        for plan_id, slot in last_slots.items():
+            if slot is None:
+                gen.last_slots.pop(plan_id, None)
+            else:
+                gen.last_slots[plan_id] = slot
+        return assigned
+
+    def match_rooms(self, members, idx):
+        """Паросполучення заняття -> вільна аудиторія у слоті (алгоритм Куна)."""
+        plans = self.model.plans
+        is_room_busy = self.gen.occupancy.is_room_busy
+        rooms = self.gen.room_pool.buckets[None][1]
+        options = {
+            i: [
+                r for r in rooms
+                if not is_room_busy(r.id, idx, plans[i].duration)
+                and r.capacity >= plans[i].audience_size
+                and (plans[i].room_type_id is None or r.room_type_id == plans[i].room_type_id)
+            ]
+            for i in members
+        }
+        owner = {}
+
+        def augment(i, seen):
+            for room in options[i]:
+                if room.id in seen:
+                    continue
+                seen.add(room.id)
+                if room.id not in owner or augment(owner[room.id][0], seen):
+                    owner[room.id] = (i, room)
+                    return True
+            return False
+
+        for i in sorted(members, key=lambda i: -plans[i].audience_size):
+            augment(i, set())
+        return {i: room for i, room in owner.values()}
@@ -0,0 +1,71 @@
+from collections import Counter
+
+
+def lesson_diff(current, proposed):
+    """
+    Різниця між поточними й запропонованими незакріпленими заняттями.
+
+    Обидва списки — рядки (plan_id, slot_id, room_id), по рядку на пару;
+    slot_id None означає нерозподілене заняття. У межах плану рядок, що
+    зник, і рядок, що з'явився, утворюють переміщення (спершу в тому самому
+    слоті — змінилася лише аудиторія); решта — додані або видалені.
+    """
+    before = _by_plan(current)
+    after = _by_plan(proposed)
+
+    added, moved, removed, unassigned = [], [], [], {}
+    for plan_id in sorted(before.keys() | after.keys()):
+        old_placed, old_unassigned = before.get(plan_id, (Counter(), 0))
+        new_placed, new_unassigned = after.get(plan_id, (Counter(), 0))
+
+        came = {}
+        for slot_id, room_id in sorted((new_placed - old_placed).elements(), key=_row_key):
+            came.setdefault(slot_id, []).append(room_id)
+        gone = []
+        for slot_id, room_id in sorted((old_placed - new_placed).elements(), key=_row_key):
+            rooms = came.get(slot_id)
+            if rooms:
+                moved.append([plan_id, slot_id, room_id, slot_id, rooms.pop(0)])
+            else:
+                gone.append((slot_id, room_id))
+        came = [(slot_id, room_id) for slot_id, rooms in sorted(came.items()) for room_id in rooms]
+
+        for (old_slot, old_room), (new_slot, new_room) in zip(gone, came):
+            moved.append([plan_id, old_slot, old_room, new_slot, new_room])
+        removed.extend([plan_id, slot_id, room_id] for slot_id, room_id in gone[len(came):])
+        added.extend([plan_id, slot_id, room_id] for slot_id, room_id in came[len(gone):])
+        if new_unassigned > old_unassigned:
+            unassigned[plan_id] = new_unassigned - old_unassigned
+
+    return {
+        "summary": {
+            "added": len(added),
+            "moved": len(moved),
+            "removed": len(removed),
+            "newly_unassigned": sum(unassigned.values()),
+        },
+        # [plan_id, slot_id, room_id]
+        "added": added,
+        # [plan_id, старий slot_id, стара room_id, новий slot_id, нова room_id]
+        "moved": moved,
+        "removed": removed,
+        # plan_id -> скільки занять плану більше не розміщено
+        "newly_unassigned": unassigned,
+    }
+
+
+def _by_plan(rows):
+    plans = {}
+    for plan_id, slot_id, room_id in rows:
+        placed, unassigned = plans.get(plan_id, (Counter(), 0))
+        if slot_id is None:
+            unassigned += 1
+        else:
+            placed[(slot_id, room_id)] += 1
+        plans[plan_id] = (placed, unassigned)
+    return plans
+
+
+def _row_key(row):
+    slot_id, room_id = row
+    return slot_id, room_id or 0
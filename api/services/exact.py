@@ -0,0 +1,482 @@
+import time
+from bisect import bisect_left
+
+ENGINES = ("greedy", "csp", "cpsat")
+
+# Записи журналу відкату (trail) пошуку з поверненнями
+_SET, _DOMAIN, _MEMORY, _ASSIGNED = range(4)
+
+
+class ComponentModel:
+    """
+    Спільна для точних рушіїв модель однієї компоненти планів.
+
+    Домени — candidate_slots, звужені станом пам'яті на момент побудови
+    (закріплені, збережені заняття та інші компоненти). Обмеження
+    монотонні — заняття лише додаються, — тож відкинутий тут слот не може
+    стати допустимим пізніше.
+    """
+
+    def __init__(self, generator, plans):
+        self.gen = generator
+        self.plans = plans
+        self.index = {plan.id: i for i, plan in enumerate(plans)}
+        self.counts = [generator.lesson_counts[plan.id] for plan in plans]
+        self.domains = [self.static_domain(plan) for plan in plans]
+
+        # Ресурс (teacher / group / stream) -> індекси планів, що його займають
+        self.resources = {}
+        for i, plan in enumerate(plans):
+            keys = [("teacher", plan.teacher_id)]
+            keys.extend(("group", group_id) for group_id in plan.group_ids)
+            if plan.stream_id:
+                keys.append(("stream", plan.stream_id))
+            for key in keys:
+                self.resources.setdefault(key, []).append(i)
+
+        self.neighbors = [set() for _ in plans]
+        for members in self.resources.values():
+            for i in members:
+                self.neighbors[i].update(members)
+        self.neighbors = [sorted(items) for items in self.neighbors]
+
+        # Розбиття планів для нижньої межі пошуку: за викладачем і за групою
+        # (потокові плани до групового розбиття не входять)
+        self.partitions = []
+        for key_of in (lambda plan: plan.teacher_id, lambda plan: plan.group_id):
+            owner = [key_of(plan) for plan in plans]
+            members = {}
+            for i, key in enumerate(owner):
+                if key is not None:
+                    members.setdefault(key, []).append(i)
+            self.partitions.append((owner, members))
+
+        # sequential_lessons: (послідовник, лідер у компоненті або None, id лідера, gap)
+        self.leaders = []
+        self.chains = []
+        for i, plan in enumerate(plans):
+            seq_config = generator.get_plan_constraints(plan).leader
+            leader_id = seq_config["leader_plan_id"] if seq_config else None
+            self.leaders.append(self.index.get(leader_id))
+            if seq_config:
+                self.chains.append((i, self.leaders[i], leader_id, seq_config["time_gap"]))
+
+        self.daily_limits = self.build_daily_limits()
+        self.bottlenecks = self.find_bottlenecks()
+        plan_deficit = sum(max(0, count - len(dom)) for count, dom in zip(self.counts, self.domains))
+        self.lower_bound = max([plan_deficit] + [b["demand"] - b["slots"] for b in self.bottlenecks])
+
+    def static_domain(self, plan):
+        gen = self.gen
+        domain = []
+        for idx in gen.candidate_slots[plan.id]:
+            if not gen.check_slot(plan, idx, sequential=False): continue
+            if not gen.find_free_room(plan, gen.all_slots[idx]): continue
+            domain.append(idx)
+        return domain
+
+    def build_daily_limits(self):
+        """
+        max_daily_lessons як (функція навантаження, ключ, ліміт, плани).
+
+        Перевірка жадібного алгоритму залежить від порядку, тому для ліміту L
+        беруться лише плани з лімітом <= L: останнє з їхніх занять ставилося
+        при навантаженні < L, отже разом їх не більше L — необхідна умова.
+        """
+        occ = self.gen.occupancy
+        teacher_limits = {}
+        group_limits = {}
+        for i, plan in enumerate(self.plans):
+            pc = self.gen.get_plan_constraints(plan)
+            if pc.teacher_daily_limit is not None:
+                teacher_limits.setdefault(plan.teacher_id, {})[i] = pc.teacher_daily_limit
+            for group_id, limit in pc.group_daily_limits.items():
+                group_limits.setdefault(group_id, {})[i] = limit
+
+        result = []
+        for load, table in ((occ.teacher_day_load, teacher_limits), (occ.group_day_load, group_limits)):
+            for key, by_plan in table.items():
+                for limit in sorted(set(by_plan.values())):
+                    members = [i for i, value in by_plan.items() if value <= limit]
+                    result.append((load, key, limit, members))
+        return result
+
+    def find_bottlenecks(self):
+        """
+        Принцип Діріхле по ресурсах: викладачу чи групі потрібно більше
+        занять, ніж є допустимих слотів у всіх їхніх планів разом.
+        """
+        result = []
+        for (kind, key), members in self.resources.items():
+            demand = sum(self.counts[i] for i in members)
+            slots = set()
+            for i in members:
+                slots.update(self.domains[i])
+            if demand > len(slots):
+                result.append({"resource": kind, "id": key, "demand": demand, "slots": len(slots)})
+        return result
+
+    def free_rooms(self, plan, idx):
+        """Вільні у слоті idx аудиторії, по одній на кожну пару (місткість, тип)."""
+        bucket = self.gen.room_pool.buckets.get(plan.room_type_id)
+        if bucket is None:
+            return
+        capacities, rooms = bucket
+        is_room_busy = self.gen.occupancy.is_room_busy
+        seen = set()
+        for pos in range(bisect_left(capacities, plan.audience_size), len(rooms)):
+            room = rooms[pos]
+            key = (room.capacity, room.room_type_id)
+            if key in seen or is_room_busy(room.id, idx, plan.duration):
+                continue
+            seen.add(key)
+            yield room
+
+    def is_assignable(self, plan, idx):
+        return self.gen.check_slot(plan, idx)
+
+
+class BacktrackingSearch:
+    """
+    Пошук з поверненнями (гілки та межі) за мінімумом нерозподілених занять.
+
+    Змінна — наступне заняття плану. Заняття одного плану взаємозамінні,
+    тому вони ставляться у зростаючому порядку слотів, а гілка "пропустити"
+    закриває план — решта його занять нерозподілені. Наступним обирається
+    план з найменшим запасом вільних слотів (MRV); послідовник — одразу після
+    відповідного заняття лідера, як у жадібному проході (інакше для gap 0
+    і 1 поруч з останньою парою лідера може не лишитися місця).
+
+    Forward checking: зайнятий слот вилучається з доменів планів зі спільним
+    викладачем, групою чи потоком. Для нерівностей між заняттями це й є
+    дугова узгодженість. Нижня межа для відсікання гілок — сума по
+    викладачах (або по групах) дефіциту слотів: скільки занять не вміститься
+    у вільні слоти їхніх доменів. Усі зміни стану, зокрема пам'ять
+    генератора, записуються в trail і відкочуються при поверненні.
+    """
+
+    CHECK_EVERY = 256
+
+    def __init__(self, model, deadline):
+        self.model = model
+        self.gen = model.gen
+        self.deadline = deadline
+        self.nodes = 0
+
+    def solve(self, best_unassigned):
+        """
+        Шукає розклад з меншою кількістю нерозподілених, ніж best_unassigned.
+        Повертає словник: assigned — [(індекс плану, індекс слота, room)] або
+        None, якщо покращення не знайдено; unassigned; proven — чи доведено
+        оптимальність (простір пошуку вичерпано або досягнуто нижньої межі).
+        """
+        m = self.model
+        self.dom = [set(domain) for domain in m.domains]
+        self.last = [-1] * len(m.plans)
+        self.remaining = list(m.counts)
+        self.placed = [0] * len(m.plans)
+        self.avail = [len(domain) for domain in self.dom]
+        self.bounds = [
+            {key: self.resource_bound(items) for key, items in members.items()}
+            for _, members in m.partitions
+        ]
+        # [нерозподілені, межа за викладачами, межа за групами]
+        self.totals = [0] + [sum(bounds.values()) for bounds in self.bounds]
+        lower_bound = max(m.lower_bound, self.lower_bound())
+        self.assigned = []
+        self.trail = []
+        self.best = None
+        self.best_unassigned = best_unassigned
+
+        stack = []
+        proven = lower_bound >= best_unassigned
+        if not proven:
+            stack.append(self.open_frame())
+
+        while stack:
+            if self.nodes % self.CHECK_EVERY == 0 and time.monotonic() >= self.deadline:
+                break
+
+            mark, choices = stack[-1]
+            self.undo(mark)
+            choice = next(choices, None)
+            if choice is None:
+                stack.pop()
+                continue
+
+            self.nodes += 1
+            self.apply(choice)
+            if self.totals[0] + self.lower_bound() >= self.best_unassigned:
+                continue
+
+            frame = self.open_frame()
+            if frame is not None:
+                stack.append(frame)
+                continue
+
+            self.best_unassigned = self.totals[0]
+            self.best = list(self.assigned)
+            if self.best_unassigned <= lower_bound:
+                proven = True
+                break
+        else:
+            proven = True
+
+        self.undo(0)
+        return {
+            "assigned": self.best,
+            "unassigned": self.best_unassigned,
+            "proven": proven,
+            "lower_bound": self.best_unassigned if proven else lower_bound,
+            "nodes": self.nodes,
+        }
+
+    def lower_bound(self):
+        return max(self.totals[1], self.totals[2])
+
+    def resource_bound(self, members):
+        """
+        Скільки занять планів, що попарно конфліктують, точно не вміститься:
+        більше з суми дефіцитів окремих планів і дефіциту їх спільного
+        об'єднання доступних слотів.
+        """
+        remaining = 0
+        deficits = 0
+        slots = set()
+        for j in members:
+            if self.remaining[j]:
+                remaining += self.remaining[j]
+                deficits += max(0, self.remaining[j] - self.avail[j])
+                last = self.last[j]
+                slots.update(x for x in self.dom[j] if x > last)
+        return max(deficits, remaining - len(slots))
+
+    def refresh_bounds(self, plans):
+        for p, (owner, members) in enumerate(self.model.partitions):
+            bounds = self.bounds[p]
+            for key in {owner[j] for j in plans} - {None}:
+                value = self.resource_bound(members[key])
+                if value != bounds[key]:
+                    self.set(self.totals, p + 1, self.totals[p + 1] + value - bounds[key])
+                    self.set(bounds, key, value)
+
+    def open_frame(self):
+        m = self.model
+        chosen = None
+        chosen_key = None
+        for i, remaining in enumerate(self.remaining):
+            if remaining == 0:
+                continue
+            leader = m.leaders[i]
+            if leader is not None and self.remaining[leader] > 0 and self.placed[i] >= self.placed[leader]:
+                continue
+            urgent = leader is not None and self.placed[i] < self.placed[leader]
+            key = (not urgent, self.avail[i] - remaining)
+            if chosen is None or key < chosen_key:
+                chosen, chosen_key = i, key
+
+        if chosen is None:
+            return None
+        return len(self.trail), self.choices(chosen)
+
+    def choices(self, i):
+        # Генератор обчислюється ліниво вже після відкату до стану свого вузла
+        m = self.model
+        plan = m.plans[i]
+        last = self.last[i]
+        for idx in sorted(x for x in self.dom[i] if x > last):
+            if m.is_assignable(plan, idx):
+                for room in m.free_rooms(plan, idx):
+                    yield i, idx, room
+        yield i, None, None
+
+    def set(self, container, key, value):
+        self.trail.append((_SET, container, key, container[key]))
+        container[key] = value
+
+    def apply(self, choice):
+        i, idx, room = choice
+        totals = self.totals
+
+        if idx is None:
+            self.set(totals, 0, totals[0] + self.remaining[i])
+            self.set(self.remaining, i, 0)
+            self.refresh_bounds((i,))
+            return
+
+        plan = self.model.plans[i]
+        gen = self.gen
+        self.trail.append((_MEMORY, plan, idx, room, gen.last_slots.get(plan.id)))
+        gen.register_memory(plan, gen.all_slots[idx], room)
+        self.trail.append((_ASSIGNED,))
+        self.assigned.append(choice)
+
+        touched = self.model.neighbors[i]
+        self.set(self.remaining, i, self.remaining[i] - 1)
+        self.set(self.placed, i, self.placed[i] + 1)
+        self.set(self.last, i, idx)
+        plans = self.model.plans
+        for j in touched:
+            domain = self.dom[j]
+            # Заняття сусіда, що почалося б у цих межах, перетнулося б із поставленим
+            for start in range(idx - plans[j].duration + 1, idx + plan.duration):
+                if start in domain:
+                    domain.discard(start)
+                    self.trail.append((_DOMAIN, j, start))
+                    if j != i and start > self.last[j]:
+                        self.set(self.avail, j, self.avail[j] - 1)
+        self.set(self.avail, i, sum(1 for x in self.dom[i] if x > idx))
+        self.refresh_bounds(touched)
+
+    def undo(self, mark):
+        trail = self.trail
+        gen = self.gen
+        while len(trail) > mark:
+            entry = trail.pop()
+            kind = entry[0]
+            if kind == _SET:
+                entry[1][entry[2]] = entry[3]
+            elif kind == _DOMAIN:
+                self.dom[entry[1]].add(entry[2])
+            elif kind == _MEMORY:
+                _, plan, idx, room, last_slot = entry
+                gen.unregister_memory(plan, gen.all_slots[idx], room)
+                if last_slot is None:
+                    gen.last_slots.pop(plan.id, None)
+                else:
+                    gen.last_slots[plan.id] = last_slot
+            else:
+                self.assigned.pop()
+
+
+def solve_exact(generator, components, placements, engine, time_limit):
+    """
+    Точний рушій поверх жадібного розміщення: компоненти без нерозподілених
+    занять уже оптимальні, решта розв'язуються заново з жадібним результатом
+    як початковою межею. Час ділиться порівну між компонентами, що лишилися;
+    невикористаний переходить до наступних.
+
+    Повертає (placements, stats). stats["solved_by"] — скільки компонент
+    закрито нижньою межею ("bound"), CP-SAT ("cp-sat") чи пошуком з
+    поверненнями ("search"). Для компонент, де доведено, що частина
+    занять не вміщується, stats["certificate"] містить мінімальну кількість
+    нерозподілених і "вузькі місця" за принципом Діріхле.
+    """
+    started = time.monotonic()
+    deadline = started + time_limit
+
+    by_plan = {}
+    for placement in placements:
+        by_plan.setdefault(placement[0], []).append(placement)
+
+    pending = []
+    result = []
+    for component in components:
+        current = [p for plan in component for p in by_plan.get(plan.id, ())]
+        if any(idx is None for _, idx, _ in current):
+            pending.append((component, current))
+        else:
+            result.extend(current)
+
+    unassigned_before = sum(1 for _, idx, _ in placements if idx is None)
+    stats = {
+        "engine": engine,
+        "components": len(pending),
+        "nodes": 0,
+        "unassigned_before": unassigned_before,
+        "lower_bound": 0,
+        "solved_by": {},
+        "certificate": [],
+    }
+    all_proven = True
+
+    for k, (component, current) in enumerate(pending):
+        release_placements(generator, current)
+        model = ComponentModel(generator, component)
+        component_deadline = time.monotonic() + (deadline - time.monotonic()) / (len(pending) - k)
+        greedy_unassigned = sum(1 for _, idx, _ in current if idx is None)
+
+        if model.lower_bound >= greedy_unassigned:
+            outcome = {
+                "assigned": None, "unassigned": greedy_unassigned, "proven": True,
+                "lower_bound": greedy_unassigned, "nodes": 0,
+            }
+            proof = "bound"
+        elif engine == "cpsat":
+            from api.services.cpsat import CpSatSearch
+            outcome = CpSatSearch(model, component_deadline, seed=generator.seed).solve(greedy_unassigned, current)
+            proof = "cp-sat"
+        else:
+            outcome = BacktrackingSearch(model, component_deadline).solve(greedy_unassigned)
+            proof = "search"
+
+        if outcome["assigned"] is not None:
+            current = component_placements(model, outcome["assigned"])
+        restore_placements(generator, current)
+        result.extend(current)
+
+        stats["solved_by"][proof] = stats["solved_by"].get(proof, 0) + 1
+        stats["nodes"] += outcome["nodes"]
+        stats["lower_bound"] += outcome["lower_bound"]
+        all_proven = all_proven and outcome["proven"]
+        if outcome["proven"] and outcome["unassigned"] > 0:
+            stats["certificate"].append({
+                "plans": [plan.id for plan in component],
+                "min_unassigned": outcome["unassigned"],
+                "proof": "bound" if outcome["unassigned"] <= model.lower_bound else proof,
+                "bottlenecks": model.bottlenecks,
+            })
+
+    unassigned_after = sum(1 for _, idx, _ in result if idx is None)
+    if unassigned_after == 0:
+        status = "feasible"
+    elif all_proven:
+        status = "infeasible"
+    else:
+        status = "timeout"
+
+    stats.update({
+        "status": status,
+        "unassigned_after": unassigned_after,
+        "seconds": round(time.monotonic() - started, 3),
+    })
+    return result, stats
+
+
+def component_placements(model, assigned):
+    """Розміщення (plan_id, індекс слота, room_id) за результатом рушія."""
+    placed = [0] * len(model.plans)
+    result = []
+    for i, idx, room in sorted(assigned, key=lambda a: (a[0], a[1])):
+        placed[i] += 1
+        result.append((model.plans[i].id, idx, room.id))
+    for i, plan in enumerate(model.plans):
+        result.extend([(plan.id, None, None)] * (model.counts[i] - placed[i]))
+    return result
+
+
+def release_placements(generator, placements):
+    """
+    Знімає розміщення компоненти з пам'яті генератора та повертає
+    last_slots її планів до стану закріплених і збережених занять.
+    """
+    rooms = generator.room_pool.rooms_by_id
+    plan_ids = set()
+    for plan_id, idx, room_id in placements:
+        plan_ids.add(plan_id)
+        if idx is not None:
+            generator.unregister_memory(generator.plans_map[plan_id], generator.all_slots[idx], rooms[room_id])
+
+    # Остання пара (а не перша) закріпленого чи збереженого заняття, як її записав register_memory
+    for plan_id in plan_ids:
+        if plan_id in generator.fixed_last_slots:
+            generator.last_slots[plan_id] = generator.fixed_last_slots[plan_id]
+        else:
+            generator.last_slots.pop(plan_id, None)
+
+
+def restore_placements(generator, placements):
+    rooms = generator.room_pool.rooms_by_id
+    for plan_id, idx, room_id in sorted(placements, key=lambda p: (p[1] is None, p[1] or 0)):
+        if idx is not None:
+            generator.register_memory(generator.plans_map[plan_id], generator.all_slots[idx], rooms[room_id])
@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+
+def digest(payload):
+    """Стабільний sha1 від JSON-серіалізованого payload."""
+    data = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def plan_fingerprint(plan, pc):
+    """
+    Відбиток вхідних даних одного плану: сам план (PlanView) та всі
+    обмеження, що до нього застосовуються.
+    """
+    return digest([
+        plan.teacher_id,
+        sorted(plan.group_ids),
+        plan.stream_id,
+        plan.audience_size,
+        plan.room_type_id,
+        plan.class_type_id,
+        plan.amount,
+        plan.duration,
+        plan.is_exam,
+        sorted(pc.days_off, key=repr),
+        sorted(pc.blocked_periods, key=repr),
+        pc.teacher_daily_limit,
+        sorted(pc.group_daily_limits.items()),
+        pc.leader,
+        pc.follower,
+    ])
+
+
+def input_fingerprint(plan_fingerprints, constraints, slots, rooms, locked):
+    """
+    Відбиток усіх вхідних даних запуску генерації: відбитків планів
+    (plan_id -> plan_fingerprint, разом зі складом груп і розібраними
+    обмеженнями), активних обмежень, слотів, аудиторій та закріплених
+    занять (plan_id, slot_id, room_id). Однаковий відбиток означає однакову
+    задачу розміщення.
+    """
+    return digest([
+        sorted(plan_fingerprints.items()),
+        sorted(
+            (c.id, c.teacher_id, c.group_id, c.stream_id, c.room_id, c.configuration)
+            for c in constraints
+        ),
+        [(s.id, s.date, s.period_number, s.day_of_week, s.week_type, s.is_available) for s in slots],
+        sorted((r.id, r.room_type_id, r.capacity) for r in rooms),
+        sorted(locked, key=repr),
+    ])
+
+
+def lessons_fingerprint(rows):
+    """Відбиток набору занять (plan_id, slot_id, room_id) незалежно від порядку рядків."""
+    return digest(sorted(rows, key=lambda row: (row[0], row[1] or 0, row[2] or 0)))
@@ -1,9 +1,12 @@
+import copy
 import logging
-from collections import defaultdict
+import random
+from bisect import bisect_left
 from datetime import timedelta
+from itertools import islice
 
-from django.db import transaction
-from django.db.models import Q, Prefetch
+from django.db import connection, transaction
+from django.utils import timezone
 
 from api.models import (
     StudyPlan,
@@ -11,115 +14,355 @@ from api.models import (
     TimeSlot,
     Room,
     Semester,
-    SemesterConstraint
+    SemesterConstraint,
+    ClassType,
+    Stream,
+    GenerationSnapshot,
+    GenerationRun
 )
+from api.services.occupancy import OccupancyIndex
+from api.services.room_pool import RoomPool
+from api.services.constraints import (
+    compile_constraints, build_candidate_slots, follows_leader, EMPTY_PLAN_CONSTRAINTS
+)
+from api.services.conf import get_setting
+from api.services.plans import PlanView
+from api.services.parallel import split_components, place_components_in_pool, run_portfolio_in_pool
+from api.services.fingerprint import plan_fingerprint, input_fingerprint, lessons_fingerprint
+from api.services.local_search import LocalSearch
+from api.services.exact import solve_exact
+from api.services.template import WeekTemplate
+from api.services.saturation import SaturationScheduler
+from api.services.repair import EjectionRepair
+from api.services.presolve import feasibility_report
+from api.services.metrics import GenerationMetrics, counted
+from api.services.diff import lesson_diff
 
 logger = logging.getLogger("schedule_generator")
-logger.setLevel(logging.INFO)
+
+EXAM_MARKERS = ("екзамен", "exam")
+
+
+def is_exam_type(name):
+    name = name.lower()
+    return any(marker in name for marker in EXAM_MARKERS)
 
 class ScheduleGenerator:
-    def __init__(self, semester_id: int):
-        self.semester = Semester.objects.get(id=semester_id)
+    OPTIONS = (
+        "batch_size", "workers", "incremental", "improve_seconds", "seed", "engine", "time_limit", "template",
+        "ordering", "repair_moves", "portfolio", "presolve", "spread",
+    )
+    # Налаштування, від яких залежить результат, але які не є параметрами запуску
+    RESULT_SETTINGS = ("REPAIR_CHECKS", "LOCAL_SEARCH_WEIGHTS", "LOCAL_SEARCH_ITERATIONS")
+
+    def __init__(self, semester_id: int, batch_size=None, workers=None, incremental=False,
+                 improve_seconds=None, seed=0, engine=None, time_limit=None, template=False, ordering=None,
+                 repair_moves=None, portfolio=None, presolve=None, spread=None, force=False, dry_run=False,
+                 progress=None):
+        self.metrics = GenerationMetrics()
+        self.metrics.enter("load")
+        with connection.execute_wrapper(self.metrics.count_query):
+            self.semester = Semester.objects.get(id=semester_id)
+            self.constraints = list(
+                SemesterConstraint.objects.filter(
+                    semester=self.semester, 
+                    is_active=True
+                ).select_related("group", "teacher", "stream").order_by("id")
+            )
+            self.all_slots = list(
+                TimeSlot.objects.filter(semester=self.semester).order_by("date", "period_number")
+            )
+            self.exam_class_type_ids = {
+                ct_id for ct_id, name in ClassType.objects.values_list("id", "name") if is_exam_type(name)
+            }
+        self.metrics.stop()
+
+        self.batch_size = batch_size or get_setting("BULK_BATCH_SIZE")
+        self.workers = workers or get_setting("WORKERS")
+        self.incremental = incremental
+        self.improve_seconds = improve_seconds if improve_seconds is not None else get_setting("LOCAL_SEARCH_SECONDS")
+        self.seed = seed
+        self.engine = engine or get_setting("ENGINE")
+        self.time_limit = time_limit if time_limit is not None else get_setting("SOLVER_TIME_LIMIT")
+        self.template = template
+        self.ordering = ordering or get_setting("ORDERING")
+        self.repair_moves = repair_moves if repair_moves is not None else get_setting("REPAIR_MOVES")
+        # Кількість спроб з різним порядком планів (1 — одна детермінована)
+        self.portfolio = portfolio or get_setting("PORTFOLIO_SIZE")
+        # Не запускати генерацію, якщо presolve довів нерозв'язність
+        self.presolve = presolve if presolve is not None else get_setting("PRESOLVE")
+        # Наступне заняття плану шукати з того ж дня тижня й пари через тиждень
+        self.spread = spread if spread is not None else get_setting("SPREAD")
+        # Генерувати навіть тоді, коли є придатний результат у кеші
+        self.force = force
+        # Лише розмістити в пам'яті й повернути різницю з поточними заняттями
+        self.dry_run = dry_run
+        # progress(done, total, **counters) викликається під час розміщення
+        self.progress = progress
+        self.processed = 0
+        self.total_lessons = 0
         
-        self.constraints = list(
-            SemesterConstraint.objects.filter(
-                semester=self.semester, 
-                is_active=True
-            ).select_related("group", "teacher", "stream")
-        )
+        self.plan_constraints = {}
+        self.candidate_slots = {}
+        self.fingerprints = {}
+        # Відбиток усіх вхідних даних запуску (input_fingerprint)
+        self.input_hash = None
+        # (plan_id, slot_id, room_id) закріплених занять
+        self.locked_lessons = []
+        # Скільки занять кожного плану розміщувати в цьому запуску (типово amount)
+        self.lesson_counts = {}
+        # Плани перевантажених викладачів і груп (find_overloaded_plans), їх не ремонтують
+        self.overloaded_plans = set()
 
-        self.memory_schedule = defaultdict(list)
+        self.occupancy = OccupancyIndex((s.id, s.date) for s in self.all_slots)
+        self.slot_keys = [(s.date, s.period_number) for s in self.all_slots]
+        # plan_id -> позиція в candidate_slots, до якої всі слоти вже відкинуті
+        self.scan_from = {}
         self.logs = []
         self.plans_map = {}
+        self.last_slots = {}
+        # (plan_id, індекс слота) закріплених і збережених (incremental) занять
+        self.fixed_placements = []
+        # last_slots лише із закріпленими і збереженими заняттями (до розміщення)
+        self.fixed_last_slots = {}
+        self.room_pool = None
+        self.week_template = None
+        # Клітинки шаблону, зайняті кожним планом (режим template)
+        self.template_cells = {}
+        # plan_id -> [(клітинка, індекси її слотів з candidate_slots)]
+        self.template_dates = {}
 
     def log(self, message):
-        print(message)
         logger.info(message)
         self.logs.append(message)
 
-    @transaction.atomic
     def generate(self):
+        """
+        Запуск генерації; відповідь доповнюється блоком metrics і id запису
+        GenerationRun. Пробний запуск (dry_run) в історію не записується.
+        """
+        started_at = timezone.now()
+        with connection.execute_wrapper(self.metrics.count_query):
+            result = self.run_generation()
+        self.metrics.stop()
+        result["metrics"] = self.metrics.as_dict()
+        result["run"] = None if self.dry_run else self.record_run(result, started_at).id
+        return result
+
+    def record_run(self, result, started_at):
+        """Зберігає запуск в історії генерацій (результат — без logs)."""
+        metrics = result["metrics"]
+        is_reusable = bool(result.get("success")) and self.is_deterministic()
+        return GenerationRun.objects.create(
+            semester=self.semester,
+            options=self.run_options(),
+            engine=self.engine,
+            input_hash=self.input_hash or "",
+            success=bool(result.get("success")),
+            created=result.get("created", 0),
+            unassigned=result.get("unassigned", 0),
+            seconds=metrics["seconds"],
+            phases=metrics["phases"],
+            queries=metrics["queries"],
+            result={key: value for key, value in result.items() if key != "logs"},
+            error=result.get("error", ""),
+            is_reusable=is_reusable,
+            lessons_hash=self.current_lessons_hash() if is_reusable else "",
+            started_at=started_at,
+            finished_at=timezone.now(),
+        )
+
+    def run_options(self):
+        """Параметри запуску та RESULT_SETTINGS — ключ кешу разом з input_hash."""
+        options = {name: getattr(self, name) for name in self.OPTIONS}
+        options["settings"] = {name: get_setting(name) for name in self.RESULT_SETTINGS}
+        return options
+
+    def is_deterministic(self):
+        """
+        Чи дають ті самі вхідні дані той самий розклад: лише етапи без ліміту
+        часу. Жадібний прохід і EjectionRepair (бюджет REPAIR_CHECKS, а не
+        секунди) детерміновані; точні рушії та local search — ні.
+        """
+        return self.engine == "greedy" and not self.improve_seconds
+
+    def current_lessons_hash(self):
+        """Відбиток незакріплених занять семестру, як вони зараз записані в БД."""
+        return lessons_fingerprint(
+            Lesson.objects.filter(study_plan__semester=self.semester, is_locked=False)
+            .values_list("study_plan_id", "time_slot_id", "room_id")
+        )
+
+    def find_cached_run(self):
+        """
+        Останній успішний запуск семестру, якщо його результат можна
+        повернути без генерації: той самий відбиток вхідних даних, ті самі
+        параметри, а згенеровані заняття відтоді не редагувалися вручну
+        (той самий lessons_hash). Інакше None.
+        """
+        if self.force or self.dry_run or not get_setting("RESULT_CACHE") or not self.is_deterministic():
+            return None
+        last = GenerationRun.objects.filter(semester=self.semester, success=True).order_by("-started_at").first()
+        if not (last and last.is_reusable and last.input_hash == self.input_hash and last.options == self.run_options()):
+            return None
+        return last if last.lessons_hash == self.current_lessons_hash() else None
+
+    def run_generation(self):
         try:
             self.log(f"Starting generation for: {self.semester.name}")
 
-            Lesson.objects.filter(study_plan__semester=self.semester, is_locked=False).delete()
-            self.load_locked_lessons_to_memory()
+            presolve = None
+            if self.presolve:
+                self.metrics.enter("presolve")
+                presolve = feasibility_report(self.semester)
+                if not presolve["feasible"]:
+                    self.log("Presolve: not all lessons can be placed, generation skipped")
+                    return {
+                        "success": False,
+                        "error": "Semester is infeasible (see presolve report)",
+                        "presolve": presolve,
+                        "logs": self.logs,
+                    }
 
-            plans = list(
-                StudyPlan.objects.filter(semester=self.semester)
-                .select_related("group", "stream", "teacher", "subject", "class_type")
-                .prefetch_related("stream__groups") 
-            )
+            self.metrics.enter("load")
+            plans = [
+                PlanView(p, is_exam=p.class_type_id in self.exam_class_type_ids)
+                for p in StudyPlan.objects.filter(semester=self.semester)
+                .select_related("group", "stream", "class_type")
+                .prefetch_related("stream__groups")
+            ]
             self.plans_map = {p.id: p for p in plans}
-            
+
+            self.load_locked_lessons_to_memory()
+
             if not plans:
                 return {"success": False, "error": "No study plans found"}
-            
+
+            self.plan_constraints = compile_constraints(self.constraints, plans, self.load_stream_groups())
+
+            self.metrics.enter("sort")
             sorted_plans = self.sort_plans(plans)
+            self.metrics.enter("load")
 
-            time_slots = list(TimeSlot.objects.filter(
-                semester=self.semester, is_available=True
-            ).order_by("date", "period_number"))
-            
-            if not time_slots:
+            if not any(s.is_available for s in self.all_slots):
+                if not self.dry_run:
+                    self.delete_unlocked_lessons()
                 return {"success": False, "error": "No time slots found"}
 
-            created_count = 0
-            unassigned_count = 0
-            max_iterations = 0
-            
-            if not sorted_plans:
-                 max_iterations = 0
+            self.candidate_slots = build_candidate_slots(self.plan_constraints, plans, self.all_slots)
+            self.room_pool = RoomPool(Room.objects.order_by("capacity", "id"))
+            self.fingerprints = {p.id: plan_fingerprint(p, self.get_plan_constraints(p)) for p in plans}
+            self.input_hash = input_fingerprint(
+                self.fingerprints, self.constraints, self.all_slots, self.room_pool.rooms_by_id.values(), self.locked_lessons
+            )
+            cached = self.find_cached_run()
+            if cached:
+                self.log(f"Input unchanged since run #{cached.id}, generation skipped")
+                return {**cached.result, "cached": True, "cached_run": cached.id, "logs": self.logs}
+            current = None
+            if self.dry_run:
+                # Поточні заняття читаються разом з рештою вхідних даних
+                current = list(
+                    Lesson.objects.filter(study_plan__semester=self.semester, is_locked=False)
+                    .values_list("id", "study_plan_id", "time_slot_id", "room_id")
+                )
+            self.lesson_counts = {p.id: p.amount for p in plans}
+            if self.template:
+                self.week_template = WeekTemplate(self.all_slots)
+                self.week_template.load(self.occupancy)
+                self.log(f"Template mode: {len(self.week_template)} week cells for {len(self.all_slots)} slots")
+
+            mode = "full"
+            kept_count = 0
+            delete_ids = None
+            if self.incremental:
+                self.metrics.enter("incremental")
+                previous = self.load_previous_fingerprints()
+                if previous is None:
+                    self.log("No previous generation found, running full generation")
+                else:
+                    mode = "incremental"
+                    dirty = self.find_dirty_plans(previous)
+                    kept_count, delete_ids = self.keep_valid_lessons(dirty)
+                    self.log(
+                        f"Incremental: {len(dirty)} changed plans, {kept_count} lessons kept, "
+                        f"{len(delete_ids)} lessons removed"
+                    )
+
+            sorted_plans = [p for p in sorted_plans if self.lesson_counts[p.id] > 0]
+            self.total_lessons = sum(self.lesson_counts[p.id] for p in sorted_plans)
+            if self.portfolio > 1:
+                # Кожна спроба портфеля розміщує всі заняття
+                self.total_lessons *= self.portfolio
+
+            if self.repair_moves:
+                self.overloaded_plans = self.find_overloaded_plans(sorted_plans)
+                if self.overloaded_plans:
+                    self.log(f"Repair: {len(self.overloaded_plans)} plans of overloaded teachers or groups skipped")
+
+            self.metrics.enter("sort")
+            components = split_components(sorted_plans, self.plan_constraints, self.room_pool.buckets.keys() - {None})
+            self.fixed_last_slots = dict(self.last_slots)
+            self.metrics.enter("placement")
+            portfolio = None
+            if self.portfolio > 1:
+                placements, created_count, unassigned_count, portfolio = self.place_portfolio(sorted_plans)
+            else:
+                placements, created_count, unassigned_count = self.place_components(components)
+
+            solver = None
+            if self.engine != "greedy":
+                self.metrics.enter("solver")
+                placements, solver = solve_exact(self, components, placements, self.engine, self.time_limit)
+                unassigned_count = solver["unassigned_after"]
+                created_count = len(placements) - unassigned_count
+                self.log(
+                    f"Exact solver ({self.engine}): {solver['status']}, unassigned "
+                    f"{solver['unassigned_before']} -> {solver['unassigned_after']} in {solver['seconds']}s"
+                )
+
+            local_search = None
+            if self.improve_seconds:
+                self.metrics.enter("local_search")
+                placements, local_search = LocalSearch(
+                    self, placements, get_setting("LOCAL_SEARCH_WEIGHTS"), seed=self.seed
+                ).run(self.improve_seconds, get_setting("LOCAL_SEARCH_ITERATIONS"))
+                unassigned_count = sum(1 for _, idx, _ in placements if idx is None)
+                created_count = len(placements) - unassigned_count
+                self.log(
+                    f"Local search: {local_search['iterations']} iterations, penalty "
+                    f"{local_search['initial_penalty']} -> {local_search['final_penalty']}"
+                )
+
+            diff = None
+            if self.dry_run:
+                self.metrics.enter("diff")
+                diff = self.diff_lessons(placements, current, delete_ids)
+                self.log(
+                    "Dry run: {added} added, {moved} moved, {removed} removed, "
+                    "{newly_unassigned} newly unassigned".format(**diff["summary"])
+                )
             else:
-                 max_iterations = max(p.amount for p in sorted_plans)
-
-            for i in range(max_iterations):
-                for plan in sorted_plans:
-                    if i >= plan.amount:
-                        continue
-
-                    target_name = plan.group.name if plan.group else (plan.stream.name if plan.stream else "Unknown")
-
-                    try:
-                        slot = None
-                        room = None
-                        
-                        with transaction.atomic():
-                            slot, room = self.find_and_assign_slot(plan, time_slots)
-                            
-                            if slot and room:
-                                Lesson.objects.create(study_plan=plan, time_slot=slot, room=room)
-                                self.register_memory(plan, slot, room)
-                                created_count += 1
-                            else:
-                                Lesson.objects.create(
-                                    study_plan=plan, 
-                                    time_slot=None, 
-                                    room=None,
-                                    is_locked=False
-                                )
-                                self.log(f"Warning: No slot found for {target_name} (lesson {i+1}). Added to Unassigned.")
-                                unassigned_count += 1
-                    except Exception as e:
-                        self.log(f"Error processing lesson: {str(e)}")
-                        try:
-                            Lesson.objects.create(
-                                study_plan=plan, 
-                                time_slot=None, 
-                                room=None,
-                                is_locked=False
-                            )
-                            unassigned_count += 1
-                        except:
-                            pass
+                self.metrics.enter("persistence")
+                self.save_lessons(placements, delete_ids)
+            self.metrics.stop()
 
             status_msg = "completed successfully" if unassigned_count == 0 else f"completed with {unassigned_count} unassigned lessons"
             self.log(f"Generation {status_msg}. Created: {created_count}")
 
             return {
                 "success": True,
+                "mode": mode,
+                "template": self.template,
                 "created": created_count,
+                "kept": kept_count,
                 "unassigned": unassigned_count,
+                "presolve": presolve,
+                "portfolio": portfolio,
+                "solver": solver,
+                "local_search": local_search,
+                "dry_run": self.dry_run,
+                "diff": diff,
                 "logs": self.logs,
                 "message": status_msg
             }
@@ -133,223 +376,762 @@ class ScheduleGenerator:
                 "error": str(e)
             }
 
+    def place_components(self, components):
+        """
+        Розставляє незалежні компоненти планів послідовно або в пулі процесів
+        (self.workers > 1). Результати об'єднуються в порядку компонент, тож
+        розклад не залежить від кількості процесів.
+        """
+        if self.workers > 1 and len(components) > 1:
+            results = []
+            for result in place_components_in_pool(self, components, self.workers):
+                results.append(result)
+                placements, _, _, logs, checks = result
+                self.logs.extend(logs)
+                self.metrics.merge(checks)
+                for plan_id, idx, room_id in placements:
+                    if idx is not None:
+                        self.register_memory(
+                            self.plans_map[plan_id], self.all_slots[idx], self.room_pool.rooms_by_id[room_id]
+                        )
+                self.report_progress(len(placements))
+        else:
+            results = [self.place_lessons(component) for component in components]
+
+        placements = []
+        created_count = 0
+        unassigned_count = 0
+        for result in results:
+            placements.extend(result[0])
+            created_count += result[1]
+            unassigned_count += result[2]
+        return placements, created_count, unassigned_count
+
+    def place_portfolio(self, sorted_plans):
+        """
+        Портфель: self.portfolio спроб розміщення з різним розв'язанням
+        нічиїх у sort_plans (спроба 0 — звичайний порядок, спроба k —
+        random.Random(seed + k)), кожна на власній копії пам'яті, у пулі з
+        self.workers процесів. Перемагає спроба з найменшою кількістю
+        нерозподілених, далі — з меншим штрафом LocalSearch; її розміщення
+        реєструються в пам'яті генератора.
+        """
+        plan_ids = [p.id for p in sorted_plans]
+        attempts = range(self.portfolio)
+        if self.workers > 1:
+            results = run_portfolio_in_pool(self, plan_ids, attempts, self.workers)
+        else:
+            results = (self.place_attempt(plan_ids, attempt) for attempt in attempts)
+
+        scores = []
+        best = None
+        for attempt, (placements, created, unassigned, penalty, logs, checks) in zip(attempts, results):
+            self.metrics.merge(checks)
+            scores.append({"attempt": attempt, "unassigned": unassigned, "penalty": round(penalty, 3)})
+            if best is None or (unassigned, penalty) < best[0]:
+                best = ((unassigned, penalty), attempt, placements, created, unassigned, logs)
+            self.report_progress(len(placements))
+
+        _, best_attempt, placements, created_count, unassigned_count, logs = best
+        self.logs.extend(logs)
+        for plan_id, idx, room_id in placements:
+            if idx is not None:
+                self.register_memory(self.plans_map[plan_id], self.all_slots[idx], self.room_pool.rooms_by_id[room_id])
+        self.log(
+            f"Portfolio: best of {self.portfolio} attempts is #{best_attempt} "
+            f"with {unassigned_count} unassigned (" + ", ".join(str(s["unassigned"]) for s in scores) + ")"
+        )
+        return placements, created_count, unassigned_count, {
+            "size": self.portfolio,
+            "seed": self.seed,
+            "best": best_attempt,
+            "attempts": scores,
+        }
+
+    def place_attempt(self, plan_ids, attempt):
+        """
+        Одна спроба портфеля на копії пам'яті (генератор не змінюється).
+        Повертає (placements, created, unassigned, штраф, logs, лічильники перевірок).
+        """
+        attempt_gen = self.fork()
+        rng = random.Random(self.seed + attempt) if attempt else None
+        plans = self.sort_plans([self.plans_map[plan_id] for plan_id in plan_ids], rng)
+        components = split_components(plans, self.plan_constraints, self.room_pool.buckets.keys() - {None})
+        placements, created, unassigned = attempt_gen.place_components(components)
+        penalty = LocalSearch(attempt_gen, placements, get_setting("LOCAL_SEARCH_WEIGHTS")).total_cost()
+        return placements, created, unassigned, penalty, attempt_gen.logs, attempt_gen.metrics.checks()
+
+    def fork(self):
+        """Копія генератора з власною пам'яттю розміщення для окремої спроби."""
+        other = copy.copy(self)
+        other.occupancy = copy.deepcopy(self.occupancy)
+        other.last_slots = dict(self.last_slots)
+        other.scan_from = dict(self.scan_from)
+        other.template_cells = {plan_id: set(cells) for plan_id, cells in self.template_cells.items()}
+        if self.week_template is not None:
+            other.week_template = self.week_template.copy()
+        other.logs = []
+        other.metrics = self.metrics.spawn()
+        other.workers = 1
+        other.progress = None
+        return other
+
+    def place_lessons(self, sorted_plans):
+        """
+        Розставляє заняття лише в пам'яті. Повертає розміщення
+        (plan_id, індекс слота, room_id) — для нерозподілених індекс та
+        аудиторія None — та лічильники.
+        """
+        if self.template:
+            return self.place_template_lessons(sorted_plans)
+        if self.ordering == "dsatur":
+            return SaturationScheduler(self).run(sorted_plans)
+
+        placements = []
+        created_count = 0
+        unassigned_count = 0
+        counts = self.lesson_counts
+        max_iterations = max((counts[p.id] for p in sorted_plans), default=0)
+        repair = None
+        if self.repair_moves:
+            repair = EjectionRepair(self, placements, self.repair_moves, get_setting("REPAIR_CHECKS"))
+
+        for i in range(max_iterations):
+            for plan in sorted_plans:
+                if i >= counts[plan.id]:
+                    continue
+
+                target_name = plan.target_name
+
+                slot = None
+                room = None
+                try:
+                    slot, room = self.find_and_assign_slot(plan)
+                    if not (slot and room) and repair:
+                        slot, room = repair.place(plan)
+                    if not (slot and room):
+                        self.log(f"Warning: No slot found for {target_name} (lesson {i+1}). Added to Unassigned.")
+                except Exception as e:
+                    self.log(f"Error processing lesson: {str(e)}")
+                    slot, room = None, None
+
+                if slot and room:
+                    self.register_memory(plan, slot, room)
+                    placements.append((plan.id, self.occupancy.index_of(slot.id), room.id))
+                    created_count += 1
+                else:
+                    placements.append((plan.id, None, None))
+                    unassigned_count += 1
+
+                self.report_progress(1)
+
+        return placements, created_count, unassigned_count
+
+    def find_overloaded_plans(self, plans):
+        """
+        Плани викладачів і груп, яким лишилося розмістити більше пар, ніж є
+        вільних слотів серед candidate_slots їхніх планів (умова teachers /
+        groups з feasibility_report, але на пам'яті генератора). Частина
+        таких занять лишиться нерозподіленою за будь-яких витіснень, тож
+        EjectionRepair лише витратив би на них бюджет.
+        """
+        resources = {}
+        for plan in plans:
+            covered = set(self.candidate_slots[plan.id])
+            for k in range(1, plan.duration):
+                covered.update(idx + k for idx in self.candidate_slots[plan.id])
+            keys = [("teacher", plan.teacher_id)]
+            keys.extend(("group", group_id) for group_id in plan.group_ids)
+            for key in keys:
+                entry = resources.setdefault(key, {"demand": 0, "slots": set(), "plans": []})
+                entry["demand"] += self.lesson_counts[plan.id] * plan.duration
+                entry["slots"] |= covered
+                entry["plans"].append(plan.id)
+
+        overloaded = set()
+        occupancy = self.occupancy
+        for (kind, resource_id), entry in resources.items():
+            if kind == "teacher":
+                free = sum(1 for idx in entry["slots"] if not occupancy.is_teacher_busy(resource_id, idx))
+            else:
+                free = sum(1 for idx in entry["slots"] if not occupancy.is_audience_busy((resource_id,), None, idx))
+            if entry["demand"] > free:
+                overloaded.update(entry["plans"])
+        return overloaded
+
+    def place_template_lessons(self, sorted_plans):
+        """
+        Режим шаблону: план отримує клітинки сітки тижня, а не окремі слоти.
+        Клітинка одразу розгортається в усі свої дати; дати, що не проходять
+        перевірки (свята, закріплені заняття, ліміти), пропускаються як
+        винятки. За один прохід кожен план отримує щонайбільше одну клітинку.
+        """
+        template = self.week_template
+        for plan_id, idx in self.fixed_placements:
+            self.template_cells.setdefault(plan_id, set()).add(template.cell_of[idx])
+
+        placements = []
+        created_count = 0
+        unassigned_count = 0
+        needed = {p.id: self.lesson_counts[p.id] for p in sorted_plans}
+
+        active = list(sorted_plans)
+        while active:
+            next_round = []
+            for plan in active:
+                key, dated = self.find_template_cell(plan, needed[plan.id])
+                if key is None:
+                    count = needed[plan.id]
+                    self.log(f"Warning: No template cell found for {plan.target_name} ({count} lessons). Added to Unassigned.")
+                    placements.extend([(plan.id, None, None)] * count)
+                    unassigned_count += count
+                    self.report_progress(count)
+                    continue
+
+                self.template_cells.setdefault(plan.id, set()).add(key)
+                for idx, room in dated:
+                    self.register_memory(plan, self.all_slots[idx], room)
+                    placements.append((plan.id, idx, room.id))
+                created_count += len(dated)
+                needed[plan.id] -= len(dated)
+                self.report_progress(len(dated))
+                if needed[plan.id] > 0:
+                    next_round.append(plan)
+            active = next_round
+
+        return placements, created_count, unassigned_count
+
+    def find_template_cell(self, plan, needed):
+        """
+        Клітинка шаблону, що дає плану найбільше дат (не більше needed), та
+        її розгортання [(індекс слота, room)]. Аудиторія за можливості одна
+        на всі дати клітинки.
+
+        Дати клітинки переглядаються лише тоді, коли вона може дати більше
+        за поточну найкращу: межу дають статичні кандидати та лічильники
+        зайнятості шаблону. Якщо всі ресурси плану в клітинці вільні, а
+        денних лімітів та екзаменів немає, дати не перевіряються зовсім.
+        """
+        template = self.week_template
+        pc = self.get_plan_constraints(plan)
+        used = self.template_cells.get(plan.id, ())
+        resources = [("teacher", plan.teacher_id)]
+        resources.extend(("group", group_id) for group_id in plan.group_ids)
+        if plan.stream_id is not None:
+            resources.append(("stream", plan.stream_id))
+        checked = plan.is_exam or pc.teacher_daily_limit is not None or pc.group_daily_limits
+
+        best_key, best_dated = None, []
+        for key, dates in self.get_template_dates(plan):
+            if key in used or min(len(dates), needed) <= len(best_dated):
+                continue
+            run = template.run_of(key, plan.duration)
+            if min(len(dates), needed, template.free_dates(resources, run)) <= len(best_dated):
+                continue
+            if pc.leader and not self.check_sequential_cell(plan, key):
+                continue
+
+            free = not checked and template.busy_dates(resources, run) == 0
+            dated = self.expand_template_cell(plan, dates, needed, run, free)
+            if len(dated) > len(best_dated):
+                best_key, best_dated = key, dated
+                if len(dated) == needed:
+                    break
+
+        return best_key, best_dated
+
+    def get_template_dates(self, plan):
+        """Кандидати плану, згруповані за клітинками в порядку template.keys (рахуються один раз)."""
+        cells = self.template_dates.get(plan.id)
+        if cells is None:
+            template = self.week_template
+            by_cell = {}
+            for idx in self.candidate_slots[plan.id]:
+                by_cell.setdefault(template.cell_pos[idx], []).append(idx)
+            cells = self.template_dates[plan.id] = [(template.keys[pos], by_cell[pos]) for pos in sorted(by_cell)]
+        return cells
+
+    def expand_template_cell(self, plan, dates, needed, run, free):
+        if free:
+            dates = dates[:needed]
+        else:
+            dates = list(islice((idx for idx in dates if self.is_date_free(plan, idx)), needed))
+
+        room = self.find_template_room(plan, dates, run)
+        dated = []
+        for idx in dates:
+            date_room = room or self.find_free_room(plan, self.all_slots[idx])
+            if date_room:
+                dated.append((idx, date_room))
+        return dated
+
+    def is_date_free(self, plan, idx):
+        return self.check_slot(plan, idx, sequential=False)
+
+    def find_template_room(self, plan, dates, run):
+        """Найменша аудиторія, вільна в усі дати клітинки."""
+        bucket = self.room_pool.buckets.get(plan.room_type_id)
+        if bucket is None:
+            return None
+        capacities, rooms = bucket
+        busy_dates = self.week_template.busy_dates
+        is_room_busy = self.occupancy.is_room_busy
+        for pos in range(bisect_left(capacities, plan.audience_size), len(rooms)):
+            room = rooms[pos]
+            if not busy_dates([("room", room.id)], run):
+                return room
+            if not any(is_room_busy(room.id, idx, plan.duration) for idx in dates):
+                return room
+        return None
+
+    def check_sequential_cell(self, plan, key):
+        """check_sequential на сітці шаблону: порівнюються клітинки лідера того ж типу тижня."""
+        seq_config = self.get_plan_constraints(plan).leader
+        gap = seq_config["time_gap"]
+        week_type, day, period = key
+
+        for l_week_type, l_day, l_period in self.template_cells.get(seq_config["leader_plan_id"], ()):
+            if l_week_type != week_type:
+                continue
+            if gap == 0:
+                if (l_day, l_period) == (day, period): return True
+            elif gap == 1:
+                if l_day == day and period == l_period + 1: return True
+            elif day > l_day or (day == l_day and period > l_period + gap):
+                return True
+        return False
+
+    def report_progress(self, done):
+        self.processed += done
+        if self.progress:
+            self.progress(self.processed, self.total_lessons)
+
+    def delete_unlocked_lessons(self):
+        # На Lesson ніщо не посилається і сигналів видалення немає, тож
+        # delete() виконується одним DELETE без вибірки рядків.
+        Lesson.objects.filter(
+            study_plan__in=StudyPlan.objects.filter(semester=self.semester).values("id"),
+            is_locked=False,
+        ).delete()
+
+    def load_previous_fingerprints(self):
+        snapshot = GenerationSnapshot.objects.filter(semester=self.semester).first()
+        if snapshot is None:
+            return None
+        return {int(plan_id): fp for plan_id, fp in snapshot.plan_fingerprints.items()}
+
+    def find_dirty_plans(self, previous):
+        """
+        Плани, вхідні дані яких змінилися з минулого запуску, разом із
+        пов'язаними через sequential_lessons (послідовник залежить від лідера).
+        """
+        return self.with_chained(plan_id for plan_id, fp in self.fingerprints.items() if previous.get(plan_id) != fp)
+
+    def with_chained(self, plan_ids):
+        """plan_ids разом з усіма планами, пов'язаними з ними через sequential_lessons."""
+        dirty = set(plan_ids)
+        stack = list(dirty)
+        while stack:
+            pc = self.plan_constraints.get(stack.pop(), EMPTY_PLAN_CONSTRAINTS)
+            for cfg in (pc.leader, pc.follower):
+                for key in ("leader_plan_id", "follower_plan_id"):
+                    plan_id = cfg.get(key) if cfg else None
+                    if plan_id in self.plans_map and plan_id not in dirty:
+                        dirty.add(plan_id)
+                        stack.append(plan_id)
+        return dirty
+
+    def keep_valid_lessons(self, dirty):
+        """
+        Реєструє в пам'яті чинні заняття незмінених планів і зменшує
+        lesson_counts на їх кількість. Заняття змінених планів, нерозподілені,
+        а також ті, що тепер конфліктують (із закріпленими, слотами, аудиторіями
+        чи обмеженнями), підуть на повторне розміщення.
+
+        Якщо розміщуватиметься заново хоча б одне заняття плану з
+        sequential_lessons, увесь ланцюжок додається до dirty і відбір
+        повторюється з початкового стану пам'яті: інакше перенесений лідер
+        міг би опинитися після збереженого заняття послідовника.
+        Повертає (кількість збережених, id занять на видалення).
+        """
+        existing = list(Lesson.objects.filter(
+            study_plan__semester=self.semester, is_locked=False
+        ).values_list("id", "study_plan_id", "time_slot_id", "room_id"))
+
+        occupancy = copy.deepcopy(self.occupancy)
+        last_slots = dict(self.last_slots)
+        fixed_placements = list(self.fixed_placements)
+        lesson_counts = dict(self.lesson_counts)
+        week_template = self.week_template.copy() if self.week_template is not None else None
+        while True:
+            kept_count, delete_ids = self.keep_lessons(existing, dirty)
+            moved = [
+                plan_id for plan_id, count in self.lesson_counts.items()
+                if count > 0 and plan_id not in dirty and self.is_chained(plan_id)
+            ]
+            if not moved:
+                return kept_count, delete_ids
+
+            dirty |= self.with_chained(moved)
+            self.occupancy = copy.deepcopy(occupancy)
+            self.last_slots = dict(last_slots)
+            self.fixed_placements = list(fixed_placements)
+            self.lesson_counts = dict(lesson_counts)
+            if week_template is not None:
+                self.week_template = week_template.copy()
+
+    def is_chained(self, plan_id):
+        pc = self.plan_constraints.get(plan_id, EMPTY_PLAN_CONSTRAINTS)
+        return pc.leader is not None or pc.follower is not None
+
+    def keep_lessons(self, existing, dirty):
+        """Один відбір keep_valid_lessons для заданого dirty."""
+        delete_ids = []
+        rows = {}
+        for lesson_id, plan_id, slot_id, room_id in existing:
+            idx = self.occupancy.index_of(slot_id) if slot_id else None
+            if plan_id in dirty or idx is None:
+                delete_ids.append(lesson_id)
+            else:
+                rows.setdefault(plan_id, []).append((idx, lesson_id, room_id))
+
+        # Заняття на кілька пар збережене кількома рядками — збираємо серії
+        candidates = []
+        for plan_id, items in rows.items():
+            length = self.plans_map[plan_id].duration
+            items.sort()
+            pos = 0
+            while pos < len(items):
+                run = items[pos:pos + length]
+                start, _, room_id = run[0]
+                if len(run) == length and all(
+                    idx == start + k and rid == room_id for k, (idx, _, rid) in enumerate(run)
+                ):
+                    candidates.append((start, plan_id, room_id, [lesson_id for _, lesson_id, _ in run]))
+                    pos += length
+                else:
+                    delete_ids.append(items[pos][1])
+                    pos += 1
+
+        kept_count = 0
+        for idx, plan_id, room_id, lesson_ids in sorted(candidates):
+            plan = self.plans_map[plan_id]
+            slot = self.all_slots[idx]
+            room = self.room_pool.rooms_by_id.get(room_id)
+
+            if self.lesson_counts[plan_id] > 0 and self.is_placement_valid(plan, slot, room):
+                self.register_memory(plan, slot, room)
+                self.fixed_placements.append((plan_id, idx))
+                self.lesson_counts[plan_id] -= 1
+                kept_count += 1
+            else:
+                delete_ids.extend(lesson_ids)
+
+        return kept_count, delete_ids
+
+    def is_placement_valid(self, plan, slot, room):
+        idx = self.occupancy.index_of(slot.id)
+        if room is None: return False
+        if not self.is_candidate(plan, idx): return False
+        if plan.room_type_id and room.room_type_id != plan.room_type_id: return False
+        if room.capacity < plan.audience_size: return False
+        if self.occupancy.is_room_busy(room.id, idx, plan.duration): return False
+        return self.check_slot(plan, idx, sequential=False)
+
+    def is_candidate(self, plan, idx):
+        candidates = self.candidate_slots[plan.id]
+        pos = bisect_left(candidates, idx)
+        return pos < len(candidates) and candidates[pos] == idx
+
+    def save_lessons(self, placements, delete_ids=None):
+        """
+        Записує результат: видаляє всі незакріплені заняття семестру (або лише
+        delete_ids в інкрементальному режимі), створює нові та оновлює знімок
+        вхідних даних. Заняття на кілька пар записується рядком на кожну пару.
+        """
+        lessons = [
+            Lesson(study_plan_id=plan_id, time_slot_id=slot_id, room_id=room_id, is_locked=False)
+            for plan_id, slot_id, room_id in self.lesson_rows(placements)
+        ]
+        with transaction.atomic():
+            if delete_ids is None:
+                self.delete_unlocked_lessons()
+            else:
+                for start in range(0, len(delete_ids), self.batch_size):
+                    Lesson.objects.filter(id__in=delete_ids[start:start + self.batch_size]).delete()
+            Lesson.objects.bulk_create(lessons, batch_size=self.batch_size)
+            GenerationSnapshot.objects.update_or_create(
+                semester=self.semester,
+                defaults={"plan_fingerprints": {str(k): v for k, v in self.fingerprints.items()}},
+            )
+
+    def lesson_rows(self, placements):
+        """Рядки Lesson (plan_id, slot_id, room_id) для розміщень — по рядку на пару."""
+        for plan_id, idx, room_id in placements:
+            if idx is None:
+                yield plan_id, None, None
+                continue
+            for k in range(self.plans_map[plan_id].duration):
+                yield plan_id, self.all_slots[idx + k].id, room_id
+
+    def diff_lessons(self, placements, current, delete_ids=None):
+        """
+        Різниця (lesson_diff) між поточними незакріпленими заняттями current
+        і тими, що записав би save_lessons: в інкрементальному режимі
+        заняття, яких немає в delete_ids, лишаються на місці.
+        """
+        kept = []
+        if delete_ids is not None:
+            delete_ids = set(delete_ids)
+            kept = [row[1:] for row in current if row[0] not in delete_ids]
+        proposed = kept + list(self.lesson_rows(placements))
+        return lesson_diff([row[1:] for row in current], proposed)
+
+    def load_stream_groups(self):
+        """Склад потоків, на які є обмеження семестру (stream_id -> id груп)."""
+        stream_ids = {c.stream_id for c in self.constraints if c.stream_id}
+        stream_groups = {}
+        if stream_ids:
+            for stream_id, group_id in Stream.groups.through.objects.filter(stream_id__in=stream_ids).values_list(
+                "stream_id", "group_id"
+            ):
+                stream_groups.setdefault(stream_id, set()).add(group_id)
+        return stream_groups
+
     def load_locked_lessons_to_memory(self):
-        locked = Lesson.objects.filter(study_plan__semester=self.semester, is_locked=True)
+        locked = (
+            Lesson.objects.filter(study_plan__semester=self.semester, is_locked=True, time_slot__isnull=False)
+            .select_related("time_slot", "room")
+        )
         for l in locked:
-            self.register_memory(l.study_plan, l.time_slot, l.room)
-
-    def register_memory(self, plan, slot, room):
-        self.memory_schedule[slot.id].append({
-            "plan_id": plan.id,
-            "teacher_id": plan.teacher_id,
-            "group_id": plan.group_id,
-            "stream_id": plan.stream_id,
-            "room_id": room.id if room else None,
-            "stream_group_ids": [g.id for g in plan.stream.groups.all()] if plan.stream else []
-        })
-
-    def sort_plans(self, plans):
-        leaders_ids = set()
-        followers_ids = set()
-
-        for c in self.constraints:
-            cfg = c.configuration
-            if cfg.get("type") == "sequential_lessons":
-                val = cfg.get("value", {})
-                if "leader_plan_id" in val:
-                    leaders_ids.add(val["leader_plan_id"])
-                if "follower_plan_id" in val:
-                    followers_ids.add(val["follower_plan_id"])
+            self.locked_lessons.append((l.study_plan_id, l.time_slot_id, l.room_id))
+            # Кожен рядок — одна пара, навіть якщо заняття триває кілька
+            self.register_memory(self.plans_map[l.study_plan_id], l.time_slot, l.room, length=1)
+            idx = self.occupancy.index_of(l.time_slot_id)
+            if idx is not None:
+                self.fixed_placements.append((l.study_plan_id, idx))
+
+    def register_memory(self, plan, slot, room, length=None):
+        """Займає ресурси плану на length пар від slot (типово plan.duration)."""
+        length = length or plan.duration
+        idx = self.occupancy.index_of(slot.id)
+        # Для послідовників важлива остання пара заняття
+        end_slot = self.all_slots[idx + length - 1] if idx is not None else slot
+
+        last = self.last_slots.get(plan.id)
+        if last is None or (end_slot.date, end_slot.period_number) > (last.date, last.period_number):
+            self.last_slots[plan.id] = end_slot
 
+        if idx is None:
+            return
+        self.occupancy.occupy(
+            idx,
+            plan.teacher_id,
+            plan.group_ids,
+            plan.stream_id,
+            room.id if room else None,
+            plan.is_exam,
+            length,
+        )
+        if self.week_template is not None:
+            self.week_template.update(self.occupancy, plan, room.id if room else None, idx, length, 1)
+
+    def unregister_memory(self, plan, slot, room, length=None):
+        idx = self.occupancy.index_of(slot.id)
+        if idx is None:
+            return
+        # Звільнені слоти могли стати допустимими для будь-якого плану
+        self.scan_from.clear()
+        self.occupancy.release(
+            idx,
+            plan.teacher_id,
+            plan.group_ids,
+            plan.stream_id,
+            room.id if room else None,
+            plan.is_exam,
+            length or plan.duration,
+        )
+        if self.week_template is not None:
+            self.week_template.update(self.occupancy, plan, room.id if room else None, idx, length or plan.duration, -1)
+
+    def get_plan_constraints(self, plan):
+        return self.plan_constraints.get(plan.id, EMPTY_PLAN_CONSTRAINTS)
+
+    def sort_plans(self, plans, rng=None):
+        """
+        Порядок розміщення. Рівні за ключем плани лишаються в порядку
+        вибірки, або, якщо задано rng, перемішуються ним (портфель).
+        """
         def sort_key(plan):
-            is_leader = plan.id in leaders_ids
-            is_follower = plan.id in followers_ids
+            pc = self.get_plan_constraints(plan)
+            is_leader = pc.follower is not None
+            is_follower = pc.leader is not None
             is_chained = is_leader or is_follower
             
             priority_group = 2
             if is_chained:
                 priority_group = 0 if is_leader else 1
             
-            is_stream = 0 if plan.stream else 1
-            is_room_req = 0 if plan.required_room_type else 1
+            is_stream = 0 if plan.stream_id else 1
+            is_room_req = 0 if plan.room_type_id else 1
             
             return (priority_group, is_stream, is_room_req, -plan.amount)
 
-        return sorted(plans, key=sort_key)
+        if rng is None:
+            return sorted(plans, key=sort_key)
+        tiebreak = {plan.id: rng.random() for plan in plans}
+        return sorted(plans, key=lambda plan: (sort_key(plan), tiebreak[plan.id]))
 
-    def find_and_assign_slot(self, plan, time_slots):
-        print(f"DEBUG: Plan ID={plan.id}, Type='{plan.class_type.name}'")
-        is_current_plan_exam = "екзамен" in plan.class_type.name.lower() or "exam" in plan.class_type.name.lower()
-        
-        follower_config = self.get_follower_config(plan.id)
+    def find_and_assign_slot(self, plan):
+        """
+        Перший допустимий слот плану та аудиторія.
 
-        for idx, slot in enumerate(time_slots):
-            if is_current_plan_exam:
-                if not self.check_exam_day_limit(plan, slot):
-                    continue
+        Поки заняття лише додаються, пам'ять тільки заповнюється, тож
+        відкинутий слот допустимим не стане: сканування починається з курсора
+        scan_from (за останнім знайденим слотом плану), а для послідовника —
+        не раніше слота лідера. unregister_memory скидає курсори.
+        У режимі spread спершу перевіряються слоти від того ж дня тижня й
+        пари через тиждень після попереднього заняття плану.
+        """
+        logger.debug("Plan ID=%s, Type=%r", plan.id, plan.class_type_name)
+        candidates = self.candidate_slots[plan.id]
+        bounds = self.sequential_bounds(plan, candidates)
+        if bounds is None:
+            return None, None
+        low, high = bounds
+        start = max(low, self.scan_from.get(plan.id, 0))
 
-            if not self.check_dynamic_constraints(plan, slot): continue
-            if not self.check_availability(plan, slot): continue
-            if not self.check_sequential(plan, slot): continue
+        preferred = self.spread_start(plan, candidates) if self.spread else None
+        if preferred is not None and start < preferred < high:
+            pos, room = self.scan_slots(plan, candidates, preferred, high)
+            if room is not None:
+                return self.all_slots[candidates[pos]], room
+            high = preferred
 
-            room = self.find_free_room(plan, slot)
-            if not room: continue
+        pos, room = self.scan_slots(plan, candidates, start, high)
+        if room is not None:
+            # Сам знайдений слот плану вже зайнятий його викладачем
+            self.scan_from[plan.id] = pos + 1
+            return self.all_slots[candidates[pos]], room
+        if high == len(candidates) or preferred is not None:
+            self.scan_from[plan.id] = len(candidates)
+        return None, None
 
-            return slot, room
+    def scan_slots(self, plan, candidates, start, stop):
+        """Перша позиція в candidates[start:stop], що проходить усі перевірки, та аудиторія."""
+        for pos in range(start, stop):
+            idx = candidates[pos]
+            if not self.check_slot(plan, idx): continue
 
+            room = self.find_free_room(plan, self.all_slots[idx])
+            if room:
+                return pos, room
         return None, None
 
-    def get_follower_config(self, plan_id):
-        for c in self.constraints:
-            cfg = c.configuration
-            if cfg.get("type") == "sequential_lessons":
-                if cfg["value"].get("leader_plan_id") == plan_id:
-                    return cfg["value"]
-        return None
+    def sequential_bounds(self, plan, candidates):
+        """
+        Межі позицій у candidates, де може стати послідовник: від слота лідера
+        (gap 0 — лише він, gap 1 — лише наступний). None, якщо лідер ще не
+        розміщений.
+        """
+        seq_config = self.get_plan_constraints(plan).leader
+        if not seq_config:
+            return 0, len(candidates)
+        l_slot = self.last_slots.get(seq_config["leader_plan_id"])
+        if not l_slot:
+            return None
+
+        l_idx = self.occupancy.index_of(l_slot.id)
+        gap = seq_config["time_gap"]
+        low = bisect_left(candidates, l_idx if gap == 0 else l_idx + 1)
+        if gap in (0, 1):
+            return low, min(low + 1, len(candidates))
+        return low, len(candidates)
+
+    def spread_start(self, plan, candidates):
+        """Позиція в candidates через тиждень від початку останнього заняття плану."""
+        last = self.last_slots.get(plan.id)
+        if last is None or self.get_plan_constraints(plan).leader:
+            return None
+        idx = self.occupancy.index_of(last.id)
+        if idx is None:
+            return None
+        first = self.all_slots[max(idx - plan.duration + 1, 0)]
+        target = bisect_left(self.slot_keys, (first.date + timedelta(days=7), first.period_number))
+        return bisect_left(candidates, target)
 
+    def check_slot(self, plan, idx, sequential=True):
+        """
+        Усі перевірки слота idx, що залежать від поточного стану розкладу
+        (статичні day_off / time_block вже враховані в candidate_slots),
+        крім вільної аудиторії; sequential=False пропускає check_sequential.
+        Єдиний ланцюжок перевірок для всіх рушіїв.
+        """
+        slot = self.all_slots[idx]
+        if plan.is_exam and not self.check_exam_day_limit(plan, slot): return False
+        if not self.check_dynamic_constraints(plan, slot): return False
+        if not self.check_availability(plan, slot): return False
+        return not sequential or self.check_sequential(plan, slot)
+
+    @counted("find_free_room")
     def find_free_room(self, plan, slot):
-        rooms = Room.objects.all().order_by("capacity")
-        scheduled = self.memory_schedule.get(slot.id, [])
-        occupied_ids = {item["room_id"] for item in scheduled}
-        needed_cap = plan.target_audience_size
-
-        for room in rooms:
-            if plan.required_room_type and room.room_type != plan.required_room_type: continue
-            if room.capacity < needed_cap: continue
-            if room.id in occupied_ids: continue
-            return room
-        return None
+        idx = self.occupancy.index_of(slot.id)
+        return self.room_pool.find_free(
+            plan.room_type_id,
+            plan.audience_size,
+            self.occupancy,
+            idx,
+            plan.duration,
+        )
 
+    @counted("check_availability")
     def check_availability(self, plan, slot):
-        items = self.memory_schedule.get(slot.id, [])
-        for item in items:
-            if item["teacher_id"] == plan.teacher_id: return False
-            
-            if plan.group:
-                if item["group_id"] == plan.group_id: return False
-                if item["stream_id"] and plan.group_id in item["stream_group_ids"]: return False
-            elif plan.stream:
-                if item["stream_id"] == plan.stream_id: return False
-                if item["group_id"] in [g.id for g in plan.stream.groups.all()]: return False
+        idx = self.occupancy.index_of(slot.id)
+        if self.occupancy.is_teacher_busy(plan.teacher_id, idx, plan.duration): return False
+        if self.occupancy.is_audience_busy(plan.group_ids, plan.stream_id, idx, plan.duration): return False
         return True
 
+    @counted("check_dynamic_constraints")
     def check_dynamic_constraints(self, plan, slot):
-        applicable = []
-        for c in self.constraints:
-            is_relevant = False
-            if c.group_id and c.group_id == plan.group_id: is_relevant = True
-            elif c.teacher_id and c.teacher_id == plan.teacher_id: is_relevant = True
-            elif c.stream_id and c.stream_id == plan.stream_id: is_relevant = True
-            elif plan.stream and c.group_id in [g.id for g in plan.stream.groups.all()]: is_relevant = True
-            if is_relevant: applicable.append(c)
-
-        for c in applicable:
-            cfg = c.configuration
-            ctype = cfg.get("type")
-            
-            if ctype == "day_off":
-                if slot.day_of_week in cfg.get("days", []): return False
-            
-            if ctype == "time_block":
-                blocks = cfg.get("value", {})
-                day_key = str(slot.day_of_week)
-                if day_key in blocks:
-                    if slot.period_number in blocks[day_key]:
-                        return False
-
-            if ctype == "max_daily_lessons":
-                limit = cfg.get("value", 4)
-                
-                count = 0
-                target_ids = []
-                if plan.group: target_ids.append(plan.group.id)
-                if plan.stream: target_ids.extend([g.id for g in plan.stream.groups.all()])
-                
-                for s_id, items in self.memory_schedule.items():
-                    pass
-
-                query = Q(time_slot__date=slot.date)
-                if plan.group:
-                    query &= (Q(study_plan__group=plan.group) | Q(study_plan__stream__groups=plan.group))
-                elif plan.teacher:
-                    query &= Q(study_plan__teacher=plan.teacher)
-                
-                existing_count = Lesson.objects.filter(query).count()
-                if existing_count >= limit:
+        """
+        Обмеження, що залежать від поточного стану розкладу. Статичні
+        day_off / time_block вже враховані в candidate_slots.
+        """
+        pc = self.get_plan_constraints(plan)
+
+        if pc.teacher_daily_limit is not None or pc.group_daily_limits:
+            idx = self.occupancy.index_of(slot.id)
+
+            if pc.teacher_daily_limit is not None:
+                if self.occupancy.teacher_day_load(plan.teacher_id, idx) + plan.duration > pc.teacher_daily_limit:
+                    return False
+
+            for group_id, limit in pc.group_daily_limits.items():
+                if self.occupancy.group_day_load(group_id, idx) + plan.duration > limit:
                     return False
 
         return True
 
+    @counted("check_exam_day_limit")
     def check_exam_day_limit(self, plan, slot):
         """
         Перевіряє, чи є вже екзамен у групи в цей день.
         """
-        my_group_ids = set()
-        if plan.group: 
-            my_group_ids.add(plan.group.id)
-        if plan.stream: 
-            my_group_ids.update(g.id for g in plan.stream.groups.all())
-
+        my_group_ids = plan.group_ids
         if not my_group_ids:
             return True
 
-        lessons_on_date = Lesson.objects.filter(
-            time_slot__date=slot.date
-        ).select_related('study_plan', 'study_plan__group', 'study_plan__stream', 'study_plan__class_type')
-
-        for lesson in lessons_on_date:
-            type_name = lesson.study_plan.class_type.name.lower()
-            if "екзамен" not in type_name and "exam" not in type_name:
-                continue
-
-            other_group_ids = set()
-            if lesson.study_plan.group:
-                other_group_ids.add(lesson.study_plan.group.id)
-            if lesson.study_plan.stream:
-                other_group_ids.update(g.id for g in lesson.study_plan.stream.groups.all())
-
-            intersection = my_group_ids.intersection(other_group_ids)
-            
-            if intersection:
-                print(f"⛔ БЛОКУЮ: Дата {slot.date}. Група(и) {intersection} вже має екзамен '{lesson.study_plan.subject.name}'")
-                return False
-
-        return True
+        idx = self.occupancy.index_of(slot.id)
+        return not self.occupancy.has_exam_on_day(my_group_ids, idx)
 
+    @counted("check_sequential")
     def check_sequential(self, plan, slot):
-        seq_config = None
-        for c in self.constraints:
-            if c.configuration.get("type") == "sequential_lessons":
-                if c.configuration["value"].get("follower_plan_id") == plan.id:
-                    seq_config = c.configuration["value"]
-                    break
-        
+        seq_config = self.get_plan_constraints(plan).leader
+
         if not seq_config: 
             return True
 
-        leader_id = seq_config["leader_plan_id"]
-        gap = seq_config["time_gap"]
-
-        leader_lesson = (Lesson.objects
-                    .filter(study_plan_id=leader_id)
-                    .select_related('time_slot')
-                    .order_by('-time_slot__date', '-time_slot__period_number')
-                    .first())
-
-        if not leader_lesson or not leader_lesson.time_slot:
-            return False
-
-        l_slot = leader_lesson.time_slot
-        
-        if gap == 1:
-            if slot.date == l_slot.date and slot.period_number == l_slot.period_number + 1: return True
-            return False
-        
-        if gap == 0:
-            if slot.id == l_slot.id: return True
+        l_slot = self.last_slots.get(seq_config["leader_plan_id"])
+        if not l_slot:
             return False
-
-        if slot.date > l_slot.date: return True
-        if slot.date == l_slot.date and slot.period_number > l_slot.period_number + gap: return True
-
-        return False
+        return follows_leader(slot, l_slot, seq_config["time_gap"])
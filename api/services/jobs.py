@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import DatabaseError, IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from api.models import GenerationJob
+from api.services.conf import get_setting
+from api.services.generator import ScheduleGenerator
+
+logger = logging.getLogger("schedule_generator")
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_setting("JOB_WORKERS"),
+            thread_name_prefix="schedule-generation",
+        )
+    return _executor
+
+
+def make_request_key(semester_id, options):
+    payload = json.dumps({"semester": int(semester_id), "options": options}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def stale_before():
+    """Активне завдання, не оновлене з цього моменту, вважається перерваним."""
+    return timezone.now() - timedelta(seconds=get_setting("JOB_STALE_SECONDS"))
+
+
+def is_stale(job):
+    return job.status in GenerationJob.ACTIVE_STATUSES and job.updated_at < stale_before()
+
+
+def fail_stale_jobs(jobs=None):
+    """
+    Позначає перерваними активні завдання без "серцебиття" довше за
+    JOB_STALE_SECONDS — вони залишилися від перезапущеного процесу.
+    Повертає кількість таких завдань.
+    """
+    if jobs is None:
+        jobs = GenerationJob.objects.all()
+    return jobs.filter(status__in=GenerationJob.ACTIVE_STATUSES, updated_at__lt=stale_before()).update(
+        status=GenerationJob.Status.FAILED,
+        error="Interrupted",
+        finished_at=timezone.now(),
+    )
+
+
+def enqueue_generation(semester_id, options):
+    """
+    Ставить генерацію в чергу. Якщо для того самого семестру з тими самими
+    параметрами вже є активне завдання, повертає його замість нового.
+    Повертає (job, created).
+
+    Унікальність активного завдання для request_key забезпечує умовний
+    unique-індекс, тож дублікат не створять і різні процеси сервера.
+    Заодно позначає перерваними всі завислі завдання (fail_stale_jobs).
+    """
+    request_key = make_request_key(semester_id, options)
+    fail_stale_jobs()
+
+    active = GenerationJob.objects.filter(
+        request_key=request_key,
+        status__in=GenerationJob.ACTIVE_STATUSES,
+    )
+
+    while True:
+        job = active.first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = GenerationJob.objects.create(
+                    semester_id=semester_id,
+                    options=options,
+                    request_key=request_key,
+                )
+            break
+        except IntegrityError:
+            # Таке саме завдання щойно створив інший процес
+            continue
+
+    transaction.on_commit(lambda: get_executor().submit(run_job, job.pk))
+    return job, True
+
+
+class JobHeartbeat(threading.Thread):
+    """
+    Оновлює updated_at завдання кожні interval секунд, поки триває генерація,
+    зокрема у фазах без колбеку прогресу (local search, точні рушії, repair).
+    """
+
+    def __init__(self, job_id, interval):
+        super().__init__(daemon=True, name=f"generation-heartbeat-{job_id}")
+        self.job_id = job_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    GenerationJob.objects.filter(pk=self.job_id, status=GenerationJob.Status.RUNNING).update(
+                        updated_at=timezone.now()
+                    )
+                except DatabaseError:
+                    # SQLite зайнятий записом результату — наступна спроба за interval
+                    logger.warning("Heartbeat of generation job %s failed", self.job_id, exc_info=True)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class JobProgress:
+    """Колбек прогресу генератора з обмеженням частоти запису в БД."""
+
+    def __init__(self, job_id, interval=1.0):
+        self.job_id = job_id
+        self.interval = interval
+        self.last_write = 0.0
+        self.last_percent = -1
+
+    def __call__(self, done, total, **counters):
+        percent = int(done * 100 / total) if total else 100
+        now = time.monotonic()
+        if percent == self.last_percent or (now - self.last_write < self.interval and percent < 100):
+            return
+
+        self.last_write = now
+        self.last_percent = percent
+        GenerationJob.objects.filter(pk=self.job_id, status=GenerationJob.Status.RUNNING).update(
+            progress=percent,
+            counters={"processed": done, "total": total, **counters},
+            updated_at=timezone.now(),
+        )
+
+
+def run_job(job_id):
+    close_old_connections()
+    try:
+        job = GenerationJob.objects.get(pk=job_id)
+        started = GenerationJob.objects.filter(pk=job_id, status=GenerationJob.Status.PENDING).update(
+            status=GenerationJob.Status.RUNNING,
+            started_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if not started:
+            # Завдання вже позначене як перерване
+            return
+
+        heartbeat = JobHeartbeat(job_id, get_setting("JOB_HEARTBEAT_SECONDS"))
+        heartbeat.start()
+        try:
+            generator = ScheduleGenerator(job.semester_id, progress=JobProgress(job_id), **job.options)
+            result = generator.generate()
+        finally:
+            heartbeat.stop()
+
+        # Завдання, яке встигли визнати перерваним, лишається FAILED
+        finished = GenerationJob.objects.filter(pk=job_id, status=GenerationJob.Status.RUNNING).update(
+            status=GenerationJob.Status.SUCCESS if result.get("success") else GenerationJob.Status.FAILED,
+            progress=100,
+            counters={
+                "created": result.get("created", 0),
+                "unassigned": result.get("unassigned", 0),
+            },
+            result=result,
+            error=result.get("error", ""),
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if not finished:
+            logger.warning("Generation job %s finished after it was marked as interrupted", job_id)
+    except Exception as e:
+        logger.exception("Generation job %s failed", job_id)
+        GenerationJob.objects.filter(pk=job_id, status=GenerationJob.Status.RUNNING).update(
+            status=GenerationJob.Status.FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+    finally:
+        connection.close()
@@ -0,0 +1,351 @@
+import math
+import random
+import time
+from bisect import bisect_left
+from collections import Counter
+
+
+class LocalSearch:
+    """
+    Покращення розкладу після жадібного розміщення імітацією відпалу.
+
+    Ходи: перенесення заняття в інший слот, обмін слотами двох занять,
+    зміна аудиторії. Жорсткі обмеження перевіряються тими самими методами
+    генератора, що й під час розміщення, а штраф рахується інкрементально —
+    перераховуються лише пари (група, день) та (план, день), яких торкається хід.
+
+    Штраф = unassigned * кількість нерозподілених
+          + group_gap * "вікна" між парами групи в межах дня
+          + same_day * повтори занять одного плану в один день
+          + room_waste * надлишкова місткість аудиторій.
+
+    Заняття планів із sequential_lessons не переносяться, щоб не порушити
+    прив'язку до слота лідера.
+    """
+
+    def __init__(self, generator, placements, weights, seed=0):
+        self.gen = generator
+        self.occ = generator.occupancy
+        self.slots = generator.all_slots
+        self.rooms = generator.room_pool.rooms_by_id
+        self.weights = weights
+        self.random = random.Random(seed)
+
+        self.placements = list(placements)
+
+        slot_day = self.occ.slot_day
+        by_day = {}
+        for idx, slot in enumerate(self.slots):
+            by_day.setdefault(slot_day[idx], []).append((slot.period_number, idx))
+        self.day_slots = {day: [idx for _, idx in sorted(items)] for day, items in by_day.items()}
+
+        self.plan_day = Counter()
+        for plan_id, idx in generator.fixed_placements:
+            self.plan_day[(plan_id, slot_day[idx])] += 1
+        for plan_id, idx, _ in self.placements:
+            if idx is not None:
+                self.plan_day[(plan_id, slot_day[idx])] += 1
+
+        self.movable = [
+            i for i, (plan_id, idx, _) in enumerate(self.placements)
+            if idx is not None and not self.is_chained(plan_id)
+        ]
+        self.unassigned = [i for i, (_, idx, _) in enumerate(self.placements) if idx is None]
+
+    def is_chained(self, plan_id):
+        pc = self.gen.plan_constraints.get(plan_id)
+        return pc is not None and (pc.leader is not None or pc.follower is not None)
+
+    # --- штраф ---
+
+    def group_gaps(self, group_id, day):
+        row = self.occ.groups.get(group_id)
+        if row is None:
+            return 0
+        busy = [row[idx] != 0 for idx in self.day_slots[day]]
+        if True not in busy:
+            return 0
+        first = busy.index(True)
+        last = len(busy) - 1 - busy[::-1].index(True)
+        return busy[first:last + 1].count(False)
+
+    def room_waste(self, plan, room_id):
+        return self.rooms[room_id].capacity - plan.audience_size
+
+    def terms_cost(self, terms):
+        w_gap = self.weights.get("group_gap", 0)
+        w_same = self.weights.get("same_day", 0)
+        cost = 0
+        for kind, key, day in terms:
+            if kind == "group":
+                if w_gap:
+                    cost += w_gap * self.group_gaps(key, day)
+            elif w_same:
+                cost += w_same * max(0, self.plan_day[(key, day)] - 1)
+        return cost
+
+    def terms_for(self, plan, days):
+        terms = {("plan", plan.id, day) for day in days}
+        terms.update(("group", group_id, day) for group_id in plan.group_ids for day in days)
+        return terms
+
+    def total_cost(self):
+        terms = set()
+        for plan_id, idx, _ in self.placements:
+            if idx is not None:
+                terms |= self.terms_for(self.gen.plans_map[plan_id], [self.occ.slot_day[idx]])
+        cost = self.terms_cost(terms)
+        cost += self.weights.get("room_waste", 0) * sum(
+            self.room_waste(self.gen.plans_map[plan_id], room_id)
+            for plan_id, idx, room_id in self.placements if idx is not None
+        )
+        return cost + self.weights.get("unassigned", 0) * len(self.unassigned)
+
+    # --- застосування ходів ---
+
+    def take(self, plan, idx, room):
+        self.gen.register_memory(plan, self.slots[idx], room)
+        self.plan_day[(plan.id, self.occ.slot_day[idx])] += 1
+
+    def drop(self, plan, idx, room):
+        self.gen.unregister_memory(plan, self.slots[idx], room)
+        self.plan_day[(plan.id, self.occ.slot_day[idx])] -= 1
+
+    def find_room(self, plan, idx):
+        """Вільна аудиторія, якщо слот idx допустимий для плану (без статичних перевірок)."""
+        gen = self.gen
+        if not gen.check_slot(plan, idx, sequential=False):
+            return None
+        return gen.find_free_room(plan, self.slots[idx])
+
+    def accept(self, delta, temperature):
+        if delta <= 0:
+            return True
+        return temperature > 0 and self.random.random() < math.exp(-delta / temperature)
+
+    def try_move(self, i, temperature):
+        plan_id, idx, room_id = self.placements[i]
+        plan = self.gen.plans_map[plan_id]
+        candidates = self.gen.candidate_slots[plan_id]
+        if not candidates:
+            return None
+        new_idx = candidates[self.random.randrange(len(candidates))]
+        if new_idx == idx:
+            return None
+
+        slot_day = self.occ.slot_day
+        terms = self.terms_for(plan, {slot_day[idx], slot_day[new_idx]})
+        w_waste = self.weights.get("room_waste", 0)
+        room = self.rooms[room_id]
+
+        before = self.terms_cost(terms) + w_waste * self.room_waste(plan, room_id)
+        self.drop(plan, idx, room)
+        new_room = self.find_room(plan, new_idx)
+        if new_room is None:
+            self.take(plan, idx, room)
+            return None
+
+        self.take(plan, new_idx, new_room)
+        delta = self.terms_cost(terms) + w_waste * self.room_waste(plan, new_room.id) - before
+        if self.accept(delta, temperature):
+            self.placements[i] = (plan_id, new_idx, new_room.id)
+            return delta
+
+        self.drop(plan, new_idx, new_room)
+        self.take(plan, idx, room)
+        return None
+
+    def try_swap(self, i, j, temperature):
+        plan_a_id, idx_a, room_a_id = self.placements[i]
+        plan_b_id, idx_b, room_b_id = self.placements[j]
+        if idx_a == idx_b:
+            return None
+        plan_a = self.gen.plans_map[plan_a_id]
+        plan_b = self.gen.plans_map[plan_b_id]
+        if not (self.is_candidate(plan_a_id, idx_b) and self.is_candidate(plan_b_id, idx_a)):
+            return None
+
+        slot_day = self.occ.slot_day
+        days = {slot_day[idx_a], slot_day[idx_b]}
+        terms = self.terms_for(plan_a, days) | self.terms_for(plan_b, days)
+        w_waste = self.weights.get("room_waste", 0)
+        room_a, room_b = self.rooms[room_a_id], self.rooms[room_b_id]
+
+        before = self.terms_cost(terms) + w_waste * (
+            self.room_waste(plan_a, room_a_id) + self.room_waste(plan_b, room_b_id)
+        )
+        self.drop(plan_a, idx_a, room_a)
+        self.drop(plan_b, idx_b, room_b)
+
+        new_room_a = self.find_room(plan_a, idx_b)
+        if new_room_a is not None:
+            self.take(plan_a, idx_b, new_room_a)
+            new_room_b = self.find_room(plan_b, idx_a)
+            if new_room_b is not None:
+                self.take(plan_b, idx_a, new_room_b)
+                delta = self.terms_cost(terms) + w_waste * (
+                    self.room_waste(plan_a, new_room_a.id) + self.room_waste(plan_b, new_room_b.id)
+                ) - before
+                if self.accept(delta, temperature):
+                    self.placements[i] = (plan_a_id, idx_b, new_room_a.id)
+                    self.placements[j] = (plan_b_id, idx_a, new_room_b.id)
+                    return delta
+                self.drop(plan_b, idx_a, new_room_b)
+            self.drop(plan_a, idx_b, new_room_a)
+
+        self.take(plan_a, idx_a, room_a)
+        self.take(plan_b, idx_b, room_b)
+        return None
+
+    def try_change_room(self, i, temperature):
+        plan_id, idx, room_id = self.placements[i]
+        plan = self.gen.plans_map[plan_id]
+        room = self.rooms[room_id]
+
+        # Поточна аудиторія зайнята самим заняттям, тож серед вільних її немає
+        alternatives = self.gen.room_pool.free_rooms(
+            plan.room_type_id, plan.audience_size, self.occ, idx, plan.duration
+        )
+        if not alternatives:
+            return None
+        new_room = self.random.choice(alternatives)
+
+        self.drop(plan, idx, room)
+        self.take(plan, idx, new_room)
+        delta = self.weights.get("room_waste", 0) * (
+            self.room_waste(plan, new_room.id) - self.room_waste(plan, room_id)
+        )
+        if self.accept(delta, temperature):
+            self.placements[i] = (plan_id, idx, new_room.id)
+            return delta
+
+        self.drop(plan, idx, new_room)
+        self.take(plan, idx, room)
+        return None
+
+    def is_candidate(self, plan_id, idx):
+        candidates = self.gen.candidate_slots[plan_id]
+        # candidate_slots відсортовані за індексом слота
+        pos = bisect_left(candidates, idx)
+        return pos < len(candidates) and candidates[pos] == idx
+
+    def try_insert_unassigned(self):
+        """Пробує розмістити нерозподілені заняття у звільнені ходами слоти."""
+        gain = 0
+        still_unassigned = []
+        for i in self.unassigned:
+            plan_id = self.placements[i][0]
+            plan = self.gen.plans_map[plan_id]
+            slot, room = self.gen.find_and_assign_slot(plan)
+            if slot is None or room is None:
+                still_unassigned.append(i)
+                continue
+
+            idx = self.occ.index_of(slot.id)
+            terms = self.terms_for(plan, {self.occ.slot_day[idx]})
+            before = self.terms_cost(terms)
+            self.take(plan, idx, room)
+            self.placements[i] = (plan_id, idx, room.id)
+            if not self.is_chained(plan_id):
+                self.movable.append(i)
+            gain += (
+                self.terms_cost(terms) - before
+                + self.weights.get("room_waste", 0) * self.room_waste(plan, room.id)
+                - self.weights.get("unassigned", 0)
+            )
+        self.unassigned = still_unassigned
+        return gain
+
+    # --- основний цикл ---
+
+    def restore(self, target):
+        """Повертає пам'ять генератора та placements до стану target."""
+        changed = [i for i, p in enumerate(self.placements) if p != target[i]]
+        for i in changed:
+            plan_id, idx, room_id = self.placements[i]
+            if idx is not None:
+                self.drop(self.gen.plans_map[plan_id], idx, self.rooms[room_id])
+        for i in changed:
+            plan_id, idx, room_id = target[i]
+            if idx is not None:
+                self.take(self.gen.plans_map[plan_id], idx, self.rooms[room_id])
+            self.placements[i] = target[i]
+
+        self.unassigned = [i for i, (_, idx, _) in enumerate(self.placements) if idx is None]
+        self.movable = [
+            i for i, (plan_id, idx, _) in enumerate(self.placements)
+            if idx is not None and not self.is_chained(plan_id)
+        ]
+
+    def run(self, seconds, max_iterations=None):
+        """
+        Відпал протягом seconds. Якщо задано max_iterations, температура
+        спадає за номером ітерації, а не за часом, тож той самий seed дає той
+        самий розклад, поки бюджет вичерпується раніше за ліміт часу.
+        """
+        started = time.monotonic()
+        deadline = started + seconds
+
+        unassigned_before = len(self.unassigned)
+        cost = initial_cost = self.total_cost()
+        cost += self.try_insert_unassigned()
+        best_cost, best = cost, list(self.placements)
+
+        t_start = max(self.weights.get("group_gap", 0), self.weights.get("same_day", 0), 1) * 2.0
+        t_end = 0.01
+        temperature = t_start
+
+        iterations = 0
+        accepted = 0
+        while self.movable:
+            if iterations % 100 == 0:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if max_iterations:
+                    frac = iterations / max_iterations
+                else:
+                    frac = (now - started) / seconds
+                temperature = t_start * (t_end / t_start) ** frac
+                if self.unassigned and iterations % 1000 == 0:
+                    cost += self.try_insert_unassigned()
+                    if cost < best_cost:
+                        best_cost, best = cost, list(self.placements)
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            iterations += 1
+
+            i = self.movable[self.random.randrange(len(self.movable))]
+            move = self.random.random()
+            if move < 0.6:
+                delta = self.try_move(i, temperature)
+            elif move < 0.9:
+                j = self.movable[self.random.randrange(len(self.movable))]
+                delta = self.try_swap(i, j, temperature) if i != j else None
+            else:
+                delta = self.try_change_room(i, temperature)
+
+            if delta is None:
+                continue
+            accepted += 1
+            cost += delta
+            if cost < best_cost:
+                best_cost, best = cost, list(self.placements)
+
+        if self.unassigned:
+            cost += self.try_insert_unassigned()
+            if cost < best_cost:
+                best_cost, best = cost, list(self.placements)
+
+        if cost > best_cost:
+            self.restore(best)
+
+        return self.placements, {
+            "iterations": iterations,
+            "accepted": accepted,
+            "initial_penalty": round(initial_cost, 3),
+            "final_penalty": round(best_cost, 3),
+            "unassigned_before": unassigned_before,
+            "unassigned_after": len(self.unassigned),
+            "seconds": round(time.monotonic() - started, 3),
+        }
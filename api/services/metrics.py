@@ -0,0 +1,75 @@
+import time
+from collections import Counter
+from functools import wraps
+
+
+class GenerationMetrics:
+    """
+    Інструментування одного запуску генерації: час фаз, кількість викликів
+    і відмов перевірок генератора та кількість SQL-запитів.
+
+    Фази перемикаються через enter(): попередня фаза закривається, час
+    повторних входів у ту саму фазу підсумовується. Лічильники перевірок
+    з процесів пулу повертаються через checks() і додаються merge().
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.current = None
+        self.phase_started = None
+        self.calls = Counter()
+        self.rejected = Counter()
+        self.queries = 0
+
+    def enter(self, name):
+        now = time.monotonic()
+        if self.current is not None:
+            self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.phase_started
+        self.current = name
+        self.phase_started = now
+
+    def stop(self):
+        self.enter(None)
+
+    def count_query(self, execute, sql, params, many, context):
+        """Обгортка для connection.execute_wrapper."""
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def spawn(self):
+        """Порожні лічильники для окремої спроби чи процесу пулу."""
+        return GenerationMetrics()
+
+    def checks(self):
+        return dict(self.calls), dict(self.rejected)
+
+    def merge(self, checks):
+        calls, rejected = checks
+        self.calls.update(calls)
+        self.rejected.update(rejected)
+
+    def as_dict(self):
+        return {
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "seconds": round(sum(self.phases.values()), 4),
+            "checks": {
+                name: {"calls": calls, "rejected": self.rejected.get(name, 0)}
+                for name, calls in sorted(self.calls.items())
+            },
+            "queries": self.queries,
+        }
+
+
+def counted(name):
+    """Рахує виклики методу генератора та відмови (хибний результат) у self.metrics."""
+    def decorate(method):
+        @wraps(method)
+        def wrapper(self, *args):
+            metrics = self.metrics
+            metrics.calls[name] += 1
+            result = method(self, *args)
+            if not result:
+                metrics.rejected[name] += 1
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,126 @@
+from array import array
+
+
+class OccupancyIndex:
+    """
+    Щільний індекс зайнятості ресурсів семестру.
+
+    Кожен слот отримує цілий індекс, а для кожного викладача, групи, потоку
+    та аудиторії зберігається рядок bytearray довжиною у кількість слотів.
+    Комірка містить кількість занять ресурсу в цьому слоті, тож перевірка
+    "чи зайнятий ресурс" — це O(1) звернення за індексом.
+
+    Заняття тривалістю в кілька пар займає серію сусідніх індексів (слоти
+    впорядковані за датою та номером пари), тому перевірка серії — один
+    підрахунок нулів у зрізі рядка, а не окремі звернення по кожній парі.
+
+    Аналогічно по днях семестру ведуться лічильники денного навантаження
+    викладачів і груп для обмежень max_daily_lessons та кількість екзаменів
+    групи за день.
+    """
+
+    def __init__(self, slots):
+        """slots: пари (slot_id, date) усіх слотів семестру."""
+        self.slot_index = {}
+        self.slot_day = array("I")
+        day_index = {}
+        for idx, (slot_id, date) in enumerate(slots):
+            self.slot_index[slot_id] = idx
+            self.slot_day.append(day_index.setdefault(date, len(day_index)))
+
+        self.size = len(self.slot_index)
+        self.days = len(day_index)
+
+        self.teachers = {}
+        self.groups = {}
+        self.streams = {}
+        self.rooms = {}
+
+        self.teacher_days = {}
+        self.group_days = {}
+        self.group_exam_days = {}
+
+    def index_of(self, slot_id):
+        return self.slot_index.get(slot_id)
+
+    @staticmethod
+    def _row(table, key, size):
+        row = table.get(key)
+        if row is None:
+            row = table[key] = bytearray(size)
+        return row
+
+    @staticmethod
+    def _busy(row, idx, length):
+        if row is None:
+            return False
+        if length == 1:
+            return row[idx] != 0
+        return row.count(0, idx, idx + length) != length
+
+    def occupy(self, idx, teacher_id, group_ids, stream_id, room_id, is_exam=False, length=1):
+        self._apply(idx, teacher_id, group_ids, stream_id, room_id, is_exam, 1, length)
+
+    def release(self, idx, teacher_id, group_ids, stream_id, room_id, is_exam=False, length=1):
+        self._apply(idx, teacher_id, group_ids, stream_id, room_id, is_exam, -1, length)
+
+    def _apply(self, idx, teacher_id, group_ids, stream_id, room_id, is_exam, delta, length):
+        size, days = self.size, self.days
+        day = self.slot_day[idx]
+        run = range(idx, idx + length)
+        if teacher_id is not None:
+            row = self._row(self.teachers, teacher_id, size)
+            for i in run:
+                row[i] += delta
+            self._row(self.teacher_days, teacher_id, days)[day] += delta * length
+        for group_id in group_ids:
+            row = self._row(self.groups, group_id, size)
+            for i in run:
+                row[i] += delta
+            self._row(self.group_days, group_id, days)[day] += delta * length
+            if is_exam:
+                self._row(self.group_exam_days, group_id, days)[day] += delta
+        if stream_id is not None:
+            row = self._row(self.streams, stream_id, size)
+            for i in run:
+                row[i] += delta
+        if room_id is not None:
+            row = self._row(self.rooms, room_id, size)
+            for i in run:
+                row[i] += delta
+
+    def is_teacher_busy(self, teacher_id, idx, length=1):
+        return self._busy(self.teachers.get(teacher_id), idx, length)
+
+    def is_room_busy(self, room_id, idx, length=1):
+        return self._busy(self.rooms.get(room_id), idx, length)
+
+    def is_audience_busy(self, group_ids, stream_id, idx, length=1):
+        """Чи зайнята хоча б одна з груп (або сам потік) у слотах idx .. idx + length - 1."""
+        if stream_id is not None and self._busy(self.streams.get(stream_id), idx, length):
+            return True
+        groups = self.groups
+        for group_id in group_ids:
+            if self._busy(groups.get(group_id), idx, length):
+                return True
+        return False
+
+    def teacher_day_load(self, teacher_id, idx):
+        """Кількість занять викладача в день слоту idx."""
+        row = self.teacher_days.get(teacher_id)
+        return row[self.slot_day[idx]] if row is not None else 0
+
+    def group_day_load(self, group_id, idx):
+        """Кількість занять групи (разом з потоковими) в день слоту idx."""
+        row = self.group_days.get(group_id)
+        return row[self.slot_day[idx]] if row is not None else 0
+
+    def has_exam_on_day(self, group_ids, idx):
+        """Чи має хоча б одна з груп екзамен у день слоту idx."""
+        day = self.slot_day[idx]
+        exam_days = self.group_exam_days
+        for group_id in group_ids:
+            row = exam_days.get(group_id)
+            if row is not None and row[day]:
+                return True
+        return False
@@ -0,0 +1,119 @@
+import copy
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# fork з потоку завдань генерації небезпечний, а на Windows і macOS його
+# немає чи він не типовий — тож процеси завжди запускаються через spawn
+START_METHOD = "spawn"
+
+_worker_generator = None
+
+
+def split_components(sorted_plans, plan_constraints, room_type_ids):
+    """
+    Розбиває плани на компоненти зв'язності графа конфліктів ресурсів.
+
+    Два плани зв'язані, якщо мають спільного викладача, групу (зокрема через
+    потік), потік, пул аудиторій одного типу або пов'язані sequential_lessons.
+    План без вимог до типу аудиторії може зайняти будь-яку кімнату, тому
+    зв'язаний з усіма типами. Порядок планів усередині компоненти та порядок
+    компонент (за першим планом) зберігають порядок sorted_plans.
+    """
+    parent = {}
+
+    def find(key):
+        root = key
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    for plan in sorted_plans:
+        node = ("plan", plan.id)
+        union(node, ("teacher", plan.teacher_id))
+        for group_id in plan.group_ids:
+            union(node, ("group", group_id))
+        if plan.stream_id:
+            union(node, ("stream", plan.stream_id))
+
+        if plan.room_type_id is not None:
+            union(node, ("room_type", plan.room_type_id))
+        else:
+            for type_id in room_type_ids:
+                union(node, ("room_type", type_id))
+
+        pc = plan_constraints.get(plan.id)
+        if pc is not None:
+            for cfg in (pc.leader, pc.follower):
+                for key in ("leader_plan_id", "follower_plan_id"):
+                    if cfg and cfg.get(key) is not None:
+                        union(node, ("plan", cfg[key]))
+
+    components = {}
+    for plan in sorted_plans:
+        components.setdefault(find(("plan", plan.id)), []).append(plan)
+    return list(components.values())
+
+
+def _init_worker(payload):
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    # Генератор містить екземпляри моделей, тож розпаковується лише після django.setup()
+    global _worker_generator
+    _worker_generator = pickle.loads(payload)
+
+
+def _make_pool(generator, workers):
+    """ProcessPoolExecutor, кожен процес якого отримує генератор один раз."""
+    state = copy.copy(generator)
+    # Прогрес звітує батьківський процес
+    state.progress = None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(START_METHOD),
+        initializer=_init_worker,
+        initargs=(pickle.dumps(state),),
+    )
+
+
+def _place_component(plan_ids):
+    generator = _worker_generator
+    generator.logs = []
+    generator.metrics = generator.metrics.spawn()
+    plans = [generator.plans_map[plan_id] for plan_id in plan_ids]
+    placements, created, unassigned = generator.place_lessons(plans)
+    return placements, created, unassigned, generator.logs, generator.metrics.checks()
+
+
+def place_components_in_pool(generator, components, workers):
+    """
+    Розв'язує незалежні компоненти в ProcessPoolExecutor. Генератор
+    (після фази завантаження) передається кожному процесу один раз;
+    результати видаються в порядку компонент, щойно готові.
+    """
+    with _make_pool(generator, min(workers, len(components))) as executor:
+        yield from executor.map(_place_component, [[p.id for p in c] for c in components])
+
+
+def _place_attempt(plan_ids, attempt):
+    return _worker_generator.place_attempt(plan_ids, attempt)
+
+
+def run_portfolio_in_pool(generator, plan_ids, attempts, workers):
+    """
+    Спроби портфеля (ScheduleGenerator.place_attempt) у пулі процесів;
+    результати видаються в порядку спроб.
+    """
+    with _make_pool(generator, min(workers, len(attempts))) as executor:
+        yield from executor.map(_place_attempt, [plan_ids] * len(attempts), attempts)
@@ -0,0 +1,47 @@
+class PlanView:
+    """
+    Представлення StudyPlan на один запуск генерації.
+
+    Містить лише цілі ідентифікатори та вже обчислені значення, тому
+    перевірки генератора не звертаються до ORM-об'єктів (stream.groups,
+    target_audience_size тощо) у гарячому циклі.
+    """
+
+    __slots__ = (
+        "id", "teacher_id", "group_id", "stream_id", "group_ids",
+        "audience_size", "room_type_id", "class_type_id", "class_type_name",
+        "amount", "duration", "is_exam", "target_name",
+    )
+
+    def __init__(self, plan, is_exam=False):
+        stream_groups = list(plan.stream.groups.all()) if plan.stream_id else []
+
+        if plan.group_id:
+            group_ids = frozenset([plan.group_id])
+            audience_size = plan.group.amount
+            target_name = plan.group.name
+        elif plan.stream_id:
+            group_ids = frozenset(g.id for g in stream_groups)
+            audience_size = sum(g.amount for g in stream_groups)
+            target_name = plan.stream.name
+        else:
+            group_ids = frozenset()
+            audience_size = 0
+            target_name = "Unknown"
+
+        self.id = plan.id
+        self.teacher_id = plan.teacher_id
+        self.group_id = plan.group_id
+        self.stream_id = plan.stream_id
+        self.group_ids = group_ids
+        self.audience_size = audience_size
+        self.room_type_id = plan.required_room_type_id
+        self.class_type_id = plan.class_type_id
+        self.class_type_name = plan.class_type.name
+        self.amount = plan.amount
+        self.duration = plan.duration or 1
+        self.is_exam = is_exam
+        self.target_name = target_name
+
+    def __repr__(self):
+        return f"<PlanView {self.id} {self.target_name} ({self.class_type_name})>"
@@ -0,0 +1,218 @@
+import time
+
+from django.db.models import Count, Max, Q
+
+from api.models import Group, Lesson, Room, RoomType, SemesterConstraint, Stream, StudyPlan, Teacher, TimeSlot
+from api.services.constraints import compile_constraints
+
+
+class PlanRow:
+    """Мінімальне представлення плану для compile_constraints без завантаження ORM-об'єктів."""
+
+    __slots__ = ("id", "teacher_id", "stream_id", "group_ids", "room_type_id", "audience_size", "periods")
+
+    def __init__(self, plan_id, teacher_id, stream_id, group_ids, room_type_id, audience_size, periods):
+        self.id = plan_id
+        self.teacher_id = teacher_id
+        self.stream_id = stream_id
+        self.group_ids = group_ids
+        self.room_type_id = room_type_id
+        self.audience_size = audience_size
+        self.periods = periods
+
+
+def feasibility_report(semester):
+    """
+    Швидка перевірка необхідних умов розкладу семестру до генерації.
+
+    Попит рахується в парах (amount * duration), пропозиція — у вільних
+    (слот, ресурс) з урахуванням is_available, day_off / time_block,
+    max_daily_lessons та закріплених занять:
+
+    - room_types: для кожного типу аудиторії (і для всіх аудиторій разом)
+      та кожного порогу місткості попит планів з аудиторією >= порогу не
+      більший за слоти * аудиторії місткістю >= порогу;
+    - teachers, groups: попит викладача / групи (разом із потоковими
+      заняттями) не більший за дозволені йому пари по днях;
+    - oversized: аудиторія плану (зокрема потоку) не більша за найбільшу
+      придатну аудиторію.
+
+    Порушення будь-якої умови доводить, що всі заняття розмістити не можна
+    (feasible = False). Зворотне не гарантується.
+    """
+    started = time.monotonic()
+
+    days = {}
+    for date, day_of_week, period in TimeSlot.objects.filter(semester=semester, is_available=True).values_list(
+        "date", "day_of_week", "period_number"
+    ):
+        days.setdefault(date, []).append((day_of_week, period))
+    slot_count = sum(len(pairs) for pairs in days.values())
+
+    constraints = list(SemesterConstraint.objects.filter(semester=semester, is_active=True).only(
+        "teacher_id", "group_id", "stream_id", "configuration"
+    ))
+
+    # Склад потоків із планами семестру та потоків, на які є обмеження
+    # (max_daily_lessons потоку діє і на власні плани його груп)
+    stream_groups = {}
+    for stream_id, group_id, amount in Stream.groups.through.objects.filter(
+        Q(stream__study_plans__semester=semester) | Q(stream_id__in={c.stream_id for c in constraints if c.stream_id})
+    ).distinct().values_list("stream_id", "group_id", "group__amount"):
+        stream_groups.setdefault(stream_id, {})[group_id] = amount
+
+    plans = []
+    for plan_id, teacher_id, group_id, stream_id, room_type_id, duration, amount, group_amount in (
+        StudyPlan.objects.filter(semester=semester).values_list(
+            "id", "teacher_id", "group_id", "stream_id", "required_room_type_id", "duration", "amount", "group__amount"
+        )
+    ):
+        if group_id:
+            group_ids, audience_size = frozenset([group_id]), group_amount
+        else:
+            members = stream_groups.get(stream_id, {})
+            group_ids, audience_size = frozenset(members), sum(members.values())
+        plans.append(PlanRow(
+            plan_id, teacher_id, stream_id, group_ids, room_type_id, audience_size, amount * (duration or 1)
+        ))
+
+    compiled = compile_constraints(constraints, plans, stream_groups)
+
+    room_supply = room_type_report(semester, plans, slot_count)
+    teachers, groups = resource_report(semester, plans, compiled, days, stream_groups)
+    oversized = oversized_report(plans)
+
+    return {
+        "semester": semester.id,
+        "feasible": all(row["ok"] for row in room_supply) and not teachers and not groups and not oversized,
+        "slots": slot_count,
+        "plans": len(plans),
+        "demand": sum(plan.periods for plan in plans),
+        "room_types": room_supply,
+        "teachers": teachers,
+        "groups": groups,
+        "oversized": oversized,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def room_type_report(semester, plans, slot_count):
+    """Попит і пропозиція (слот, аудиторія) по типах і порогах місткості."""
+    rooms = {}
+    for room_type_id, capacity, count in Room.objects.values_list("room_type_id", "capacity").annotate(
+        count=Count("id")
+    ).order_by():
+        rooms[(room_type_id, capacity)] = rooms.get((room_type_id, capacity), 0) + count * slot_count
+    for room_type_id, capacity, count in Lesson.objects.filter(
+        study_plan__semester=semester, is_locked=True, time_slot__is_available=True, room__isnull=False
+    ).values_list("room__room_type_id", "room__capacity").annotate(count=Count("id")).order_by():
+        rooms[(room_type_id, capacity)] = rooms.get((room_type_id, capacity), 0) - count
+
+    names = dict(RoomType.objects.values_list("id", "name"))
+    type_ids = [None] + sorted({plan.room_type_id for plan in plans if plan.room_type_id is not None})
+
+    report = []
+    for type_id in type_ids:
+        demand = [(plan.audience_size, plan.periods) for plan in plans if type_id is None or plan.room_type_id == type_id]
+        supply = [(capacity, free) for (room_type_id, capacity), free in rooms.items() if type_id is None or room_type_id == type_id]
+
+        tightest = None
+        for size in sorted({size for size, _ in demand}):
+            needed = sum(periods for audience, periods in demand if audience >= size)
+            available = sum(free for capacity, free in supply if capacity >= size)
+            if tightest is None or needed * max(tightest["supply"], 1) > tightest["demand"] * max(available, 1):
+                tightest = {"min_capacity": size, "demand": needed, "supply": available}
+
+        row = {
+            "room_type": type_id,
+            "name": names.get(type_id, "All rooms"),
+            "demand": sum(periods for _, periods in demand),
+            "supply": sum(free for _, free in supply),
+            "tightest": tightest,
+        }
+        row["ok"] = tightest is None or tightest["demand"] <= tightest["supply"]
+        report.append(row)
+    return report
+
+
+def resource_report(semester, plans, compiled, days, stream_groups):
+    """Викладачі та групи, чий попит перевищує дозволені їм пари семестру."""
+    locked = {}
+    for teacher_id, group_id, stream_id, date, period in Lesson.objects.filter(
+        study_plan__semester=semester, is_locked=True, time_slot__isnull=False
+    ).values_list(
+        "study_plan__teacher_id", "study_plan__group_id", "study_plan__stream_id", "time_slot__date",
+        "time_slot__period_number",
+    ):
+        keys = [("teacher", teacher_id)]
+        if group_id:
+            keys.append(("group", group_id))
+        if stream_id:
+            keys.extend(("group", g) for g in stream_groups.get(stream_id, ()))
+        for key in keys:
+            locked.setdefault(key, {}).setdefault(date, set()).add(period)
+
+    pairs = {pair for day_pairs in days.values() for pair in day_pairs}
+    allowed_cache = {}
+
+    def allowed_pairs(pc):
+        key = (frozenset(pc.days_off), frozenset(pc.blocked_periods))
+        allowed = allowed_cache.get(key)
+        if allowed is None:
+            allowed = allowed_cache[key] = {
+                (day, period) for day, period in pairs
+                if day not in pc.days_off and (str(day), period) not in pc.blocked_periods
+            }
+        return allowed
+
+    resources = {}
+    for plan in plans:
+        pc = compiled[plan.id]
+        limits = [(("teacher", plan.teacher_id), pc.teacher_daily_limit)]
+        limits.extend((("group", group_id), pc.group_daily_limits.get(group_id)) for group_id in plan.group_ids)
+        for key, limit in limits:
+            entry = resources.setdefault(key, {"demand": 0, "allowed": set(), "limits": []})
+            entry["demand"] += plan.periods
+            entry["allowed"] |= allowed_pairs(pc)
+            entry["limits"].append(limit)
+
+    overloaded = {"teacher": [], "group": []}
+    for (kind, resource_id), entry in resources.items():
+        # Денне навантаження обмежує найбільший з лімітів планів ресурсу
+        limit = None if None in entry["limits"] else max(entry["limits"])
+        supply = 0
+        for date, day_pairs in days.items():
+            taken = locked.get((kind, resource_id), {}).get(date, ())
+            free = sum(1 for pair in day_pairs if pair in entry["allowed"] and pair[1] not in taken)
+            if limit is not None:
+                free = min(free, limit - len(taken))
+            supply += max(free, 0)
+        if entry["demand"] > supply:
+            overloaded[kind].append({kind: resource_id, "demand": entry["demand"], "supply": supply})
+
+    for kind, model in (("teacher", Teacher), ("group", Group)):
+        names = dict(model.objects.filter(id__in=[row[kind] for row in overloaded[kind]]).values_list("id", "name"))
+        for row in overloaded[kind]:
+            row["name"] = names.get(row[kind])
+        overloaded[kind].sort(key=lambda row: row["supply"] - row["demand"])
+    return overloaded["teacher"], overloaded["group"]
+
+
+def oversized_report(plans):
+    """Плани, аудиторія яких не вміщується в найбільшу придатну аудиторію."""
+    largest = {}
+    for room_type_id, capacity in Room.objects.values_list("room_type_id").annotate(capacity=Max("capacity")).order_by():
+        largest[room_type_id] = capacity
+    largest_any = max(largest.values(), default=0)
+
+    report = []
+    for plan in plans:
+        room = largest_any if plan.room_type_id is None else largest.get(plan.room_type_id, 0)
+        if plan.audience_size > room:
+            report.append({
+                "plan": plan.id,
+                "stream": plan.stream_id,
+                "audience": plan.audience_size,
+                "largest_room": room,
+            })
+    return report
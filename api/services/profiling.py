@@ -0,0 +1,122 @@
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.db import transaction
+
+from api.services.conf import get_setting
+
+
+def is_allowed(request):
+    """Профілювання дозволене клієнтам з PROFILE_ALLOWLIST (IP-адреса або ім'я користувача)."""
+    allowlist = get_setting("PROFILE_ALLOWLIST")
+    if request.META.get("REMOTE_ADDR") in allowlist:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.get_username() in allowlist)
+
+
+class StackSampler(threading.Thread):
+    """
+    Семплер стеків одного потоку через sys._current_frames(): кожні interval
+    секунд стек потоку записується в згорнутому форматі
+    ("module:func;module:func ... кількість"), з якого будуються flame graph.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_generation(generator):
+    """
+    Запускає generator.generate() під cProfile разом із семплером стеків
+    у транзакції, що завжди відкочується: база після профілювання не
+    змінюється. Повертає (результат генерації, звіт профілю).
+
+    Кеш результатів обходиться (force): інакше профіль показав би лише пошук
+    у GenerationRun. Запис історії відкочується разом з усім іншим, тому
+    run у результаті — None.
+
+    Звіт містить PROFILE_TOP найгарячіших функцій за власним і сумарним
+    часом (cProfile) та шляхи до збережених файлів: .pstats для pstats /
+    snakeviz і .collapsed для flamegraph.pl чи speedscope. Семплер бачить
+    і накладні витрати cProfile; процеси пулу (workers > 1) не профілюються.
+    """
+    top = get_setting("PROFILE_TOP")
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), get_setting("PROFILE_INTERVAL"))
+
+    generator.force = True
+    started = time.monotonic()
+    with transaction.atomic():
+        sampler.start()
+        profiler.enable()
+        try:
+            result = generator.generate()
+        finally:
+            profiler.disable()
+            sampler.stop()
+            transaction.set_rollback(True)
+    seconds = time.monotonic() - started
+    result["run"] = None
+
+    directory = get_setting("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "schedule_profiles")
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"semester{generator.semester.id}-{time.strftime('%Y%m%d-%H%M%S')}")
+    profiler.dump_stats(f"{base}.pstats")
+    with open(f"{base}.collapsed", "w") as f:
+        f.write(sampler.collapsed())
+
+    stats = pstats.Stats(profiler)
+    return result, {
+        "seconds": round(seconds, 3),
+        "rolled_back": True,
+        "samples": sum(sampler.stacks.values()),
+        "top": hot_functions(stats, "tottime", top),
+        "top_cumulative": hot_functions(stats, "cumulative", top),
+        "pstats_file": f"{base}.pstats",
+        "collapsed_file": f"{base}.collapsed",
+    }
+
+
+def hot_functions(stats, sort, limit):
+    stats.sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        })
+    return rows
@@ -0,0 +1,249 @@
+class EjectionRepair:
+    """
+    Ремонт заняття, якому жадібний прохід не знайшов слота: ланцюжки
+    витіснень (ejection chains) на пам'яті генератора.
+
+    Заняття ставиться в слот, де йому заважають уже розміщені незакріплені
+    заняття (спільний викладач, група, потік або єдина придатна аудиторія);
+    витіснені переставляються в інші допустимі слоти, а якщо не можуть —
+    самі витісняють наступні. Загалом переноситься не більше max_moves
+    занять, кожне щонайбільше раз. Невдала спроба повністю відкочується за
+    журналом дій.
+
+    Заняття планів із sequential_lessons, закріплені та збережені
+    (incremental) заняття не переносяться. Плани gen.overloaded_plans не
+    ремонтуються зовсім, а план, ремонт якого не вдався, не шукається
+    знову, доки нове розміщення чи вдалий ремонт не змінять пам'ять.
+
+    Бюджет max_checks — кількість перевірок слотів (fits, blockers) на весь
+    прохід place_lessons; на відміну від ліміту часу він не залежить від
+    швидкості машини, тож ті самі вхідні дані дають той самий розклад.
+    """
+
+    def __init__(self, generator, placements, max_moves, max_checks):
+        self.gen = generator
+        self.placements = placements
+        self.max_moves = max_moves
+        self.checks = max_checks
+        # індекс слота -> позиції в placements занять, що його займають
+        self.covering = {}
+        self.seen = 0
+        self.group_sets = {}
+        # Плани, ремонт яких не вдався за поточного стану пам'яті
+        self.failed = set()
+
+    def place(self, plan):
+        """
+        Пробує звільнити слот для plan. Повертає (slot, room) — саме заняття
+        не реєструється, це робить викликач — або (None, None). Перенесені
+        заняття оновлюються в placements.
+        """
+        gen = self.gen
+        if self.checks <= 0 or plan.id in gen.overloaded_plans:
+            return None, None
+        self.sync()
+        if plan.id in self.failed:
+            return None, None
+
+        last_slot = gen.last_slots.get(plan.id)
+        journal = []
+        outcome = self.insert(plan, None, self.max_moves, set(), journal)
+
+        result = (None, None)
+        if outcome is not None:
+            used, idx, room = outcome
+            gen.unregister_memory(plan, gen.all_slots[idx], room)
+            result = (gen.all_slots[idx], room)
+            self.failed.clear()
+            gen.log(f"Repair: placed {plan.target_name} by moving {used} lessons")
+        else:
+            self.rollback(journal, 0)
+            self.failed.add(plan.id)
+
+        if last_slot is None:
+            gen.last_slots.pop(plan.id, None)
+        else:
+            gen.last_slots[plan.id] = last_slot
+        return result
+
+    def sync(self):
+        """Індексує заняття, розміщені жадібним проходом з минулого виклику."""
+        for pos in range(self.seen, len(self.placements)):
+            plan_id, idx, _ = self.placements[pos]
+            if idx is not None:
+                self.index(pos, self.gen.plans_map[plan_id], idx, 1)
+                # Нове заняття могло зсунути слот лідера для послідовника
+                self.failed.clear()
+        self.seen = len(self.placements)
+
+    def index(self, pos, plan, idx, delta):
+        for k in range(idx, idx + plan.duration):
+            if delta > 0:
+                self.covering.setdefault(k, set()).add(pos)
+            else:
+                self.covering[k].discard(pos)
+
+    # --- пошук ---
+
+    def insert(self, plan, pos, budget, tabu, journal):
+        """
+        Розміщує plan (pos — його позиція в placements або None для
+        нерозподіленого). Повертає (кількість перенесених занять, слот, room)
+        або None.
+        """
+        for idx in self.gen.candidate_slots[plan.id]:
+            if self.checks <= 0:
+                return None
+            room = self.fits(plan, idx)
+            if room is not None:
+                self.take(plan, pos, idx, room, journal)
+                return 0, idx, room
+        if budget == 0:
+            return None
+
+        options = []
+        for idx in self.gen.candidate_slots[plan.id]:
+            if self.checks <= 0:
+                return None
+            blockers = self.blockers(plan, idx, tabu)
+            if blockers is not None and len(blockers) <= budget:
+                options.append((len(blockers), idx, blockers))
+        options.sort(key=lambda item: item[:2])
+
+        for _, idx, blockers in options:
+            if self.checks <= 0:
+                return None
+            mark = len(journal)
+            outcome = self.try_option(plan, pos, idx, blockers, budget, tabu, journal)
+            if outcome is not None:
+                return outcome
+            self.rollback(journal, mark)
+        return None
+
+    def try_option(self, plan, pos, idx, blockers, budget, tabu, journal):
+        gen = self.gen
+        if not gen.check_sequential(plan, gen.all_slots[idx]):
+            return None
+
+        ejected = [(j, self.drop(j, journal)) for j in sorted(blockers)]
+        room = self.fits(plan, idx)
+        if room is None and len(ejected) < budget:
+            room = self.evict_room(plan, idx, budget - len(ejected), tabu | blockers, ejected, journal)
+        if room is None:
+            return None
+        self.take(plan, pos, idx, room, journal)
+
+        used = len(ejected)
+        tabu = tabu | {j for j, _ in ejected}
+        for j, other in ejected:
+            outcome = self.insert(other, j, budget - used, tabu, journal)
+            if outcome is None:
+                return None
+            used += outcome[0]
+        return used, idx, room
+
+    def evict_room(self, plan, idx, budget, tabu, ejected, journal):
+        """Звільняє придатну аудиторію, витіснивши її зайнятих (не більше budget)."""
+        bucket = self.gen.room_pool.buckets.get(plan.room_type_id)
+        if bucket is None:
+            return None
+        gen = self.gen
+        if not gen.check_slot(plan, idx, sequential=False):
+            return None
+
+        best = None
+        for room in bucket[1]:
+            if room.capacity < plan.audience_size:
+                continue
+            occupants = {
+                j for k in range(idx, idx + plan.duration) for j in self.covering.get(k, ())
+                if self.placements[j][2] == room.id
+            }
+            if not occupants or len(occupants) > budget or occupants & tabu:
+                continue
+            if not all(self.is_movable(j) for j in occupants):
+                continue
+            if best is None or len(occupants) < len(best[1]):
+                best = (room, occupants)
+
+        if best is None:
+            return None
+        room, occupants = best
+        ejected.extend((j, self.drop(j, journal)) for j in sorted(occupants))
+        if gen.occupancy.is_room_busy(room.id, idx, plan.duration):
+            return None
+        return room
+
+    def blockers(self, plan, idx, tabu):
+        """
+        Розміщені заняття, що ділять з plan викладача, групу чи потік у слотах
+        його серії. None, якщо серед них є непереносні.
+        """
+        self.checks -= 1
+        groups = self.groups_of(plan)
+        found = set()
+        for k in range(idx, idx + plan.duration):
+            for j in self.covering.get(k, ()):
+                other = self.gen.plans_map[self.placements[j][0]]
+                if (
+                    other.teacher_id == plan.teacher_id
+                    or (plan.stream_id and other.stream_id == plan.stream_id)
+                    or not groups.isdisjoint(other.group_ids)
+                ):
+                    if j in tabu or not self.is_movable(j):
+                        return None
+                    found.add(j)
+        return found
+
+    def fits(self, plan, idx):
+        """Аудиторія, якщо plan можна поставити в idx за поточного стану, інакше None."""
+        self.checks -= 1
+        gen = self.gen
+        if not gen.check_slot(plan, idx):
+            return None
+        return gen.find_free_room(plan, gen.all_slots[idx])
+
+    def is_movable(self, pos):
+        pc = self.gen.plan_constraints.get(self.placements[pos][0])
+        return pc is None or (pc.leader is None and pc.follower is None)
+
+    def groups_of(self, plan):
+        groups = self.group_sets.get(plan.id)
+        if groups is None:
+            groups = self.group_sets[plan.id] = set(plan.group_ids)
+        return groups
+
+    # --- журнал ---
+    # Пам'ять генератора, covering і placements змінюються одразу; журнал
+    # дозволяє відкотити їх до будь-якої позначки.
+
+    def take(self, plan, pos, idx, room, journal):
+        self.gen.register_memory(plan, self.gen.all_slots[idx], room)
+        if pos is not None:
+            self.index(pos, plan, idx, 1)
+            self.placements[pos] = (plan.id, idx, room.id)
+        journal.append(("take", plan, pos, idx, room))
+
+    def drop(self, pos, journal):
+        plan_id, idx, room_id = self.placements[pos]
+        plan = self.gen.plans_map[plan_id]
+        room = self.gen.room_pool.rooms_by_id[room_id]
+        self.gen.unregister_memory(plan, self.gen.all_slots[idx], room)
+        self.index(pos, plan, idx, -1)
+        self.placements[pos] = (plan_id, None, None)
+        journal.append(("drop", plan, pos, idx, room))
+        return plan
+
+    def rollback(self, journal, mark):
+        while len(journal) > mark:
+            action, plan, pos, idx, room = journal.pop()
+            if action == "take":
+                self.gen.unregister_memory(plan, self.gen.all_slots[idx], room)
+                if pos is not None:
+                    self.index(pos, plan, idx, -1)
+                    self.placements[pos] = (plan.id, None, None)
+            else:
+                self.gen.register_memory(plan, self.gen.all_slots[idx], room)
+                self.index(pos, plan, idx, 1)
+                self.placements[pos] = (plan.id, idx, room.id)
+
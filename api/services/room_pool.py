@@ -0,0 +1,51 @@
+from bisect import bisect_left
+
+
+class RoomPool:
+    """
+    Аудиторії, завантажені один раз на запуск генерації.
+
+    Кімнати згруповані за room_type_id і відсортовані за місткістю, тому
+    пошук першої достатньо великої аудиторії — це bisect, а не повний перебір.
+    Ключ None містить усі аудиторії (для планів без вимог до типу).
+    """
+
+    def __init__(self, rooms):
+        rooms = sorted(rooms, key=lambda r: (r.capacity, r.id))
+        self.rooms_by_id = {r.id: r for r in rooms}
+
+        by_type = {None: rooms}
+        for room in rooms:
+            by_type.setdefault(room.room_type_id, []).append(room)
+
+        self.buckets = {
+            type_id: ([r.capacity for r in items], items)
+            for type_id, items in by_type.items()
+        }
+
+    def find_free(self, room_type_id, needed_cap, occupancy, idx, length=1):
+        """Найменша вільна у слотах idx .. idx + length - 1 аудиторія потрібного типу та місткості."""
+        bucket = self.buckets.get(room_type_id)
+        if bucket is None:
+            return None
+
+        capacities, rooms = bucket
+        is_room_busy = occupancy.is_room_busy
+        for pos in range(bisect_left(capacities, needed_cap), len(rooms)):
+            room = rooms[pos]
+            if not is_room_busy(room.id, idx, length):
+                return room
+        return None
+
+    def free_rooms(self, room_type_id, needed_cap, occupancy, idx, length=1):
+        """Усі вільні у слотах idx .. idx + length - 1 аудиторії потрібного типу та місткості."""
+        bucket = self.buckets.get(room_type_id)
+        if bucket is None:
+            return []
+
+        capacities, rooms = bucket
+        is_room_busy = occupancy.is_room_busy
+        return [
+            room for room in rooms[bisect_left(capacities, needed_cap):]
+            if not is_room_busy(room.id, idx, length)
+        ]
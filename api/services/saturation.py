@@ -0,0 +1,252 @@
+import heapq
+
+from api.services.conf import get_setting
+from api.services.repair import EjectionRepair
+
+ORDERINGS = ("static", "dsatur")
+
+
+class SaturationScheduler:
+    """
+    Розміщення за принципом DSatur: наступним ставиться заняття плану з
+    найменшим запасом допустимих варіантів (кількість пар (слот, вільна
+    придатна аудиторія) мінус кількість ще не розміщених занять); за
+    рівності — у порядку sort_plans.
+
+    Для кожного плану зберігається, скільки вільних придатних аудиторій має
+    кожен стартовий слот, де він ще може стати. Після кожного заняття перевіряються лише
+    зачеплені ним варіанти: у сусідів за викладачем, групою чи потоком —
+    слоти, що перетинаються з ним, і слоти того ж дня для планів з денними
+    лімітами чи екзаменами; у планів, яким підходить зайнята аудиторія,
+    варіанти, що перетинаються з ним, втрачають одну аудиторію. Змінені плани отримують у черзі запис з
+    новим ключем (застарілі відкидаються за версією). Обмеження монотонні,
+    тож вилучений слот більше не стане допустимим.
+
+    Послідовник (sequential_lessons) стає в чергу, лише коли лідер має
+    більше розміщених занять, ніж він сам. Після проходу нерозподілені
+    заняття пробує розмістити EjectionRepair (якщо repair_moves).
+
+    Експериментальний режим: допомагає, коли окремі плани мають дуже мало
+    варіантів, але в середньому не кращий за static і в кілька разів
+    повільніший (кожне заняття змінює ключі всіх планів, яким підходить
+    його аудиторія).
+    """
+
+    def __init__(self, generator):
+        self.gen = generator
+
+    def run(self, sorted_plans):
+        gen = self.gen
+        self.order = {plan.id: pos for pos, plan in enumerate(sorted_plans)}
+        self.remaining = {plan.id: gen.lesson_counts[plan.id] for plan in sorted_plans}
+        self.placed = dict.fromkeys(self.remaining, 0)
+        self.version = dict.fromkeys(self.remaining, 0)
+        self.options = {}
+        self.weight = {}
+        for plan in sorted_plans:
+            options = {}
+            for idx in gen.candidate_slots[plan.id]:
+                rooms = self.open_rooms(plan, idx)
+                if rooms:
+                    options[idx] = rooms
+            self.options[plan.id] = options
+            self.weight[plan.id] = sum(options.values())
+        self.neighbors = self.build_neighbors(sorted_plans)
+        self.plans = sorted_plans
+        self.room_users = {}
+        self.day_bound = {plan.id for plan in sorted_plans if self.has_day_limits(plan)}
+        self.day_slots = {}
+        for idx, day in enumerate(gen.occupancy.slot_day):
+            self.day_slots.setdefault(day, []).append(idx)
+
+        self.leader_of = {}
+        self.followers_of = {}
+        for plan in sorted_plans:
+            seq_config = gen.get_plan_constraints(plan).leader
+            if seq_config and seq_config["leader_plan_id"] in self.remaining:
+                self.leader_of[plan.id] = seq_config["leader_plan_id"]
+                self.followers_of.setdefault(seq_config["leader_plan_id"], []).append(plan.id)
+
+        self.heap = []
+        for plan in sorted_plans:
+            self.push(plan.id)
+
+        placements = []
+        created_count = 0
+        unassigned_count = 0
+        while self.heap:
+            _, _, plan_id, version = heapq.heappop(self.heap)
+            if version != self.version[plan_id] or not self.is_eligible(plan_id):
+                continue
+
+            plan = gen.plans_map[plan_id]
+            idx, room = self.choose(plan)
+            self.remaining[plan_id] -= 1
+            if idx is None:
+                placements.append((plan_id, None, None))
+                unassigned_count += 1
+            else:
+                gen.register_memory(plan, gen.all_slots[idx], room)
+                placements.append((plan_id, idx, room.id))
+                created_count += 1
+                self.placed[plan_id] += 1
+                self.take(plan, idx, room)
+            gen.report_progress(1)
+
+            self.push(plan_id)
+            for follower_id in self.followers_of.get(plan_id, ()):
+                self.push(follower_id)
+
+        if unassigned_count and gen.repair_moves:
+            repaired = self.repair(placements)
+            created_count += repaired
+            unassigned_count -= repaired
+
+        lesson_numbers = {}
+        for plan_id, idx, _ in placements:
+            lesson_numbers[plan_id] = lesson_numbers.get(plan_id, 0) + 1
+            if idx is None:
+                plan = gen.plans_map[plan_id]
+                gen.log(
+                    f"Warning: No slot found for {plan.target_name} (lesson {lesson_numbers[plan_id]}). "
+                    "Added to Unassigned."
+                )
+        return placements, created_count, unassigned_count
+
+    def repair(self, placements):
+        """Розміщує нерозподілені після проходу заняття ланцюжками витіснень. Повертає їх кількість."""
+        gen = self.gen
+        repair = EjectionRepair(gen, placements, gen.repair_moves, get_setting("REPAIR_CHECKS"))
+        repaired = 0
+        for pos, (plan_id, idx, _) in enumerate(placements):
+            if idx is not None:
+                continue
+            plan = gen.plans_map[plan_id]
+            slot, room = repair.place(plan)
+            if slot is None:
+                continue
+            gen.register_memory(plan, slot, room)
+            idx = gen.occupancy.index_of(slot.id)
+            placements[pos] = (plan_id, idx, room.id)
+            repair.index(pos, plan, idx, 1)
+            repaired += 1
+        return repaired
+
+    def build_neighbors(self, plans):
+        by_resource = {}
+        for plan in plans:
+            keys = [("teacher", plan.teacher_id)]
+            keys.extend(("group", group_id) for group_id in plan.group_ids)
+            if plan.stream_id:
+                keys.append(("stream", plan.stream_id))
+            for key in keys:
+                by_resource.setdefault(key, []).append(plan)
+
+        neighbors = {plan.id: {} for plan in plans}
+        for members in by_resource.values():
+            for plan in members:
+                neighbors[plan.id].update((other.id, other) for other in members)
+        return {plan_id: list(items.values()) for plan_id, items in neighbors.items()}
+
+    def open_rooms(self, plan, idx):
+        """Кількість вільних придатних аудиторій, якщо слот допустимий без урахування sequential_lessons, інакше 0."""
+        gen = self.gen
+        if not gen.check_slot(plan, idx, sequential=False):
+            return 0
+        return len(gen.room_pool.free_rooms(plan.room_type_id, plan.audience_size, gen.occupancy, idx, plan.duration))
+
+    def has_day_limits(self, plan):
+        """Чи залежать варіанти плану від інших занять того ж дня."""
+        pc = self.gen.get_plan_constraints(plan)
+        return plan.is_exam or pc.teacher_daily_limit is not None or bool(pc.group_daily_limits)
+
+    def is_eligible(self, plan_id):
+        if self.remaining[plan_id] == 0:
+            return False
+        leader_id = self.leader_of.get(plan_id)
+        if leader_id is None or self.remaining[leader_id] == 0:
+            return True
+        return self.placed[plan_id] < self.placed[leader_id]
+
+    def push(self, plan_id):
+        self.version[plan_id] += 1
+        if self.is_eligible(plan_id):
+            slack = self.weight[plan_id] - self.remaining[plan_id]
+            heapq.heappush(self.heap, (slack, self.order[plan_id], plan_id, self.version[plan_id]))
+
+    def choose(self, plan):
+        gen = self.gen
+        for idx in sorted(self.options[plan.id]):
+            slot = gen.all_slots[idx]
+            if not gen.check_sequential(plan, slot):
+                continue
+            room = gen.find_free_room(plan, slot)
+            if room is not None:
+                return idx, room
+        return None, None
+
+    def users_of(self, room):
+        """Плани, яким може дістатися ця аудиторія."""
+        users = self.room_users.get(room.id)
+        if users is None:
+            users = self.room_users[room.id] = [
+                plan for plan in self.plans
+                if plan.room_type_id in (None, room.room_type_id) and plan.audience_size <= room.capacity
+            ]
+        return users
+
+    def take(self, plan, idx, room):
+        """Оновлює варіанти планів, яких торкнулося заняття plan у слоті idx."""
+        end = idx + plan.duration
+        changed = set()
+
+        for other in self.neighbors[plan.id]:
+            options = self.options[other.id]
+            for start in range(idx - other.duration + 1, end):
+                if start in options:
+                    self.weight[other.id] -= options.pop(start)
+                    changed.add(other.id)
+            if other.id in self.day_bound:
+                day = self.gen.occupancy.slot_day[idx]
+                self.recheck(other, self.day_slots[day], changed)
+
+        # Для решти планів, яким підходить аудиторія, змінилася лише вона:
+        # варіант втрачає її, якщо вона була вільна в інших його парах
+        is_room_busy = self.gen.occupancy.is_room_busy
+        for other in self.users_of(room):
+            if not self.remaining[other.id]:
+                continue
+            options = self.options[other.id]
+            for start in range(idx - other.duration + 1, end):
+                rooms = options.get(start)
+                if rooms is None:
+                    continue
+                if other.duration > 1 and any(
+                    is_room_busy(room.id, k) for k in range(start, start + other.duration) if not idx <= k < end
+                ):
+                    continue
+                self.weight[other.id] -= 1
+                if rooms > 1:
+                    options[start] = rooms - 1
+                else:
+                    del options[start]
+                changed.add(other.id)
+
+        changed.discard(plan.id)
+        for other_id in changed:
+            self.push(other_id)
+
+    def recheck(self, plan, starts, changed):
+        options = self.options[plan.id]
+        for start in starts:
+            rooms = options.get(start)
+            if rooms is None:
+                continue
+            now = self.open_rooms(plan, start)
+            if now != rooms:
+                self.weight[plan.id] += now - rooms
+                if now:
+                    options[start] = now
+                else:
+                    del options[start]
+                changed.add(plan.id)
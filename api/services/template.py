@@ -0,0 +1,112 @@
+from array import array
+
+
+class WeekTemplate:
+    """
+    Сітка шаблону тижня (week_type, day_of_week, period_number) поверх
+    датованих слотів семестру.
+
+    Кожна клітинка — індекси її слотів у порядку дат. Недоступні дати
+    (свята, перенесення) лишаються в клітинці й відсіюються як винятки під
+    час розгортання, тож заняття зберігає свій день тижня та пару.
+
+    Для кожного ресурсу (викладач, група, потік, аудиторія) ведеться
+    кількість зайнятих дат у кожній клітинці. Пошук клітинки за ними
+    відкидає зайняті клітинки та оцінює вільні без перегляду їхніх дат.
+    """
+
+    def __init__(self, slots):
+        self.cells = {}
+        self.cell_of = []
+        for idx, slot in enumerate(slots):
+            key = (slot.week_type, slot.day_of_week, slot.period_number)
+            self.cells.setdefault(key, []).append(idx)
+            self.cell_of.append(key)
+
+        # Чисельник і знаменник однієї пари поруч: щотижневе заняття
+        # займає обидві клітинки підряд
+        self.keys = sorted(self.cells, key=lambda key: (key[1], key[2], key[0]))
+
+        self.position = {key: pos for pos, key in enumerate(self.keys)}
+        self.cell_pos = array("I", (self.position[key] for key in self.cell_of))
+        # (вид ресурсу, id) -> кількість зайнятих дат по позиціях клітинок
+        self.busy = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def copy(self):
+        """Копія з власними лічильниками зайнятості (сітка спільна)."""
+        other = object.__new__(WeekTemplate)
+        other.__dict__.update(self.__dict__)
+        other.busy = {resource: array("H", counts) for resource, counts in self.busy.items()}
+        return other
+
+    def load(self, occupancy):
+        """Лічильники за наявним станом індексу зайнятості (закріплені заняття)."""
+        self.busy = {}
+        tables = (
+            ("teacher", occupancy.teachers),
+            ("group", occupancy.groups),
+            ("stream", occupancy.streams),
+            ("room", occupancy.rooms),
+        )
+        for kind, table in tables:
+            for resource_id, row in table.items():
+                counts = self.counts((kind, resource_id))
+                for idx, value in enumerate(row):
+                    if value:
+                        counts[self.cell_pos[idx]] += 1
+
+    def counts(self, resource):
+        counts = self.busy.get(resource)
+        if counts is None:
+            counts = self.busy[resource] = array("H", bytes(2 * len(self.keys)))
+        return counts
+
+    def update(self, occupancy, plan, room_id, idx, length, delta):
+        """
+        Оновлює лічильники після occupy (delta 1) або release (delta -1):
+        дата зайнята, щойно рядок ресурсу в ній став ненульовим.
+        """
+        resources = [("teacher", plan.teacher_id, occupancy.teachers)]
+        resources.extend(("group", group_id, occupancy.groups) for group_id in plan.group_ids)
+        if plan.stream_id is not None:
+            resources.append(("stream", plan.stream_id, occupancy.streams))
+        if room_id is not None:
+            resources.append(("room", room_id, occupancy.rooms))
+
+        edge = 1 if delta > 0 else 0
+        for kind, resource_id, table in resources:
+            row = table[resource_id]
+            counts = self.counts((kind, resource_id))
+            for i in range(idx, idx + length):
+                if row[i] == edge:
+                    counts[self.cell_pos[i]] += delta
+
+    def run_of(self, key, length):
+        """
+        Позиції клітинок, які займає заняття з length пар від клітинки key.
+        Для кандидата серія пар поспіль є в ту саму дату, тож і клітинки є.
+        """
+        week_type, day, period = key
+        return [self.position[(week_type, day, period + offset)] for offset in range(length)]
+
+    def busy_dates(self, resources, run):
+        """Найбільша кількість зайнятих дат серед ресурсів у клітинках run."""
+        busy = 0
+        for resource in resources:
+            counts = self.busy.get(resource)
+            if counts is not None:
+                for pos in run:
+                    busy = max(busy, counts[pos])
+        return busy
+
+    def free_dates(self, resources, run):
+        """
+        Верхня межа кількості дат, у які всі ресурси вільні на всій серії run:
+        кожна зайнята дата клітинки серії виключає одну дату початку.
+        """
+        return min(
+            len(self.cells[self.keys[pos]]) - self.busy_dates(resources, [pos]) for pos in run
+        )
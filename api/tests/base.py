@@ -0,0 +1,76 @@
+import datetime
+
+from django.test import TestCase
+
+from api.models import (
+    ClassType, Group, Lesson, Room, RoomType, Semester, SemesterConstraint, Stream, StudyPlan, Subject, Teacher
+)
+
+ALL_PERIODS = [1, 2, 3, 4]
+
+
+def only_monday(*periods):
+    """time_block, що лишає вільними лише вказані пари понеділка."""
+    value = {str(day): ALL_PERIODS for day in range(2, 6)}
+    value["1"] = [p for p in ALL_PERIODS if p not in periods]
+    return {"type": "time_block", "value": value}
+
+
+class ScheduleTestCase(TestCase):
+    """Один тиждень (пн-пт, 4 пари), одна аудиторія і два викладачі."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(
+            name="Test", start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2025, 9, 5)
+        )
+        cls.semester.synchronize_slots()
+        cls.class_type = ClassType.objects.create(name="Практична")
+        cls.room_type = RoomType.objects.create(name="General")
+        cls.room = Room.objects.create(title="101", building="A", capacity=60, room_type=cls.room_type)
+        cls.subject = Subject.objects.create(name="Math")
+        cls.teachers = [Teacher.objects.create(name=f"T{i}") for i in range(2)]
+        cls.groups = [Group.objects.create(name=f"G{i}", amount=20, start_year=2024) for i in range(2)]
+        cls.stream = Stream.objects.create(name="S")
+        cls.stream.groups.set(cls.groups)
+
+    @classmethod
+    def create_plan(cls, amount, group=None, stream=None, teacher=None, subject=None):
+        return StudyPlan.objects.create(
+            semester=cls.semester, group=group, stream=stream, subject=subject or cls.subject,
+            teacher=teacher or cls.teachers[0], class_type=cls.class_type, amount=amount,
+        )
+
+    @classmethod
+    def create_constraint(cls, configuration, **entity):
+        return SemesterConstraint.objects.create(semester=cls.semester, configuration=configuration, **entity)
+
+    def lesson_rows(self):
+        return sorted(
+            Lesson.objects.filter(study_plan__semester=self.semester)
+            .values_list("id", "study_plan_id", "time_slot_id", "room_id", "is_locked")
+        )
+
+    def assert_no_conflicts(self):
+        """Жодна аудиторія, викладач чи група не зайняті двічі в одному слоті, аудиторії вміщують слухачів."""
+        seen = set()
+        lessons = (
+            Lesson.objects.filter(study_plan__semester=self.semester, time_slot__isnull=False)
+            .select_related("study_plan__group", "room")
+            .prefetch_related("study_plan__stream__groups")
+        )
+        for lesson in lessons:
+            plan = lesson.study_plan
+            if plan.group_id:
+                group_ids = [plan.group_id]
+                audience = plan.group.amount
+            else:
+                groups = list(plan.stream.groups.all())
+                group_ids = [group.id for group in groups]
+                audience = sum(group.amount for group in groups)
+            self.assertGreaterEqual(lesson.room.capacity, audience)
+            keys = [("room", lesson.room_id), ("teacher", plan.teacher_id)]
+            keys.extend(("group", group_id) for group_id in group_ids)
+            for key in keys:
+                self.assertNotIn((key, lesson.time_slot_id), seen)
+                seen.add((key, lesson.time_slot_id))
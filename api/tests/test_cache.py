@@ -0,0 +1,47 @@
+from api.models import Lesson
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class ResultCacheTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.plan = cls.create_plan(4, group=cls.groups[0])
+
+    def setUp(self):
+        self.first = ScheduleGenerator(self.semester.id).generate()
+        self.rows = self.lesson_rows()
+
+    def test_unchanged_input_reuses_last_run(self):
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertTrue(result["cached"])
+        self.assertEqual(result["cached_run"], self.first["run"])
+        self.assertEqual(self.lesson_rows(), self.rows)
+
+    def test_manual_edit_of_generated_lesson_invalidates(self):
+        Lesson.objects.filter(study_plan=self.plan).first().delete()
+
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertNotIn("cached", result)
+        self.assertEqual(Lesson.objects.filter(study_plan=self.plan).count(), 4)
+
+    def test_input_change_invalidates(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 1}, group=self.groups[0])
+
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertNotIn("cached", result)
+
+    def test_options_and_force_bypass_cache(self):
+        self.assertNotIn("cached", ScheduleGenerator(self.semester.id, seed=1).generate())
+        self.assertNotIn("cached", ScheduleGenerator(self.semester.id, seed=1, force=True).generate())
+
+    def test_result_settings_invalidate(self):
+        for name, value in (("REPAIR_CHECKS", 10), ("LOCAL_SEARCH_WEIGHTS", {"unassigned": 1})):
+            with self.subTest(name), self.settings(SCHEDULE_GENERATOR={name: value}):
+                self.assertNotIn("cached", ScheduleGenerator(self.semester.id).generate())
+                self.assertTrue(ScheduleGenerator(self.semester.id).generate()["cached"])
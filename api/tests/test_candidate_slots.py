@@ -0,0 +1,111 @@
+import datetime
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from api.services.constraints import EMPTY_PLAN_CONSTRAINTS, build_candidate_slots, compile_constraints
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase, only_monday
+
+
+def plan(plan_id, teacher_id=1, group_ids=(), stream_id=None, duration=1):
+    return SimpleNamespace(
+        id=plan_id, teacher_id=teacher_id, group_ids=frozenset(group_ids), stream_id=stream_id, duration=duration
+    )
+
+
+def constraint(configuration, teacher_id=None, group_id=None, stream_id=None):
+    return SimpleNamespace(
+        configuration=configuration, teacher_id=teacher_id, group_id=group_id, stream_id=stream_id
+    )
+
+
+class CompileConstraintsTests(SimpleTestCase):
+    def test_constraints_attach_through_teacher_group_and_stream(self):
+        plans = [plan(1, teacher_id=1, group_ids=[10]), plan(2, teacher_id=2, group_ids=[10, 11], stream_id=5)]
+        compiled = compile_constraints([
+            constraint({"type": "day_off", "days": [5]}, teacher_id=1),
+            constraint({"type": "time_block", "value": {"1": [1, 2]}}, group_id=11),
+            constraint({"type": "time_block", "value": {"3": [4]}}, stream_id=5),
+        ], plans)
+
+        self.assertEqual((compiled[1].days_off, compiled[1].blocked_periods), ({5}, set()))
+        self.assertEqual(compiled[2].days_off, set())
+        self.assertEqual(compiled[2].blocked_periods, {("1", 1), ("1", 2), ("3", 4)})
+
+    def test_daily_limits(self):
+        plans = [plan(1, teacher_id=1, group_ids=[10]), plan(2, teacher_id=1, group_ids=[12])]
+        compiled = compile_constraints([
+            constraint({"type": "max_daily_lessons", "value": 4}, teacher_id=1),
+            constraint({"type": "max_daily_lessons", "value": 3}, teacher_id=1),
+            constraint({"type": "max_daily_lessons", "value": 2}, group_id=10),
+            # Потік без власних планів: склад береться з stream_groups
+            constraint({"type": "max_daily_lessons", "value": 1}, stream_id=5),
+        ], plans, {5: {12}})
+
+        self.assertEqual((compiled[1].teacher_daily_limit, compiled[1].group_daily_limits), (3, {10: 2}))
+        self.assertEqual(compiled[2].group_daily_limits, {12: 1})
+
+    def test_sequential_links(self):
+        value = {"leader_plan_id": 1, "follower_plan_id": 2, "time_gap": 1}
+        compiled = compile_constraints(
+            [constraint({"type": "sequential_lessons", "value": value})], [plan(1), plan(2), plan(3)]
+        )
+
+        self.assertEqual((compiled[1].follower, compiled[1].leader), (value, None))
+        self.assertEqual((compiled[2].follower, compiled[2].leader), (None, value))
+        self.assertEqual((compiled[3].follower, compiled[3].leader), (None, None))
+
+
+class CandidateSlotsTests(SimpleTestCase):
+    """Понеділок і вівторок по три пари; третя пара вівторка недоступна."""
+
+    def setUp(self):
+        self.slots = [
+            SimpleNamespace(
+                date=datetime.date(2025, 9, day), day_of_week=day, period_number=period,
+                is_available=(day, period) != (2, 3),
+            )
+            for day in (1, 2) for period in (1, 2, 3)
+        ]
+
+    def compile(self, *configurations):
+        return compile_constraints([constraint(c, teacher_id=1) for c in configurations], [plan(1)])
+
+    def test_static_constraints_and_availability(self):
+        candidates = build_candidate_slots({}, [plan(1)], self.slots)
+        self.assertEqual(list(candidates[1]), [0, 1, 2, 3, 4])
+
+        compiled = self.compile({"type": "day_off", "days": [1]})
+        self.assertEqual(list(build_candidate_slots(compiled, [plan(1)], self.slots)[1]), [3, 4])
+
+        compiled = self.compile({"type": "time_block", "value": {"1": [2], "2": [1]}})
+        self.assertEqual(list(build_candidate_slots(compiled, [plan(1)], self.slots)[1]), [0, 2, 4])
+
+    def test_runs_for_multi_period_plans(self):
+        candidates = build_candidate_slots({}, [plan(1, duration=2), plan(2, duration=3)], self.slots)
+
+        self.assertEqual(list(candidates[1]), [0, 1, 3])
+        self.assertEqual(list(candidates[2]), [0])
+
+    def test_equal_constraints_share_one_array(self):
+        plans = [plan(1), plan(2), plan(3, duration=2)]
+
+        candidates = build_candidate_slots({1: EMPTY_PLAN_CONSTRAINTS}, plans, self.slots)
+
+        self.assertIs(candidates[1], candidates[2])
+        self.assertIsNot(candidates[1], candidates[3])
+
+
+class CandidateScanTests(ScheduleTestCase):
+    def test_tight_plan_checks_only_its_slots(self):
+        self.create_constraint(only_monday(1), group=self.groups[0])
+        tight = self.create_plan(1, group=self.groups[0])
+
+        generator = ScheduleGenerator(self.semester.id)
+        result = generator.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assertEqual(len(generator.candidate_slots[tight.id]), 1)
+        self.assertEqual(generator.metrics.calls["check_dynamic_constraints"], 1)
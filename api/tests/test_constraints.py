@@ -0,0 +1,34 @@
+from collections import Counter
+
+from api.models import Lesson
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class StreamDailyLimitTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_constraint({"type": "max_daily_lessons", "value": 1}, stream=cls.stream)
+        # Власний план групи потоку, без жодного плану самого потоку
+        cls.plan = cls.create_plan(5, group=cls.groups[0])
+
+    def test_stream_limit_applies_to_member_group_plans(self):
+        generator = ScheduleGenerator(self.semester.id)
+        result = generator.generate()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(generator.plan_constraints[self.plan.id].group_daily_limits, {self.groups[0].id: 1})
+        per_day = Counter(
+            Lesson.objects.filter(study_plan=self.plan, time_slot__isnull=False).values_list("time_slot__date", flat=True)
+        )
+        self.assertEqual(sum(per_day.values()), 5)
+        self.assertEqual(max(per_day.values()), 1)
+
+    def test_group_limit_is_min_of_own_and_stream_limit(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 3}, group=self.groups[0])
+        generator = ScheduleGenerator(self.semester.id)
+        generator.generate()
+
+        self.assertEqual(generator.plan_constraints[self.plan.id].group_daily_limits, {self.groups[0].id: 1})
@@ -0,0 +1,34 @@
+from api.models import GenerationRun, Lesson
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class DryRunTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.plan = cls.create_plan(3, group=cls.groups[0])
+
+    def test_dry_run_writes_nothing(self):
+        ScheduleGenerator(self.semester.id).generate()
+        rows = self.lesson_rows()
+        runs = GenerationRun.objects.count()
+        self.plan.amount = 5
+        self.plan.save()
+
+        result = ScheduleGenerator(self.semester.id, incremental=True, dry_run=True).generate()
+
+        self.assertTrue(result["success"])
+        self.assertIsNone(result["run"])
+        self.assertEqual(self.lesson_rows(), rows)
+        self.assertEqual(GenerationRun.objects.count(), runs)
+        summary = result["diff"]["summary"]
+        self.assertEqual(summary["added"] - summary["removed"], 2)
+
+    def test_dry_run_on_empty_semester_lists_all_lessons_as_added(self):
+        result = ScheduleGenerator(self.semester.id, dry_run=True).generate()
+
+        self.assertEqual(result["diff"]["summary"], {"added": 3, "moved": 0, "removed": 0, "newly_unassigned": 0})
+        self.assertFalse(Lesson.objects.exists())
+        self.assertFalse(GenerationRun.objects.exists())
@@ -0,0 +1,90 @@
+from collections import Counter
+
+from api.models import Lesson, StudyPlan, Subject
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class MultiPeriodLessonTests(ScheduleTestCase):
+    def create_lab(self, amount, duration, **plan):
+        lab = self.create_plan(amount, subject=Subject.objects.create(name=f"Lab {duration}"), **plan)
+        StudyPlan.objects.filter(pk=lab.pk).update(duration=duration)
+        return lab
+
+    def generate(self):
+        result = ScheduleGenerator(self.semester.id).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        return result
+
+    def runs(self, plan):
+        """Серії рядків заняття: [(дата, [пари], {аудиторії})] у порядку слотів."""
+        rows = Lesson.objects.filter(study_plan=plan, time_slot__isnull=False).order_by(
+            "time_slot__date", "time_slot__period_number"
+        ).values_list("time_slot__date", "time_slot__period_number", "room_id")
+        runs = []
+        for date, period, room_id in rows:
+            if runs and runs[-1][0] == date and runs[-1][1][-1] == period - 1 and len(runs[-1][1]) < plan.duration:
+                runs[-1][1].append(period)
+                runs[-1][2].add(room_id)
+            else:
+                runs.append((date, [period], {room_id}))
+        return runs
+
+    def test_lesson_takes_consecutive_periods(self):
+        lab = self.create_lab(3, 2, group=self.groups[0])
+        # Той самий викладач заповнює решту пар тижня
+        self.create_plan(14, group=self.groups[1])
+
+        result = self.generate()
+
+        self.assertEqual((result["created"], result["unassigned"]), (17, 0))
+        lab.refresh_from_db()
+        runs = self.runs(lab)
+        self.assertEqual(len(runs), 3)
+        for date, periods, rooms in runs:
+            self.assertEqual(len(periods), 2)
+            self.assertEqual(len(rooms), 1)
+        self.assertEqual(Lesson.objects.filter(study_plan=lab).count(), 6)
+
+    def test_run_does_not_cross_blocked_period(self):
+        # Вільні лише 1-2 та 4 пари: серія з трьох пар не вміщується ніде
+        self.create_constraint(
+            {"type": "time_block", "value": {str(day): [3] for day in range(1, 6)}}, group=self.groups[0]
+        )
+        double = self.create_lab(2, 2, group=self.groups[0])
+        triple = self.create_lab(1, 3, group=self.groups[0], teacher=self.teachers[1])
+
+        result = self.generate()
+
+        self.assertEqual(result["unassigned"], 1)
+        self.assertFalse(Lesson.objects.filter(study_plan=triple, time_slot__isnull=False).exists())
+        double.refresh_from_db()
+        self.assertEqual([periods for _, periods, _ in self.runs(double)], [[1, 2], [1, 2]])
+
+    def test_run_skips_partially_busy_slots(self):
+        # Закріплене заняття групи на другій парі понеділка розриває серію 1-3
+        monday = self.semester.timeslots.filter(date__week_day=2)
+        locked = self.create_plan(1, group=self.groups[0], teacher=self.teachers[1])
+        Lesson.objects.create(study_plan=locked, time_slot=monday.get(period_number=2), room=self.room, is_locked=True)
+        lab = self.create_lab(1, 2, group=self.groups[0])
+
+        self.generate()
+
+        lab.refresh_from_db()
+        [(date, periods, _)] = self.runs(lab)
+        self.assertEqual((date.isoweekday(), periods), (1, [3, 4]))
+
+    def test_daily_limit_counts_every_period(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 3}, group=self.groups[0])
+        self.create_lab(5, 2, group=self.groups[0])
+        self.create_plan(5, group=self.groups[0], teacher=self.teachers[1])
+
+        result = self.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        per_day = Counter(
+            Lesson.objects.filter(study_plan__group=self.groups[0]).values_list("time_slot__date", flat=True)
+        )
+        self.assertEqual(set(per_day.values()), {3})
@@ -0,0 +1,111 @@
+from unittest import skipUnless
+
+from django.test import override_settings
+
+from api.models import Group, Lesson, Subject, Teacher
+from api.serializers import GenerationRequestSerializer
+from api.services import cpsat
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase, only_monday
+
+
+class ExactEngineTests(ScheduleTestCase):
+    """Одна аудиторія на 20 слотів; repair вимкнено, щоб жадібний прохід лишав нерозподілені."""
+
+    def generate(self, engine, **options):
+        options.setdefault("time_limit", 10)
+        result = ScheduleGenerator(self.semester.id, engine=engine, repair_moves=0, **options).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        return result
+
+    def create_trap(self):
+        """Лідер займає перший слот, який потрібен плану з одним дозволеним слотом."""
+        group = Group.objects.create(name="G2", amount=20, start_year=2024)
+        self.create_constraint(only_monday(1), group=group)
+        leader = self.create_plan(2, group=self.groups[1], teacher=self.teachers[1])
+        follower = self.create_plan(
+            2, group=self.groups[1], teacher=self.teachers[1], subject=Subject.objects.create(name="Lab")
+        )
+        self.create_constraint({
+            "type": "sequential_lessons",
+            "value": {"leader_plan_id": leader.id, "follower_plan_id": follower.id, "time_gap": 1},
+        })
+        tight = self.create_plan(1, group=group, teacher=Teacher.objects.create(name="T2"))
+        return leader, follower, tight
+
+    def assert_follows(self, leader, follower):
+        leader_slots = {
+            (slot.date, slot.period_number)
+            for slot in (lesson.time_slot for lesson in Lesson.objects.filter(study_plan=leader))
+        }
+        for lesson in Lesson.objects.filter(study_plan=follower).select_related("time_slot"):
+            slot = lesson.time_slot
+            self.assertIn((slot.date, slot.period_number - 1), leader_slots)
+
+    def check_proven_optimal(self, engine, proof):
+        leader, follower, tight = self.create_trap()
+        self.assertEqual(ScheduleGenerator(self.semester.id, repair_moves=0).generate()["unassigned"], 1)
+
+        solver = self.generate(engine)["solver"]
+
+        self.assertEqual(solver["status"], "feasible")
+        self.assertEqual((solver["unassigned_before"], solver["unassigned_after"]), (1, 0))
+        self.assertEqual(solver["solved_by"], {proof: 1})
+        self.assertTrue(Lesson.objects.filter(study_plan=tight, time_slot__isnull=False).exists())
+        self.assert_follows(leader, follower)
+
+    def test_search_reaches_optimum_with_chain(self):
+        self.check_proven_optimal("csp", "search")
+
+    @skipUnless(cpsat.is_available(), "OR-Tools is not installed")
+    def test_cpsat_models_sequential_chain(self):
+        self.check_proven_optimal("cpsat", "cp-sat")
+
+    def test_lower_bound_proves_greedy_optimal(self):
+        self.create_plan(25, group=self.groups[0])
+
+        solver = self.generate("csp")["solver"]
+
+        self.assertEqual(solver["status"], "infeasible")
+        self.assertEqual(solver["solved_by"], {"bound": 1})
+        self.assertEqual(solver["nodes"], 0)
+        certificate = solver["certificate"][0]
+        self.assertEqual((certificate["min_unassigned"], certificate["proof"]), (5, "bound"))
+        self.assertIn(
+            {"resource": "teacher", "id": self.teachers[0].id, "demand": 25, "slots": 20}, certificate["bottlenecks"]
+        )
+
+    def check_room_bottleneck(self, engine, proof):
+        # Два незалежні плани на два спільні слоти й одну аудиторію
+        for group, teacher in zip(self.groups, self.teachers):
+            self.create_constraint(only_monday(1, 2), group=group)
+            self.create_plan(2, group=group, teacher=teacher)
+
+        solver = self.generate(engine)["solver"]
+
+        self.assertEqual(solver["status"], "infeasible")
+        self.assertEqual(solver["unassigned_after"], 2)
+        self.assertEqual(solver["certificate"][0]["proof"], proof)
+
+    def test_search_proves_room_bottleneck(self):
+        self.check_room_bottleneck("csp", "search")
+
+    @skipUnless(cpsat.is_available(), "OR-Tools is not installed")
+    def test_cpsat_proves_room_bottleneck(self):
+        self.check_room_bottleneck("cpsat", "cp-sat")
+
+    def test_timeout_keeps_greedy_placement(self):
+        self.create_trap()
+
+        result = self.generate("csp", time_limit=0)
+
+        self.assertEqual(result["solver"]["status"], "timeout")
+        self.assertEqual(result["unassigned"], 1)
+        self.assertEqual(Lesson.objects.filter(time_slot__isnull=True).count(), 1)
+
+    @override_settings(SCHEDULE_GENERATOR={"MAX_SOLVER_TIME_LIMIT": 60})
+    def test_request_time_limit_is_capped(self):
+        for seconds, valid in ((60, True), (61, False)):
+            serializer = GenerationRequestSerializer(data={"semester_id": self.semester.id, "time_limit": seconds})
+            self.assertEqual(serializer.is_valid(), valid, serializer.errors)
@@ -0,0 +1,72 @@
+import datetime
+
+from django.db.models import Q
+
+from api.models import ClassType, Lesson, Semester, StudyPlan, Subject, Teacher
+from api.services.generator import ScheduleGenerator, is_exam_type
+
+from .base import ScheduleTestCase
+
+
+class ExamCalendarTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.exam_type = ClassType.objects.create(name="Екзамен")
+
+    def create_exam(self, name, group=None, stream=None, semester=None):
+        return StudyPlan.objects.create(
+            semester=semester or self.semester, group=group, stream=stream,
+            subject=Subject.objects.create(name=name), teacher=Teacher.objects.create(name=f"Examiner {name}"),
+            class_type=self.exam_type, amount=1,
+        )
+
+    def exam_dates(self, group):
+        return list(
+            Lesson.objects.filter(study_plan__class_type=self.exam_type, study_plan__semester=self.semester)
+            .filter(Q(study_plan__group=group) | Q(study_plan__stream__groups=group))
+            .values_list("time_slot__date", flat=True)
+        )
+
+    def test_exam_type_names(self):
+        self.assertTrue(is_exam_type("Екзамен"))
+        self.assertTrue(is_exam_type("Final EXAM"))
+        self.assertFalse(is_exam_type("Практична"))
+
+    def test_one_exam_per_group_per_day(self):
+        for name in ("Algebra", "Physics", "History"):
+            self.create_exam(name, group=self.groups[0])
+        self.create_exam("Philosophy", stream=self.stream)
+
+        generator = ScheduleGenerator(self.semester.id)
+        result = generator.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assert_no_conflicts()
+        dates = self.exam_dates(self.groups[0])
+        self.assertEqual(len(dates), 4)
+        self.assertEqual(len(set(dates)), 4)
+        self.assertGreater(generator.metrics.rejected["check_exam_day_limit"], 0)
+
+    def test_regular_lessons_share_a_day_with_exam(self):
+        self.create_exam("Algebra", group=self.groups[0])
+        self.create_plan(3, group=self.groups[0], teacher=self.teachers[1])
+
+        ScheduleGenerator(self.semester.id).generate()
+
+        dates = set(Lesson.objects.filter(study_plan__group=self.groups[0]).values_list("time_slot__date", flat=True))
+        self.assertEqual(dates, {datetime.date(2025, 9, 1)})
+
+    def test_exams_of_other_semesters_are_ignored(self):
+        other = Semester.objects.create(
+            name="Parallel", start_date=self.semester.start_date, end_date=self.semester.end_date
+        )
+        other.synchronize_slots()
+        other_exam = self.create_exam("Chemistry", group=self.groups[0], semester=other)
+        for slot in other.timeslots.filter(period_number=1):
+            Lesson.objects.create(study_plan=other_exam, time_slot=slot, room=self.room, is_locked=True)
+        self.create_exam("Algebra", group=self.groups[0])
+
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual(result["unassigned"], 0)
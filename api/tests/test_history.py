@@ -0,0 +1,97 @@
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from api.models import GenerationRun, Lesson, Room, StudyPlan, TimeSlot
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class GenerationHistoryTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.plan = cls.create_plan(4, group=cls.groups[0])
+        cls.create_plan(3, stream=cls.stream, teacher=cls.teachers[1])
+
+    def test_run_is_recorded(self):
+        result = ScheduleGenerator(self.semester.id, seed=3).generate()
+
+        run = GenerationRun.objects.get(pk=result["run"])
+        self.assertEqual((run.semester_id, run.success, run.created, run.unassigned), (self.semester.id, True, 7, 0))
+        self.assertEqual(len(run.input_hash), 40)
+        self.assertEqual(run.options["seed"], 3)
+        self.assertEqual(run.phases, result["metrics"]["phases"])
+        self.assertEqual(run.queries, result["metrics"]["queries"])
+        self.assertNotIn("logs", run.result)
+        self.assertLessEqual(run.started_at, run.finished_at)
+
+    def test_dry_run_is_not_recorded(self):
+        result = ScheduleGenerator(self.semester.id, dry_run=True).generate()
+
+        self.assertIsNone(result["run"])
+        self.assertFalse(GenerationRun.objects.exists())
+
+    def test_list_detail_and_filters(self):
+        first = ScheduleGenerator(self.semester.id).generate()["run"]
+        second = ScheduleGenerator(self.semester.id, seed=1).generate()["run"]
+        input_hash = GenerationRun.objects.get(pk=first).input_hash
+        client = APIClient()
+
+        listed = client.get("/api/generation_runs/", {"semester": self.semester.id}).json()
+        detail = client.get(f"/api/generation_runs/{first}/").json()
+        by_hash = client.get("/api/generation_runs/", {"input_hash": input_hash}).json()
+        other = client.get("/api/generation_runs/", {"input_hash": "0" * 40}).json()
+
+        self.assertEqual({run["id"] for run in listed}, {first, second})
+        self.assertEqual((detail["semester_name"], detail["input_hash"]), ("Test", input_hash))
+        self.assertEqual(len(by_hash), 2)
+        self.assertEqual(other, [])
+
+
+class InputHashTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.plan = cls.create_plan(4, group=cls.groups[0])
+        cls.create_plan(3, stream=cls.stream, teacher=cls.teachers[1])
+
+    def input_hash(self):
+        generator = ScheduleGenerator(self.semester.id, dry_run=True)
+        generator.generate()
+        return generator.input_hash
+
+    def hash_after(self, change):
+        with transaction.atomic():
+            change()
+            value = self.input_hash()
+            transaction.set_rollback(True)
+        return value
+
+    def test_stable_for_unchanged_input(self):
+        baseline = self.input_hash()
+
+        self.assertEqual(self.input_hash(), baseline)
+        # Згенеровані (незакріплені) заняття до вхідних даних не належать
+        ScheduleGenerator(self.semester.id).generate()
+        self.assertEqual(self.input_hash(), baseline)
+
+    def test_changes_with_every_input(self):
+        baseline = self.input_hash()
+        slot = self.semester.timeslots.first()
+        changes = {
+            "plan": lambda: StudyPlan.objects.filter(pk=self.plan.pk).update(amount=5),
+            "constraint": lambda: self.create_constraint(
+                {"type": "max_daily_lessons", "value": 2}, teacher=self.teachers[0]
+            ),
+            "slot": lambda: TimeSlot.objects.filter(pk=slot.pk).update(is_available=False),
+            "room": lambda: Room.objects.filter(pk=self.room.pk).update(capacity=50),
+            "locked lesson": lambda: Lesson.objects.create(
+                study_plan=self.plan, time_slot=slot, room=self.room, is_locked=True
+            ),
+        }
+
+        for name, change in changes.items():
+            with self.subTest(name):
+                self.assertNotEqual(self.hash_after(change), baseline)
+        self.assertEqual(self.input_hash(), baseline)
@@ -0,0 +1,70 @@
+from api.models import Group, Lesson, Room, Subject, Teacher
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class IncrementalGenerationTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.kept_plan = cls.create_plan(3, group=cls.groups[0], teacher=cls.teachers[0])
+        cls.changed_plan = cls.create_plan(2, group=cls.groups[1], teacher=cls.teachers[1])
+
+    def test_locked_and_unchanged_lessons_survive(self):
+        ScheduleGenerator(self.semester.id).generate()
+        locked = Lesson.objects.filter(study_plan=self.changed_plan).first()
+        locked.is_locked = True
+        locked.save()
+        kept = sorted(
+            Lesson.objects.filter(study_plan=self.kept_plan).values_list("id", "time_slot_id", "room_id")
+        )
+
+        self.changed_plan.amount = 3
+        self.changed_plan.save()
+        result = ScheduleGenerator(self.semester.id, incremental=True).generate()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["mode"], "incremental")
+        self.assertEqual(result["kept"], len(kept))
+        self.assertEqual(
+            sorted(Lesson.objects.filter(study_plan=self.kept_plan).values_list("id", "time_slot_id", "room_id")),
+            kept,
+        )
+        locked.refresh_from_db()
+        self.assertTrue(locked.is_locked)
+        self.assertEqual(
+            Lesson.objects.filter(study_plan=self.changed_plan, is_locked=False, time_slot__isnull=False).count(), 3
+        )
+
+    def test_first_incremental_run_is_full(self):
+        result = ScheduleGenerator(self.semester.id, incremental=True).generate()
+
+        self.assertEqual(result["mode"], "full")
+        self.assertEqual(Lesson.objects.filter(study_plan__semester=self.semester).count(), 5)
+
+    def test_moved_leader_takes_its_followers_along(self):
+        for title in ("102", "103"):
+            Room.objects.create(title=title, building="A", capacity=60, room_type=self.room_type)
+        teacher = Teacher.objects.create(name="T2")
+        group = Group.objects.create(name="G2", amount=20, start_year=2024)
+        leader = self.create_plan(1, group=group, teacher=teacher)
+        follower = self.create_plan(1, group=group, teacher=teacher, subject=Subject.objects.create(name="Lab"))
+        self.create_constraint({
+            "type": "sequential_lessons",
+            "value": {"leader_plan_id": leader.id, "follower_plan_id": follower.id, "time_gap": 1},
+        })
+        ScheduleGenerator(self.semester.id).generate()
+        # Слот лідера стає недоступним, а самі плани не змінюються
+        first = Lesson.objects.get(study_plan=leader).time_slot
+        first.is_available = False
+        first.save()
+
+        result = ScheduleGenerator(self.semester.id, incremental=True).generate()
+
+        self.assertEqual((result["mode"], result["unassigned"]), ("incremental", 0))
+        leader_slot = Lesson.objects.get(study_plan=leader).time_slot
+        follower_slot = Lesson.objects.get(study_plan=follower).time_slot
+        self.assertEqual(follower_slot.date, leader_slot.date)
+        self.assertEqual(follower_slot.period_number, leader_slot.period_number + 1)
+        self.assert_no_conflicts()
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import GenerationJob
+from api.services import jobs
+
+from .base import ScheduleTestCase
+
+
+class GenerationJobTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_plan(4, group=cls.groups[0])
+
+    def setUp(self):
+        # run_job закриває з'єднання потоку пулу; у тесті воно спільне з транзакцією TestCase
+        for name in ("connection", "close_old_connections"):
+            patcher = mock.patch.object(jobs, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_stale(self, job):
+        GenerationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def reload(self, job):
+        job.refresh_from_db()
+        return job
+
+    def test_identical_requests_are_coalesced(self):
+        job, created = jobs.enqueue_generation(self.semester.id, {"seed": 1})
+        same, created_again = jobs.enqueue_generation(self.semester.id, {"seed": 1})
+        other, created_other = jobs.enqueue_generation(self.semester.id, {"seed": 2})
+
+        self.assertEqual((created, created_again, created_other), (True, False, True))
+        self.assertEqual(same.pk, job.pk)
+        self.assertNotEqual(other.pk, job.pk)
+
+    def test_stale_job_is_taken_over(self):
+        job, _ = jobs.enqueue_generation(self.semester.id, {})
+        GenerationJob.objects.filter(pk=job.pk).update(status=GenerationJob.Status.RUNNING)
+        self.make_stale(job)
+
+        new, created = jobs.enqueue_generation(self.semester.id, {})
+
+        self.assertTrue(created)
+        self.assertNotEqual(new.pk, job.pk)
+        job = self.reload(job)
+        self.assertEqual((job.status, job.error), (GenerationJob.Status.FAILED, "Interrupted"))
+
+    def test_listing_reports_stale_jobs_without_saving(self):
+        stale, _ = jobs.enqueue_generation(self.semester.id, {"seed": 1})
+        fresh, _ = jobs.enqueue_generation(self.semester.id, {"seed": 2})
+        GenerationJob.objects.update(status=GenerationJob.Status.RUNNING)
+        self.make_stale(stale)
+
+        response = APIClient().get("/api/generation_jobs/")
+
+        self.assertEqual(response.status_code, 200)
+        statuses = {item["id"]: item["status"] for item in response.data}
+        self.assertEqual(statuses, {stale.pk: "FAILED", fresh.pk: "RUNNING"})
+        self.assertEqual(self.reload(stale).status, GenerationJob.Status.RUNNING)
+
+        jobs.enqueue_generation(self.semester.id, {"seed": 3})
+
+        self.assertEqual(self.reload(stale).status, GenerationJob.Status.FAILED)
+        self.assertEqual(self.reload(fresh).status, GenerationJob.Status.RUNNING)
+
+    def test_run_job_stores_result(self):
+        job, _ = jobs.enqueue_generation(self.semester.id, {})
+
+        jobs.run_job(job.pk)
+
+        job = self.reload(job)
+        self.assertEqual((job.status, job.progress), (GenerationJob.Status.SUCCESS, 100))
+        self.assertEqual(job.counters, {"created": 4, "unassigned": 0})
+        self.assertTrue(job.result["success"])
+
+    def test_run_job_failure_is_recorded(self):
+        job, _ = jobs.enqueue_generation(self.semester.id, {})
+
+        with mock.patch.object(jobs, "ScheduleGenerator", side_effect=RuntimeError("boom")):
+            jobs.run_job(job.pk)
+
+        job = self.reload(job)
+        self.assertEqual((job.status, job.error), (GenerationJob.Status.FAILED, "boom"))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_interrupted_job_stays_failed(self):
+        job, _ = jobs.enqueue_generation(self.semester.id, {})
+
+        def generate():
+            # Поки генерація триває, завдання визнають перерваним
+            self.make_stale(job)
+            jobs.fail_stale_jobs()
+            return {"success": True, "created": 4, "unassigned": 0}
+
+        with mock.patch.object(jobs, "ScheduleGenerator") as generator:
+            generator.return_value.generate.side_effect = generate
+            jobs.run_job(job.pk)
+
+        job = self.reload(job)
+        self.assertEqual((job.status, job.error), (GenerationJob.Status.FAILED, "Interrupted"))
+        self.assertIsNone(job.result)
+
+    def test_run_job_skips_interrupted_pending_job(self):
+        job, _ = jobs.enqueue_generation(self.semester.id, {})
+        self.make_stale(job)
+        jobs.fail_stale_jobs()
+
+        with mock.patch.object(jobs, "ScheduleGenerator") as generator:
+            jobs.run_job(job.pk)
+
+        generator.assert_not_called()
+        self.assertEqual(self.reload(job).status, GenerationJob.Status.FAILED)
@@ -0,0 +1,93 @@
+from collections import Counter
+from unittest import mock
+
+from django.test import override_settings
+
+from api.models import Lesson, Subject
+from api.serializers import GenerationRequestSerializer
+from api.services.conf import get_setting
+from api.services.generator import ScheduleGenerator
+from api.services.local_search import LocalSearch
+
+from .base import ScheduleTestCase
+
+
+class LocalSearchTests(ScheduleTestCase):
+    """Жадібний прохід пакує заняття групи в перші слоти, лишаючи вікна й повтори за день."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_constraint({"type": "time_block", "value": {"1": [2]}}, group=cls.groups[0])
+        cls.create_constraint({"type": "max_daily_lessons", "value": 3}, group=cls.groups[1])
+        cls.create_plan(6, group=cls.groups[0])
+        cls.create_plan(5, group=cls.groups[1], teacher=cls.teachers[1])
+        cls.create_plan(2, stream=cls.stream, teacher=cls.teachers[1], subject=Subject.objects.create(name="Lecture"))
+        cls.leader = cls.create_plan(2, group=cls.groups[1], subject=Subject.objects.create(name="Lab"))
+        cls.follower = cls.create_plan(2, group=cls.groups[1], subject=Subject.objects.create(name="Lab 2"))
+        cls.create_constraint({
+            "type": "sequential_lessons",
+            "value": {"leader_plan_id": cls.leader.id, "follower_plan_id": cls.follower.id, "time_gap": 1},
+        })
+
+    def improve(self, seed=0, iterations=2000):
+        with override_settings(SCHEDULE_GENERATOR={"LOCAL_SEARCH_ITERATIONS": iterations}):
+            result = ScheduleGenerator(self.semester.id, improve_seconds=30, seed=seed, force=True).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        return result
+
+    def placements(self):
+        return sorted(Lesson.objects.values_list("study_plan_id", "time_slot_id", "room_id", "is_locked"))
+
+    def test_keeps_hard_constraints(self):
+        result = self.improve()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assert_no_conflicts()
+        slots = list(Lesson.objects.filter(study_plan__group=self.groups[0]).values_list(
+            "time_slot__date", "time_slot__period_number"
+        ))
+        self.assertNotIn(2, [period for date, period in slots if date.isoweekday() == 1])
+        per_day = Counter(
+            Lesson.objects.filter(study_plan__group=self.groups[1]).values_list("time_slot__date", flat=True)
+        )
+        self.assertLessEqual(max(per_day.values()), 3)
+        leader_slots = set(Lesson.objects.filter(study_plan=self.leader).values_list(
+            "time_slot__date", "time_slot__period_number"
+        ))
+        for date, period in Lesson.objects.filter(study_plan=self.follower).values_list(
+            "time_slot__date", "time_slot__period_number"
+        ):
+            self.assertIn((date, period - 1), leader_slots)
+
+    def test_penalty_below_greedy_start(self):
+        run = LocalSearch.run
+        recomputed = []
+
+        def checked_run(search, seconds, max_iterations=None):
+            placements, stats = run(search, seconds, max_iterations)
+            # Штраф заново, з нуля, за станом пам'яті після відкату до найкращого
+            fresh = LocalSearch(search.gen, placements, get_setting("LOCAL_SEARCH_WEIGHTS"))
+            recomputed.append(round(fresh.total_cost(), 3))
+            return placements, stats
+
+        with mock.patch.object(LocalSearch, "run", checked_run):
+            stats = self.improve()["local_search"]
+
+        self.assertLess(stats["final_penalty"], stats["initial_penalty"])
+        self.assertEqual(recomputed, [stats["final_penalty"]])
+
+    def test_seed_reproduces_output(self):
+        outputs = []
+        for _ in range(2):
+            stats = self.improve(seed=7)["local_search"]
+            outputs.append((self.placements(), stats["iterations"], stats["final_penalty"]))
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0][1], 2000)
+
+    @override_settings(SCHEDULE_GENERATOR={"MAX_LOCAL_SEARCH_SECONDS": 60})
+    def test_request_seconds_are_capped(self):
+        for seconds, valid in ((60, True), (61, False)):
+            serializer = GenerationRequestSerializer(data={"semester_id": self.semester.id, "improve_seconds": seconds})
+            self.assertEqual(serializer.is_valid(), valid, serializer.errors)
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.services.generator import ScheduleGenerator
+from api.services.metrics import GenerationMetrics, counted
+
+from .base import ScheduleTestCase, only_monday
+
+
+class Checker:
+    def __init__(self):
+        self.metrics = GenerationMetrics()
+
+    @counted("is_even")
+    def is_even(self, value):
+        return value % 2 == 0
+
+
+class GenerationMetricsTests(SimpleTestCase):
+    def test_counted_records_calls_and_rejections(self):
+        checker = Checker()
+
+        results = [checker.is_even(value) for value in range(5)]
+
+        self.assertEqual(results, [True, False, True, False, True])
+        self.assertEqual((checker.metrics.calls["is_even"], checker.metrics.rejected["is_even"]), (5, 2))
+        self.assertEqual(Checker.is_even.__name__, "is_even")
+
+    def test_phases_accumulate_and_checks_merge(self):
+        metrics = GenerationMetrics()
+        metrics.enter("load")
+        metrics.enter("placement")
+        metrics.enter("load")
+        metrics.stop()
+        worker = metrics.spawn()
+        worker.calls.update({"check_availability": 3})
+        worker.rejected.update({"check_availability": 1})
+
+        metrics.merge(worker.checks())
+
+        data = metrics.as_dict()
+        self.assertEqual(set(data["phases"]), {"load", "placement"})
+        self.assertEqual(data["checks"], {"check_availability": {"calls": 3, "rejected": 1}})
+        self.assertIsNone(metrics.current)
+
+    def test_queries_are_counted_through_wrapper(self):
+        metrics = GenerationMetrics()
+        execute = lambda sql, params, many, context: sql
+
+        self.assertEqual(metrics.count_query(execute, "SELECT 1", None, False, SimpleNamespace()), "SELECT 1")
+        self.assertEqual(metrics.queries, 1)
+
+
+class GenerationRunMetricsTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_constraint(only_monday(1, 2, 3), teacher=cls.teachers[1])
+        cls.create_plan(6, group=cls.groups[0])
+        cls.create_plan(2, stream=cls.stream, teacher=cls.teachers[1])
+
+    def test_result_reports_phases_and_checks(self):
+        metrics = ScheduleGenerator(self.semester.id).generate()["metrics"]
+
+        self.assertLessEqual({"load", "sort", "placement", "persistence"}, set(metrics["phases"]))
+        self.assertAlmostEqual(metrics["seconds"], sum(metrics["phases"].values()), places=3)
+        checks = metrics["checks"]
+        for name in ("check_dynamic_constraints", "check_availability", "find_free_room"):
+            self.assertGreater(checks[name]["calls"], 0)
+        # Перші пари понеділка група G0 уже зайнята потоком
+        self.assertGreater(checks["check_availability"]["rejected"], 0)
+
+    def test_query_count_matches_captured_queries(self):
+        # Запис в історію генерацій робиться вже після підрахунку
+        with mock.patch.object(ScheduleGenerator, "record_run", return_value=SimpleNamespace(id=None)):
+            with CaptureQueriesContext(connection) as context:
+                result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assertEqual(result["metrics"]["queries"], len(context.captured_queries))
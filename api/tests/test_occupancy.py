@@ -0,0 +1,106 @@
+import datetime
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Lesson, Room
+from api.services.generator import ScheduleGenerator
+from api.services.occupancy import OccupancyIndex
+
+from .base import ScheduleTestCase
+
+MONDAY = datetime.date(2025, 9, 1)
+TUESDAY = datetime.date(2025, 9, 2)
+
+
+class OccupancyIndexTests(SimpleTestCase):
+    """Два дні по три пари: індекси 0-2 — понеділок, 3-5 — вівторок."""
+
+    def setUp(self):
+        slots = [(10 + i, MONDAY if i < 3 else TUESDAY) for i in range(6)]
+        self.index = OccupancyIndex(slots)
+
+    def test_slot_and_day_index(self):
+        self.assertEqual((self.index.size, self.index.days), (6, 2))
+        self.assertEqual(self.index.index_of(13), 3)
+        self.assertIsNone(self.index.index_of(99))
+        self.assertEqual(list(self.index.slot_day), [0, 0, 0, 1, 1, 1])
+
+    def test_occupy_and_release(self):
+        self.index.occupy(1, 7, frozenset([1, 2]), None, 5)
+
+        self.assertTrue(self.index.is_teacher_busy(7, 1))
+        self.assertFalse(self.index.is_teacher_busy(7, 0))
+        self.assertFalse(self.index.is_teacher_busy(8, 1))
+        self.assertTrue(self.index.is_room_busy(5, 1))
+        self.assertTrue(self.index.is_audience_busy(frozenset([2, 3]), None, 1))
+        self.assertFalse(self.index.is_audience_busy(frozenset([3]), None, 1))
+        self.assertEqual((self.index.teacher_day_load(7, 2), self.index.group_day_load(1, 0)), (1, 1))
+        self.assertEqual(self.index.group_day_load(1, 3), 0)
+
+        self.index.release(1, 7, frozenset([1, 2]), None, 5)
+
+        self.assertFalse(self.index.is_teacher_busy(7, 1))
+        self.assertFalse(self.index.is_room_busy(5, 1))
+        self.assertFalse(self.index.is_audience_busy(frozenset([1, 2]), None, 1))
+        self.assertEqual(self.index.teacher_day_load(7, 1), 0)
+
+    def test_stream_row_blocks_the_stream_itself(self):
+        self.index.occupy(4, 7, frozenset([1, 2]), 3, 5)
+
+        self.assertTrue(self.index.is_audience_busy(frozenset(), 3, 4))
+        self.assertTrue(self.index.is_audience_busy(frozenset([1]), None, 4))
+        self.assertFalse(self.index.is_audience_busy(frozenset(), 3, 5))
+
+    def test_runs_of_several_periods(self):
+        self.index.occupy(1, 7, frozenset([1]), None, 5, length=2)
+
+        self.assertTrue(self.index.is_teacher_busy(7, 0, 2))
+        self.assertTrue(self.index.is_teacher_busy(7, 2))
+        self.assertFalse(self.index.is_teacher_busy(7, 3, 3))
+        self.assertEqual(self.index.group_day_load(1, 0), 2)
+
+    def test_exam_days(self):
+        self.index.occupy(0, 7, frozenset([1]), None, 5, is_exam=True)
+
+        self.assertTrue(self.index.has_exam_on_day(frozenset([1, 2]), 2))
+        self.assertFalse(self.index.has_exam_on_day(frozenset([1]), 3))
+        self.assertFalse(self.index.has_exam_on_day(frozenset([2]), 0))
+
+
+class OccupancyGenerationTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Room.objects.create(title="102", building="A", capacity=60, room_type=cls.room_type)
+        cls.create_plan(6, group=cls.groups[0])
+        cls.create_plan(6, group=cls.groups[1], teacher=cls.teachers[1])
+        cls.create_plan(5, stream=cls.stream, teacher=cls.teachers[1])
+
+    def test_no_conflicts_with_streams_and_locked_lessons(self):
+        slot = self.semester.timeslots.get(date=MONDAY, period_number=1)
+        locked = self.create_plan(1, group=self.groups[0], teacher=self.teachers[1])
+        Lesson.objects.create(study_plan=locked, time_slot=slot, room=self.room, is_locked=True)
+
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assert_no_conflicts()
+
+    def test_placement_issues_no_queries(self):
+        generator = ScheduleGenerator(self.semester.id)
+        placement = generator.place_lessons
+        queries = []
+
+        def counted_placement(plans):
+            with CaptureQueriesContext(connection) as context:
+                result = placement(plans)
+            queries.append(context.captured_queries)
+            return result
+
+        generator.place_lessons = counted_placement
+        result = generator.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assertEqual(queries, [[]])
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from api.models import Group, Lesson, Room, RoomType, StudyPlan, Teacher
+from api.serializers import GenerationRequestSerializer
+from api.services import generator as generator_module
+from api.services import parallel
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class WorkerPoolTests(ScheduleTestCase):
+    """Дві незалежні компоненти: свій тип аудиторії, викладачі й групи в кожної."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        lab = RoomType.objects.create(name="Lab")
+        Room.objects.create(title="201", building="A", capacity=30, room_type=lab)
+        teachers = [Teacher.objects.create(name=f"L{i}") for i in range(2)]
+        groups = [Group.objects.create(name=f"L{i}", amount=20, start_year=2024) for i in range(2)]
+
+        cls.create_constraint({"type": "max_daily_lessons", "value": 2}, group=cls.groups[0])
+        cls.create_plan(6, group=cls.groups[0])
+        cls.create_plan(5, group=cls.groups[1], teacher=cls.teachers[1])
+        cls.create_plan(4, stream=cls.stream, teacher=cls.teachers[1])
+        StudyPlan.objects.filter(semester=cls.semester).update(required_room_type=cls.room_type)
+        cls.create_plan(7, group=groups[0], teacher=teachers[0])
+        cls.create_plan(8, group=groups[1], teacher=teachers[0])
+        cls.create_plan(6, group=groups[1], teacher=teachers[1])
+        StudyPlan.objects.filter(semester=cls.semester, required_room_type__isnull=True).update(required_room_type=lab)
+
+    def generate(self, **options):
+        result = ScheduleGenerator(self.semester.id, force=True, **options).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        return result, sorted(
+            Lesson.objects.filter(study_plan__semester=self.semester)
+            .values_list("study_plan_id", "time_slot_id", "room_id"),
+            key=lambda row: tuple(value or 0 for value in row),
+        )
+
+    def test_pool_matches_single_process(self):
+        single, expected = self.generate(workers=1)
+
+        with mock.patch.object(
+            generator_module, "place_components_in_pool", wraps=generator_module.place_components_in_pool
+        ) as pool:
+            pooled, placements = self.generate(workers=2)
+
+        pool.assert_called_once()
+        self.assertEqual(len(pool.call_args.args[1]), 2)
+        self.assertEqual(placements, expected)
+        self.assertEqual((pooled["created"], pooled["unassigned"]), (single["created"], single["unassigned"]))
+
+    def test_portfolio_in_pool_matches_single_process(self):
+        single, expected = self.generate(workers=1, portfolio=3, seed=5)
+
+        with mock.patch.object(
+            generator_module, "run_portfolio_in_pool", wraps=generator_module.run_portfolio_in_pool
+        ) as pool:
+            pooled, placements = self.generate(workers=2, portfolio=3, seed=5)
+
+        pool.assert_called_once()
+        self.assertEqual(placements, expected)
+        self.assertEqual(pooled["portfolio"], single["portfolio"])
+        self.assertEqual(len(pooled["portfolio"]["attempts"]), 3)
+
+    def test_workers_are_spawned(self):
+        # Процеси spawn розпаковують генератор уже після django.setup()
+        for options in ({}, {"portfolio": 3, "seed": 5}):
+            _, expected = self.generate(workers=1, **options)
+            with mock.patch.object(parallel, "ProcessPoolExecutor", wraps=parallel.ProcessPoolExecutor) as executor:
+                result, placements = self.generate(workers=2, **options)
+
+            executor.assert_called_once()
+            self.assertEqual(executor.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+            self.assertEqual(placements, expected)
+
+    @override_settings(SCHEDULE_GENERATOR={"MAX_WORKERS": 2})
+    def test_request_workers_are_capped(self):
+        for workers, valid in ((2, True), (3, False)):
+            serializer = GenerationRequestSerializer(data={"semester_id": self.semester.id, "workers": workers})
+            self.assertEqual(serializer.is_valid(), valid, serializer.errors)
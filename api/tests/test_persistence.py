@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Lesson, Semester, StudyPlan
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class BulkPersistenceTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 22 заняття одного викладача на 20 слотів: два лишаються нерозподіленими
+        cls.create_plan(12, group=cls.groups[0])
+        cls.create_plan(10, group=cls.groups[1])
+
+    def lesson_queries(self, context, statement):
+        return [q["sql"] for q in context.captured_queries if q["sql"].startswith(f'{statement} "api_lesson"')]
+
+    def test_one_delete_and_batched_inserts(self):
+        ScheduleGenerator(self.semester.id).generate()
+
+        with CaptureQueriesContext(connection) as context:
+            result = ScheduleGenerator(self.semester.id, batch_size=8, force=True).generate()
+
+        self.assertEqual((result["created"], result["unassigned"]), (20, 2))
+        self.assertEqual(len(self.lesson_queries(context, "DELETE FROM")), 1)
+        self.assertEqual(len(self.lesson_queries(context, "INSERT INTO")), 3)
+        # Жодних точок збереження на кожне заняття
+        self.assertLessEqual(len([q for q in context.captured_queries if q["sql"].startswith("SAVEPOINT")]), 2)
+        self.assertEqual(Lesson.objects.count(), 22)
+        self.assertEqual(Lesson.objects.filter(time_slot__isnull=True, room__isnull=True).count(), 2)
+
+    def test_locked_and_other_semester_lessons_are_kept(self):
+        slot = self.semester.timeslots.get(date__week_day=2, period_number=1)
+        locked = Lesson.objects.create(
+            study_plan=self.create_plan(1, group=self.groups[1], teacher=self.teachers[1]),
+            time_slot=slot, room=self.room, is_locked=True,
+        )
+        other = Semester.objects.create(
+            name="Other", start_date=self.semester.start_date, end_date=self.semester.end_date
+        )
+        other.synchronize_slots()
+        foreign_plan = StudyPlan.objects.create(
+            semester=other, group=self.groups[1], subject=self.subject, teacher=self.teachers[1],
+            class_type=self.class_type, amount=1,
+        )
+        foreign = Lesson.objects.create(study_plan=foreign_plan, time_slot=other.timeslots.first(), room=self.room)
+
+        generated = Lesson.objects.filter(study_plan__semester=self.semester, is_locked=False)
+        ScheduleGenerator(self.semester.id).generate()
+        first = generated.count()
+        ScheduleGenerator(self.semester.id, force=True).generate()
+
+        self.assertTrue(Lesson.objects.filter(pk=locked.pk, time_slot=slot, is_locked=True).exists())
+        self.assertTrue(Lesson.objects.filter(pk=foreign.pk).exists())
+        self.assertEqual(generated.count(), first)
+
+    def test_failed_write_keeps_previous_schedule(self):
+        ScheduleGenerator(self.semester.id).generate()
+        before = self.lesson_rows()
+
+        with mock.patch.object(QuerySet, "bulk_create", side_effect=DatabaseError("disk full")):
+            result = ScheduleGenerator(self.semester.id, force=True).generate()
+
+        self.assertFalse(result["success"])
+        self.assertIn("disk full", result["error"])
+        self.assertEqual(self.lesson_rows(), before)
@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import ClassType, StudyPlan
+from api.services.generator import ScheduleGenerator
+from api.services.plans import PlanView
+
+from .base import ScheduleTestCase
+
+
+class PlanViewTests(ScheduleTestCase):
+    def load(self, plan):
+        return StudyPlan.objects.select_related("group", "stream", "class_type").prefetch_related(
+            "stream__groups"
+        ).get(pk=plan.pk)
+
+    def test_group_plan(self):
+        view = PlanView(self.load(self.create_plan(3, group=self.groups[0])))
+
+        self.assertEqual(view.group_ids, frozenset([self.groups[0].id]))
+        self.assertEqual((view.audience_size, view.target_name), (20, "G0"))
+        self.assertEqual((view.teacher_id, view.class_type_id, view.room_type_id), (
+            self.teachers[0].id, self.class_type.id, None,
+        ))
+        self.assertEqual((view.amount, view.duration, view.is_exam), (3, 1, False))
+
+    def test_stream_plan_resolves_member_groups(self):
+        plan = self.load(self.create_plan(2, stream=self.stream))
+
+        view = PlanView(plan, is_exam=True)
+
+        self.assertIsInstance(view.group_ids, frozenset)
+        self.assertEqual(view.group_ids, {group.id for group in self.groups})
+        self.assertEqual((view.audience_size, view.target_name, view.is_exam), (40, "S", True))
+
+    def test_snapshot_is_detached_from_orm(self):
+        plan = self.load(self.create_plan(2, stream=self.stream, teacher=self.teachers[1]))
+        plan.class_type = ClassType.objects.create(name="Lecture")
+        plan.duration = 2
+
+        with CaptureQueriesContext(connection) as context:
+            view = PlanView(plan)
+            values = (view.group_ids, view.audience_size, view.class_type_name, view.duration)
+
+        self.assertEqual(context.captured_queries, [])
+        self.assertEqual(values[1:], (40, "Lecture", 2))
+        with self.assertRaises(AttributeError):
+            view.extra = 1
+
+    def test_generation_queries_do_not_grow_with_plans(self):
+        queries = []
+        for teacher in self.teachers:
+            self.create_plan(2, stream=self.stream, teacher=teacher)
+            self.create_plan(2, group=self.groups[0], teacher=teacher)
+            # Перший запуск ще створює знімок вхідних даних семестру
+            ScheduleGenerator(self.semester.id, force=True).generate()
+            queries.append(ScheduleGenerator(self.semester.id, force=True).generate()["metrics"]["queries"])
+
+        self.assertEqual(queries[0], queries[1])
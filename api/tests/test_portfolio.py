@@ -0,0 +1,58 @@
+from django.test import override_settings
+
+from api.models import Lesson
+from api.serializers import GenerationRequestSerializer
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase, only_monday
+
+
+class PortfolioTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Викладач T1 вільний лише в понеділок, тож порядок розміщення має значення
+        cls.create_constraint(only_monday(1, 2, 3, 4), teacher=cls.teachers[1])
+        cls.create_plan(6, group=cls.groups[0])
+        cls.create_plan(5, group=cls.groups[1])
+        cls.create_plan(4, stream=cls.stream, teacher=cls.teachers[1])
+        cls.create_plan(3, group=cls.groups[0], teacher=cls.teachers[1])
+
+    def generate(self, **options):
+        result = ScheduleGenerator(self.semester.id, force=True, **options).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        rows = sorted(
+            Lesson.objects.filter(study_plan__semester=self.semester)
+            .values_list("study_plan_id", "time_slot_id", "room_id"),
+            key=lambda row: tuple(value or 0 for value in row),
+        )
+        return result, rows
+
+    def test_best_attempt_is_reported_and_not_worse_than_greedy(self):
+        greedy, _ = self.generate()
+        result, _ = self.generate(portfolio=4, seed=7)
+
+        portfolio = result["portfolio"]
+        self.assertEqual((portfolio["size"], portfolio["seed"]), (4, 7))
+        self.assertEqual([a["attempt"] for a in portfolio["attempts"]], [0, 1, 2, 3])
+        # Спроба 0 — звичайний жадібний порядок
+        self.assertEqual(portfolio["attempts"][0]["unassigned"], greedy["unassigned"])
+        best = portfolio["attempts"][portfolio["best"]]
+        self.assertEqual(best["unassigned"], min(a["unassigned"] for a in portfolio["attempts"]))
+        self.assertEqual(result["unassigned"], best["unassigned"])
+        self.assertLessEqual(result["unassigned"], greedy["unassigned"])
+        self.assertIsNone(greedy["portfolio"])
+
+    def test_same_seed_reproduces_schedule(self):
+        first, first_rows = self.generate(portfolio=3, seed=11)
+        second, second_rows = self.generate(portfolio=3, seed=11)
+
+        self.assertEqual(first_rows, second_rows)
+        self.assertEqual(first["portfolio"], second["portfolio"])
+
+    @override_settings(SCHEDULE_GENERATOR={"MAX_PORTFOLIO": 4})
+    def test_request_portfolio_is_capped(self):
+        for portfolio, valid in ((4, True), (5, False)):
+            serializer = GenerationRequestSerializer(data={"semester_id": self.semester.id, "portfolio": portfolio})
+            self.assertEqual(serializer.is_valid(), valid, serializer.errors)
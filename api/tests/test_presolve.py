@@ -0,0 +1,70 @@
+from rest_framework.test import APIClient
+
+from api.models import Lesson, Room
+from api.services.generator import ScheduleGenerator
+from api.services.presolve import feasibility_report
+
+from .base import ScheduleTestCase, only_monday
+
+
+class FeasibilityReportTests(ScheduleTestCase):
+    def test_feasible_semester(self):
+        self.create_plan(5, group=self.groups[0])
+
+        report = feasibility_report(self.semester)
+
+        self.assertTrue(report["feasible"])
+        self.assertEqual((report["slots"], report["plans"], report["demand"]), (20, 1, 5))
+
+    def test_stream_limit_without_stream_plans(self):
+        # Ліміт потоку діє на власний план групи: 5 днів по 1 парі на 6 занять
+        self.create_constraint({"type": "max_daily_lessons", "value": 1}, stream=self.stream)
+        self.create_plan(6, group=self.groups[0])
+
+        report = feasibility_report(self.semester)
+
+        self.assertFalse(report["feasible"])
+        self.assertEqual(report["groups"], [{"group": self.groups[0].id, "demand": 6, "supply": 5, "name": "G0"}])
+
+    def test_overloaded_teacher_and_rooms(self):
+        self.create_plan(12, group=self.groups[0])
+        self.create_plan(12, group=self.groups[1])
+
+        report = feasibility_report(self.semester)
+
+        self.assertFalse(report["feasible"])
+        self.assertEqual(report["teachers"], [{"teacher": self.teachers[0].id, "demand": 24, "supply": 20, "name": "T0"}])
+        self.assertEqual(report["groups"], [])
+        self.assertEqual(report["room_types"][0]["tightest"], {"min_capacity": 20, "demand": 24, "supply": 20})
+
+    def test_time_block_and_oversized_stream(self):
+        self.create_constraint(only_monday(1, 2), group=self.groups[1])
+        self.create_plan(3, group=self.groups[1], teacher=self.teachers[1])
+        stream_plan = self.create_plan(1, stream=self.stream)
+        Room.objects.filter(pk=self.room.pk).update(capacity=30)
+
+        report = feasibility_report(self.semester)
+
+        self.assertFalse(report["feasible"])
+        self.assertEqual([row["group"] for row in report["groups"]], [self.groups[1].id])
+        self.assertEqual(report["oversized"], [
+            {"plan": stream_plan.id, "stream": self.stream.id, "audience": 40, "largest_room": 30}
+        ])
+
+    def test_generation_skipped_when_infeasible(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 1}, stream=self.stream)
+        self.create_plan(6, group=self.groups[0])
+
+        result = ScheduleGenerator(self.semester.id, presolve=True).generate()
+
+        self.assertFalse(result["success"])
+        self.assertFalse(result["presolve"]["feasible"])
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_presolve_endpoint(self):
+        self.create_plan(25, group=self.groups[0])
+
+        response = APIClient().get(f"/api/semesters/{self.semester.id}/presolve/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["feasible"])
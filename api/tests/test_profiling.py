@@ -0,0 +1,55 @@
+import tempfile
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.models import GenerationRun, Lesson
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase
+
+
+class ProfileEndpointTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_plan(4, group=cls.groups[0])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SCHEDULE_GENERATOR={
+            "PROFILE_ALLOWLIST": ["127.0.0.1"], "PROFILE_DIR": directory.name,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def profile(self):
+        response = self.client.post(
+            "/api/generate-schedule/", {"semester_id": self.semester.id, "profile": True}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_repeated_profile_measures_generation_not_cache(self):
+        ScheduleGenerator(self.semester.id).generate()
+        lessons = sorted(Lesson.objects.values_list("id", "time_slot_id", "room_id"))
+        runs = GenerationRun.objects.count()
+
+        for _ in range(2):
+            data = self.profile()
+            self.assertNotIn("cached", data)
+            self.assertIn("placement", data["metrics"]["phases"])
+            self.assertIsNone(data["run"])
+            self.assertTrue(data["profile"]["rolled_back"])
+
+        self.assertEqual(sorted(Lesson.objects.values_list("id", "time_slot_id", "room_id")), lessons)
+        self.assertEqual(GenerationRun.objects.count(), runs)
+
+    def test_profile_requires_allowlist(self):
+        with override_settings(SCHEDULE_GENERATOR={}):
+            response = self.client.post(
+                "/api/generate-schedule/", {"semester_id": self.semester.id, "profile": True}, format="json"
+            )
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,182 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from api.models import Group, Lesson, Subject, Teacher
+from api.services.generator import ScheduleGenerator
+from api.services.repair import EjectionRepair
+
+from .base import ScheduleTestCase, only_monday
+
+OCCUPANCY_TABLES = ("teachers", "groups", "streams", "rooms", "teacher_days", "group_days", "group_exam_days")
+
+
+def occupancy_state(occupancy):
+    """Ненульові рядки індексу зайнятості (порожні рядки створюються ліниво)."""
+    return {
+        name: {key: bytes(row) for key, row in getattr(occupancy, name).items() if any(row)}
+        for name in OCCUPANCY_TABLES
+    }
+
+
+class EjectionRepairTests(ScheduleTestCase):
+    """Одна аудиторія; тісний план G2 має лише понеділкову першу пару."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tight_group = Group.objects.create(name="G2", amount=20, start_year=2024)
+        cls.create_constraint(only_monday(1), group=cls.tight_group)
+
+    def generate(self, repair_moves=2):
+        result = ScheduleGenerator(self.semester.id, repair_moves=repair_moves, force=True).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        return result
+
+    def create_tight(self):
+        return self.create_plan(1, group=self.tight_group, teacher=Teacher.objects.create(name="T2"))
+
+    def placements(self):
+        return sorted(
+            Lesson.objects.filter(study_plan__semester=self.semester)
+            .values_list("study_plan_id", "time_slot_id", "room_id"),
+            key=lambda row: tuple(value or 0 for value in row),
+        )
+
+    def tight_slot(self, tight):
+        return Lesson.objects.get(study_plan=tight).time_slot
+
+    def test_displaced_lesson_is_replaced(self):
+        # Більший план іде першим і займає єдиний слот тісного
+        self.create_plan(3, group=self.groups[1], teacher=self.teachers[1])
+        tight = self.create_tight()
+        self.assertEqual(self.generate(repair_moves=0)["unassigned"], 1)
+
+        result = self.generate()
+
+        self.assertEqual((result["created"], result["unassigned"]), (4, 0))
+        slot = self.tight_slot(tight)
+        self.assertEqual((slot.date.isoweekday(), slot.period_number), (1, 1))
+
+    def test_failed_chain_is_rolled_back(self):
+        # Викладач T0 зайнятий у всіх 20 слотах: останнє його заняття витіснило
+        # б лише тісне, а те перенести нікуди
+        self.create_plan(20, group=self.groups[0])
+        self.create_tight()
+
+        place = EjectionRepair.place
+        outcomes = []
+
+        def checked_place(repair, plan):
+            state = occupancy_state(repair.gen.occupancy)
+            placements = list(repair.placements)
+            last_slots = dict(repair.gen.last_slots)
+            slot, room = place(repair, plan)
+            outcomes.append(slot)
+            if slot is None:
+                self.assertEqual(occupancy_state(repair.gen.occupancy), state)
+                self.assertEqual(repair.placements, placements)
+                self.assertEqual(repair.gen.last_slots, last_slots)
+            return slot, room
+
+        with mock.patch.object(EjectionRepair, "place", checked_place):
+            result = self.generate()
+
+        self.assertIn(None, outcomes)
+        self.assertEqual(result["unassigned"], 1)
+
+    def test_locked_lessons_are_not_moved(self):
+        self.create_plan(1, group=self.groups[1], teacher=self.teachers[1])
+        self.generate(repair_moves=0)
+        monday = self.semester.timeslots.get(date__week_day=2, period_number=1)
+        Lesson.objects.update(time_slot=monday, is_locked=True)
+        locked = self.lesson_rows()
+        tight = self.create_tight()
+
+        result = self.generate()
+
+        self.assertEqual(result["unassigned"], 1)
+        self.assertIsNone(self.tight_slot(tight))
+        self.assertEqual([row for row in self.lesson_rows() if row[4]], locked)
+
+    def test_sequential_lessons_are_not_moved(self):
+        leader = self.create_plan(2, group=self.groups[1], teacher=self.teachers[1])
+        follower = self.create_plan(
+            2, group=self.groups[1], teacher=self.teachers[1], subject=Subject.objects.create(name="Lab")
+        )
+        self.create_constraint({
+            "type": "sequential_lessons",
+            "value": {"leader_plan_id": leader.id, "follower_plan_id": follower.id, "time_gap": 1},
+        })
+        tight = self.create_tight()
+        self.generate(repair_moves=0)
+        chained = [row for row in self.placements() if row[0] in (leader.id, follower.id)]
+
+        result = self.generate()
+
+        self.assertEqual(result["unassigned"], 1)
+        self.assertIsNone(self.tight_slot(tight))
+        self.assertEqual([row for row in self.placements() if row[0] in (leader.id, follower.id)], chained)
+
+    def test_check_budget_is_deterministic(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 2}, group=self.groups[0])
+        self.create_plan(4, stream=self.stream, teacher=self.teachers[1])
+        self.create_plan(8, group=self.groups[0])
+        self.create_plan(6, group=self.groups[1], teacher=self.teachers[1])
+        self.create_tight()
+
+        self.generate(repair_moves=0)
+        greedy = self.placements()
+        outputs = {}
+        for checks in (0, 5, 1000000):
+            with override_settings(SCHEDULE_GENERATOR={"REPAIR_CHECKS": checks}):
+                runs = []
+                for _ in range(2):
+                    self.generate()
+                    runs.append(self.placements())
+            self.assertEqual(runs[0], runs[1])
+            outputs[checks] = runs[0]
+
+        self.assertEqual(outputs[0], greedy)
+        self.assertNotEqual(outputs[1000000], greedy)
+
+    def test_overloaded_teacher_is_not_repaired(self):
+        # 21 заняття викладача T0 на 20 слотів — ремонт нічого не змінить
+        self.create_plan(21, group=self.groups[0])
+
+        checks = [
+            self.generate(repair_moves=moves)["metrics"]["checks"]["check_availability"]["calls"]
+            for moves in (0, 2)
+        ]
+
+        self.assertEqual(checks[0], checks[1])
+
+    def test_failed_plan_is_not_searched_again(self):
+        # Обидва слоти плану G3 в єдиній аудиторії зайняті закріпленими
+        # заняттями; dsatur ремонтує після проходу, тож між двома невдалими
+        # заняттями G3 нічого не розміщується
+        other = self.create_plan(2, group=self.groups[1], teacher=self.teachers[1])
+        self.generate(repair_moves=0)
+        for lesson, period in zip(Lesson.objects.filter(study_plan=other).order_by("id"), (1, 2)):
+            lesson.time_slot = self.semester.timeslots.get(date__week_day=2, period_number=period)
+            lesson.is_locked = True
+            lesson.save()
+        group = Group.objects.create(name="G3", amount=20, start_year=2024)
+        self.create_constraint(only_monday(1, 2), group=group)
+        plan = self.create_plan(2, group=group, teacher=Teacher.objects.create(name="T2"))
+
+        insert = EjectionRepair.insert
+        searched = []
+
+        def counted_insert(repair, plan, pos, *args):
+            if pos is None:
+                searched.append(plan.id)
+            return insert(repair, plan, pos, *args)
+
+        with mock.patch.object(EjectionRepair, "insert", counted_insert):
+            result = ScheduleGenerator(self.semester.id, ordering="dsatur", repair_moves=2, force=True).generate()
+
+        self.assertEqual(result["unassigned"], 2)
+        self.assertEqual(Lesson.objects.filter(study_plan=plan, time_slot__isnull=True).count(), 2)
+        self.assertEqual(searched, [plan.id])
@@ -0,0 +1,77 @@
+import datetime
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Lesson, Room, RoomType, StudyPlan
+from api.services.generator import ScheduleGenerator
+from api.services.occupancy import OccupancyIndex
+from api.services.room_pool import RoomPool
+
+from .base import ScheduleTestCase
+
+
+def room(room_id, capacity, room_type_id):
+    return SimpleNamespace(id=room_id, capacity=capacity, room_type_id=room_type_id)
+
+
+class RoomPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = RoomPool([room(1, 60, 1), room(2, 20, 1), room(3, 30, 2), room(4, 30, 1)])
+        self.occupancy = OccupancyIndex([(10, datetime.date(2025, 9, 1)), (11, datetime.date(2025, 9, 1))])
+
+    def test_buckets_sorted_by_capacity(self):
+        self.assertEqual([r.id for r in self.pool.buckets[1][1]], [2, 4, 1])
+        self.assertEqual(self.pool.buckets[1][0], [20, 30, 60])
+        self.assertEqual([r.id for r in self.pool.buckets[None][1]], [2, 3, 4, 1])
+
+    def test_smallest_fitting_room_of_type(self):
+        self.assertEqual(self.pool.find_free(1, 25, self.occupancy, 0).id, 4)
+        self.assertEqual(self.pool.find_free(None, 25, self.occupancy, 0).id, 3)
+        self.assertEqual(self.pool.find_free(2, 30, self.occupancy, 0).id, 3)
+        self.assertIsNone(self.pool.find_free(2, 31, self.occupancy, 0))
+        self.assertIsNone(self.pool.find_free(9, 1, self.occupancy, 0))
+
+    def test_busy_rooms_are_skipped(self):
+        self.occupancy.occupy(1, None, (), None, 4)
+
+        self.assertEqual(self.pool.find_free(1, 25, self.occupancy, 0).id, 4)
+        self.assertEqual(self.pool.find_free(1, 25, self.occupancy, 1).id, 1)
+        self.assertEqual(self.pool.find_free(1, 25, self.occupancy, 0, length=2).id, 1)
+        self.assertEqual([r.id for r in self.pool.free_rooms(1, 20, self.occupancy, 1)], [2, 1])
+
+
+class RoomPoolGenerationTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.lab = RoomType.objects.create(name="Lab")
+        cls.small = Room.objects.create(title="S", building="A", capacity=20, room_type=cls.room_type)
+        cls.lab_room = Room.objects.create(title="L", building="A", capacity=45, room_type=cls.lab)
+
+    def test_rooms_fit_type_and_audience(self):
+        lab_plan = self.create_plan(3, group=self.groups[1], teacher=self.teachers[1])
+        StudyPlan.objects.filter(pk=lab_plan.pk).update(required_room_type=self.lab)
+        self.create_plan(4, group=self.groups[0])
+        stream_plan = self.create_plan(3, stream=self.stream, teacher=self.teachers[1])
+
+        result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assert_no_conflicts()
+        lab_rooms = set(Lesson.objects.filter(study_plan=lab_plan).values_list("room_id", flat=True))
+        self.assertEqual(lab_rooms, {self.lab_room.id})
+        # Потоку на 40 слухачів аудиторія на 20 місць не підходить
+        self.assertNotIn(self.small.id, Lesson.objects.filter(study_plan=stream_plan).values_list("room_id", flat=True))
+
+    def test_rooms_are_queried_once(self):
+        self.create_plan(10, group=self.groups[0])
+
+        with CaptureQueriesContext(connection) as context:
+            result = ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        room_queries = [q["sql"] for q in context.captured_queries if 'FROM "api_room"' in q["sql"]]
+        self.assertEqual(len(room_queries), 1)
@@ -0,0 +1,36 @@
+from api.models import Group, Lesson, Teacher
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase, only_monday
+
+
+class SaturationOrderingTests(ScheduleTestCase):
+    """Одна аудиторія; repair вимкнено, щоб порівнювати лише порядок розміщення."""
+
+    def unassigned(self, ordering):
+        result = ScheduleGenerator(self.semester.id, ordering=ordering, repair_moves=0, force=True).generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        return result["unassigned"]
+
+    def test_most_constrained_plan_goes_first(self):
+        # sort_plans ставить більший план першим, і він займає єдиний слот тісного плану
+        group = Group.objects.create(name="G2", amount=20, start_year=2024)
+        self.create_constraint(only_monday(1), group=group)
+        self.create_plan(3, group=self.groups[1], teacher=self.teachers[1])
+        tight = self.create_plan(1, group=group, teacher=Teacher.objects.create(name="T2"))
+
+        self.assertEqual(self.unassigned("static"), 1)
+        self.assertEqual(self.unassigned("dsatur"), 0)
+        self.assertTrue(Lesson.objects.filter(study_plan=tight, time_slot__isnull=False).exists())
+
+    def test_places_at_least_as_many_as_static(self):
+        # Денні ліміти, спільний викладач і потік на 20 слотів однієї аудиторії
+        self.create_constraint({"type": "max_daily_lessons", "value": 2}, group=self.groups[0])
+        self.create_constraint(only_monday(1, 2, 3), group=self.groups[1])
+        self.create_plan(4, stream=self.stream, teacher=self.teachers[1])
+        self.create_plan(8, group=self.groups[0])
+        self.create_plan(3, group=self.groups[1])
+        self.create_plan(6, group=self.groups[1], teacher=self.teachers[1])
+
+        self.assertLessEqual(self.unassigned("dsatur"), self.unassigned("static"))
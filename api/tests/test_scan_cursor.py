@@ -0,0 +1,98 @@
+import datetime
+from unittest import mock
+
+from api.models import Lesson, Semester
+from api.services.generator import ScheduleGenerator
+
+from .base import ScheduleTestCase, only_monday
+
+find_and_assign_slot = ScheduleGenerator.find_and_assign_slot
+
+
+def without_cursor(generator, plan):
+    """Еталон: кожне заняття сканує кандидатів плану з початку."""
+    generator.scan_from.clear()
+    return find_and_assign_slot(generator, plan)
+
+
+class ScanCursorTests(ScheduleTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_constraint({"type": "max_daily_lessons", "value": 2}, group=cls.groups[0])
+        cls.create_constraint(only_monday(3, 4), teacher=cls.teachers[1])
+        cls.create_plan(7, group=cls.groups[0])
+        cls.create_plan(6, group=cls.groups[1])
+        cls.create_plan(3, stream=cls.stream, teacher=cls.teachers[1])
+        cls.create_plan(4, stream=cls.stream)
+
+    def generate(self):
+        generator = ScheduleGenerator(self.semester.id, force=True)
+        result = generator.generate()
+        self.assertTrue(result["success"], result.get("error"))
+        rows = sorted(
+            Lesson.objects.filter(study_plan__semester=self.semester)
+            .values_list("study_plan_id", "time_slot_id", "room_id"),
+            key=lambda row: tuple(value or 0 for value in row),
+        )
+        return generator, result, rows
+
+    def test_cursor_matches_full_rescan(self):
+        with mock.patch.object(ScheduleGenerator, "find_and_assign_slot", without_cursor):
+            baseline, expected_result, expected = self.generate()
+
+        generator, result, rows = self.generate()
+
+        self.assertEqual(rows, expected)
+        self.assertEqual(result["unassigned"], expected_result["unassigned"])
+        self.assert_no_conflicts()
+        self.assertLess(
+            generator.metrics.calls["check_dynamic_constraints"], baseline.metrics.calls["check_dynamic_constraints"]
+        )
+
+    def test_unregister_resets_cursors(self):
+        generator, _, _ = self.generate()
+        lesson = Lesson.objects.filter(study_plan__semester=self.semester, time_slot__isnull=False).first()
+        generator.scan_from[lesson.study_plan_id] = 3
+
+        generator.unregister_memory(
+            generator.plans_map[lesson.study_plan_id], lesson.time_slot, generator.room_pool.rooms_by_id[lesson.room_id]
+        )
+
+        self.assertEqual(generator.scan_from, {})
+
+
+class SpreadTests(ScheduleTestCase):
+    """Три тижні: заняття плану мають іти з тижневим кроком."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.semester = Semester.objects.create(
+            name="Three weeks", start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2025, 9, 19)
+        )
+        cls.semester.synchronize_slots()
+
+    def positions(self, plan):
+        return sorted(
+            Lesson.objects.filter(study_plan=plan).values_list("time_slot__date", "time_slot__period_number")
+        )
+
+    def test_lessons_are_a_week_apart(self):
+        plans = [self.create_plan(3, group=group, teacher=teacher) for group, teacher in zip(self.groups, self.teachers)]
+
+        result = ScheduleGenerator(self.semester.id, spread=True).generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assert_no_conflicts()
+        for plan in plans:
+            positions = self.positions(plan)
+            self.assertEqual(len({(date.isoweekday(), period) for date, period in positions}), 1)
+            self.assertEqual([b[0] - a[0] for a, b in zip(positions, positions[1:])], [datetime.timedelta(days=7)] * 2)
+
+    def test_without_spread_lessons_are_packed(self):
+        plan = self.create_plan(3, group=self.groups[0])
+
+        ScheduleGenerator(self.semester.id).generate()
+
+        self.assertEqual({date for date, _ in self.positions(plan)}, {datetime.date(2025, 9, 1)})
@@ -0,0 +1,101 @@
+import datetime
+from collections import Counter
+
+from api.models import Lesson, Room, Semester, StudyPlan, Subject, TimeSlot
+from api.services.generator import ScheduleGenerator
+from api.services.template import WeekTemplate
+
+from .base import ScheduleTestCase
+
+
+class TemplateModeTests(ScheduleTestCase):
+    """Чотири тижні (клітинки чисельника й знаменника мають по дві дати) і дві аудиторії."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.semester = Semester.objects.create(
+            name="Four weeks", start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2025, 9, 26)
+        )
+        cls.semester.synchronize_slots()
+        Room.objects.create(title="102", building="A", capacity=60, room_type=cls.room_type)
+
+    def generate(self):
+        generator = ScheduleGenerator(self.semester.id, template=True, force=True)
+        result = generator.generate()
+        self.assertTrue(result["success"], result.get("error"))
+        self.assert_no_conflicts()
+        return generator, result
+
+    def positions(self, plan):
+        return sorted(
+            Lesson.objects.filter(study_plan=plan).values_list("time_slot__date", "time_slot__period_number")
+        )
+
+    def test_cell_is_replicated_across_weeks(self):
+        plans = [self.create_plan(4, group=group, teacher=teacher) for group, teacher in zip(self.groups, self.teachers)]
+
+        _, result = self.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        for plan in plans:
+            positions = self.positions(plan)
+            # Та сама пара того самого дня тижня в кожному з чотирьох тижнів
+            self.assertEqual(len({(date.isoweekday(), period) for date, period in positions}), 1)
+            self.assertEqual(len({date.isocalendar().week for date, _ in positions}), 4)
+
+    def test_holiday_is_skipped_as_exception(self):
+        holiday = datetime.date(2025, 9, 8)
+        TimeSlot.objects.filter(semester=self.semester, date=holiday).update(is_available=False)
+        plan = self.create_plan(4, group=self.groups[0])
+
+        _, result = self.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        positions = self.positions(plan)
+        self.assertNotIn(holiday, [date for date, _ in positions])
+        # Клітинка зі святом дає одну дату, тож решту дає інша клітинка на дві дати
+        self.assertEqual(len({(date.isoweekday(), period) for date, period in positions}), 2)
+
+    def test_locked_lesson_is_skipped_as_exception(self):
+        slot = TimeSlot.objects.get(semester=self.semester, date=datetime.date(2025, 9, 15), period_number=1)
+        # Закріплене заняття того самого викладача
+        locked_plan = self.create_plan(1, group=self.groups[1])
+        Lesson.objects.create(study_plan=locked_plan, time_slot=slot, room=self.room, is_locked=True)
+        plan = self.create_plan(4, group=self.groups[0])
+
+        _, result = self.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        self.assertNotIn((slot.date, 1), self.positions(plan))
+        self.assertTrue(Lesson.objects.filter(study_plan=locked_plan, time_slot=slot, is_locked=True).exists())
+
+    def test_daily_limit_and_double_periods(self):
+        self.create_constraint({"type": "max_daily_lessons", "value": 2}, group=self.groups[0])
+        lab = self.create_plan(4, group=self.groups[0], subject=Subject.objects.create(name="Lab"))
+        StudyPlan.objects.filter(pk=lab.pk).update(duration=2)
+        self.create_plan(4, group=self.groups[0], teacher=self.teachers[1])
+
+        _, result = self.generate()
+
+        self.assertEqual(result["unassigned"], 0)
+        per_day = Counter(
+            Lesson.objects.filter(study_plan__group=self.groups[0]).values_list("time_slot__date", flat=True)
+        )
+        self.assertEqual(sum(per_day.values()), 12)
+        self.assertLessEqual(max(per_day.values()), 2)
+        positions = self.positions(lab)
+        for (date, period), (next_date, next_period) in zip(positions[::2], positions[1::2]):
+            self.assertEqual((next_date, next_period), (date, period + 1))
+
+    def test_cell_counters_match_occupancy(self):
+        self.create_plan(6, group=self.groups[0])
+        self.create_plan(3, stream=self.stream, teacher=self.teachers[1])
+        self.create_plan(5, group=self.groups[1], teacher=self.teachers[1], subject=Subject.objects.create(name="Lab"))
+
+        generator, _ = self.generate()
+
+        fresh = WeekTemplate(generator.all_slots)
+        fresh.load(generator.occupancy)
+        nonzero = lambda busy: {resource: list(counts) for resource, counts in busy.items() if any(counts)}
+        self.assertEqual(nonzero(generator.week_template.busy), nonzero(fresh.busy))
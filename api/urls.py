@@ -5,7 +5,7 @@ from .views import (
     RoomViewSet, RoomTypeViewSet, SemesterViewSet, TimeSlotViewSet, 
     ClassTypeViewSet, StudyPlanViewSet, SemesterConstraintViewSet, LessonViewSet
 )
-from api.views.generation import GenerateScheduleView
+from api.views.generation import GenerateScheduleView, GenerationJobViewSet, GenerationRunViewSet
 from api.views.dashboard import DashboardStatsView
 
 router = DefaultRouter()
@@ -21,6 +21,8 @@ router.register(r'class-types', ClassTypeViewSet, basename='classtype')
 router.register(r'study_plans', StudyPlanViewSet, basename='studyplan')
 router.register(r'semester_constraints', SemesterConstraintViewSet, basename='semesterconstraint')
 router.register(r'lessons', LessonViewSet, basename='lesson')
+router.register(r'generation_jobs', GenerationJobViewSet, basename='generationjob')
+router.register(r'generation_runs', GenerationRunViewSet, basename='generationrun')
 
 
 urlpatterns = [
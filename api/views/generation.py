@@ -1,27 +1,72 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import status, viewsets
+from django_filters.rest_framework import DjangoFilterBackend
+from api.models import GenerationJob, GenerationRun
+from api.serializers import GenerationRequestSerializer, GenerationJobSerializer, GenerationRunSerializer
 from api.services.generator import ScheduleGenerator
+from api.services.jobs import enqueue_generation
+from api.services import profiling
+
+logger = logging.getLogger("schedule_generator")
 
 class GenerateScheduleView(APIView):
     def post(self, request):
-        semester_id = request.data.get('semester_id')
-        
-        if not semester_id:
+        if not request.data.get('semester_id'):
             return Response(
                 {"error": "semester_id is required"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        serializer = GenerationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        semester = serializer.validated_data['semester_id']
+        options = serializer.get_options()
+        profile = serializer.validated_data['profile']
+
+        if profile and not profiling.is_allowed(request):
+            return Response(
+                {"error": "Profiling is not allowed for this client"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not serializer.validated_data['sync'] and not profile:
+            job, created = enqueue_generation(semester.id, options)
+            data = GenerationJobSerializer(job).data
+            data['coalesced'] = not created
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+
         try:
-            generator = ScheduleGenerator(semester_id)
-            result = generator.generate()
+            generator = ScheduleGenerator(semester.id, **options)
+            if profile:
+                result, report = profiling.profile_generation(generator)
+                result['profile'] = report
+            else:
+                result = generator.generate()
             
             return Response(result, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"Generation Error: {str(e)}")
+            logger.exception("Generation error")
             return Response(
                 {"error": str(e), "success": False}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class GenerationJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = GenerationJob.objects.select_related('semester')
+    serializer_class = GenerationJobSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['semester', 'status']
+
+
+class GenerationRunViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = GenerationRun.objects.select_related('semester')
+    serializer_class = GenerationRunSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['semester', 'engine', 'success', 'input_hash']
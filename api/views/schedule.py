@@ -5,6 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from api.models import Semester, TimeSlot, SemesterConstraint, Lesson
 from api.serializers import SemesterSerializer, TimeSlotSerializer, SemesterConstraintSerializer, LessonSerializer
 from api.filters import LessonFilter
+from api.services.presolve import feasibility_report
 
 class SemesterViewSet(viewsets.ModelViewSet):
     queryset = Semester.objects.all()
@@ -17,6 +18,11 @@ class SemesterViewSet(viewsets.ModelViewSet):
         serializer = TimeSlotSerializer(slots, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def presolve(self, request, pk=None):
+        semester = self.get_object()
+        return Response(feasibility_report(semester))
+
     @action(detail=True, methods=['post'])
     def set_current(self, request, pk=None):
         semester = self.get_object()
@@ -127,4 +127,84 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+
+# Logging: generator progress at INFO; set the level to DEBUG to trace every plan lookup
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'schedule_generator': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Schedule generator (api.services.generator)
+
+SCHEDULE_GENERATOR = {
+    'BULK_BATCH_SIZE': 500,
+    # Processes used to place independent groups of plans in parallel
+    'WORKERS': 1,
+    # Largest workers a generation request may ask for (None = os.cpu_count())
+    'MAX_WORKERS': None,
+    # Background threads running queued generation jobs
+    'JOB_WORKERS': 1,
+    # An active job with no progress update for this long is considered interrupted
+    'JOB_STALE_SECONDS': 600,
+    # How often a running job refreshes its heartbeat (must be well below JOB_STALE_SECONDS)
+    'JOB_HEARTBEAT_SECONDS': 30,
+    # Lesson order of the greedy pass: 'static' (sort_plans, round-robin) or 'dsatur'
+    # (fewest free slot/room options first). 'dsatur' is experimental: it helps when a few
+    # plans have very few options, is usually no better than 'static' and several times slower
+    'ORDERING': 'static',
+    # Placed lessons the greedy pass may move to fit one that found no slot (0 = off).
+    # Opt-in: on a semester that cannot be fully placed it mostly burns its check budget
+    'REPAIR_MOVES': 0,
+    # Slot checks those repairs may spend per placement pass (about 3 s), i.e. per component
+    # and per portfolio attempt. A work budget rather than a time limit, so equal inputs
+    # always give equal output
+    'REPAIR_CHECKS': 1000000,
+    # Randomized plan orders tried per run, best one is saved (1 = off); runs on WORKERS processes
+    'PORTFOLIO_SIZE': 1,
+    # Largest portfolio a generation request may ask for (each attempt is a full placement pass)
+    'MAX_PORTFOLIO': 16,
+    # Skip generation when the feasibility presolve proves some lessons cannot be placed
+    'PRESOLVE': False,
+    # Try to place successive lessons of a plan one week apart (same weekday and period)
+    'SPREAD': False,
+    # Clients (IP address or username) allowed to request profile=true on generate-schedule
+    'PROFILE_ALLOWLIST': [],
+    # Hot functions returned by a profiled run and the stack sampling interval, seconds
+    'PROFILE_TOP': 30,
+    'PROFILE_INTERVAL': 0.005,
+    # Where .pstats and collapsed-stack files are written (None = system temp dir)
+    'PROFILE_DIR': None,
+    # Answer a deterministic run on unchanged input from the last successful run (force=true overrides)
+    'RESULT_CACHE': True,
+    # Placement engine: 'greedy', 'csp' (exact backtracking) or 'cpsat' (needs OR-Tools)
+    'ENGINE': 'greedy',
+    # Hard wall-clock limit of the exact engines, seconds
+    'SOLVER_TIME_LIMIT': 30,
+    # Largest time_limit a generation request may ask for (it holds a job worker that long)
+    'MAX_SOLVER_TIME_LIMIT': 300,
+    # Wall-clock budget of the local-search pass after greedy placement (0 = off)
+    'LOCAL_SEARCH_SECONDS': 0,
+    # Largest improve_seconds a generation request may ask for (it holds a job worker that long)
+    'MAX_LOCAL_SEARCH_SECONDS': 300,
+    # Iteration budget of that pass (None = time only). Cooling then follows iterations,
+    # so a seed repeats its output as long as the budget runs out before the time limit
+    'LOCAL_SEARCH_ITERATIONS': None,
+    # Penalty weights minimised by the local search
+    'LOCAL_SEARCH_WEIGHTS': {
+        'unassigned': 1000,
+        'group_gap': 10,
+        'same_day': 5,
+        'room_waste': 0,
+    },
+}